@@ -3,13 +3,22 @@
 import pickle
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable
 
 import cv2
 import numpy as np
-from scipy.optimize import least_squares
+from numba import jit, prange
+from scipy.optimize import OptimizeResult, least_squares
+from scipy.sparse import csr_matrix
 
 import caliscope.logger
 from caliscope.calibration.capture_volume.point_estimates import PointEstimates
+from caliscope.calibration.capture_volume.progress_monitor import (
+    BundleAdjustmentProgress,
+    ProgressMonitor,
+    StopBundleAdjustment,
+)
+from caliscope.calibration.capture_volume.schur_solver import levenberg_marquardt
 from caliscope.calibration.capture_volume.set_origin_functions import (
     get_board_origin_transform,
 )
@@ -20,6 +29,13 @@ logger = caliscope.logger.get(__name__)
 
 CAMERA_PARAM_COUNT = 6
 
+# multiples of the residual standard deviation at which the robust losses begin to down-weight
+# observations; these give 95% efficiency relative to least squares when the residuals are gaussian
+ROBUST_LOSS_TUNING = {"huber": 1.345, "cauchy": 2.385}
+
+# least_sq_result.status when an optimization is ended early by its callback, budget or rmse_tolerance
+STOPPED_STATUS = 5
+
 
 @dataclass
 class CaptureVolume:
@@ -27,6 +43,7 @@ class CaptureVolume:
     point_estimates: PointEstimates
     stage: int = 0
     origin_sync_index: int = None
+    fixed_ports: tuple = ()  # cameras held in place during the most recent optimization
 
     def __post__init__():
         logger.info("Creating capture volume from estimated camera array and stereotriangulated points...")
@@ -52,7 +69,8 @@ class CaptureVolume:
 
     @property
     def rmse(self):
-        if hasattr(self, "least_sq_result"):
+        # the residuals of the last optimization are stale if observations have since been filtered out
+        if hasattr(self, "least_sq_result") and self.least_sq_result.fun.size == 2 * self.point_estimates.n_img_points:
             rmse = rms_reproj_error(self.least_sq_result.fun, self.point_estimates.camera_indices)
         else:
             param_estimates = self.get_vectorized_params()
@@ -78,7 +96,46 @@ class CaptureVolume:
 
         return error
 
-    def optimize(self):
+    def optimize(
+        self,
+        solver: str = "scipy",
+        loss: str = "linear",
+        f_scale: float = None,
+        fixed_ports: list[int] = None,
+        callback: Callable[[BundleAdjustmentProgress], bool | None] = None,
+        max_iterations: int = None,
+        max_time: float = None,
+        rmse_tolerance: float = None,
+    ):
+        """
+        Bundle adjust the camera extrinsics and the object point estimates.
+
+        solver:
+            "scipy": scipy.optimize.least_squares with the trust region reflective method
+            "schur": Levenberg-Marquardt that eliminates the object points with the Schur complement
+                of the camera system; scales to captures with many more points
+        loss:
+            "linear" for ordinary least squares, or "huber"/"cauchy" to limit the influence of outlying
+            observations within a single run. The "schur" solver handles these more reliably; scipy's
+            rescaling of the residuals converges slowly when many observations are down-weighted
+        f_scale:
+            residual (in pixels) beyond which a robust loss down-weights observations. By default this is
+            derived from the spread of the reprojection errors at the start of the optimization
+        fixed_ports:
+            cameras whose extrinsics are held in place, so that only the remaining cameras and the object
+            points are adjusted to fit them
+        callback:
+            called with a BundleAdjustmentProgress at the starting estimate and after each iteration;
+            returning True cancels the optimization
+        max_iterations, max_time:
+            budgets in iterations and seconds after which the optimization is stopped
+        rmse_tolerance:
+            the optimization is stopped once an iteration improves the overall RMSE by less than this
+            fraction of the previous RMSE
+
+        When stopped by any of the above, the estimate from the last completed iteration is kept
+        and least_sq_result.status is STOPPED_STATUS.
+        """
         # Original example taken from https://scipy-cookbook.readthedocs.io/items/bundle_adjustment.html
 
         initial_param_estimate = self.get_vectorized_params()
@@ -89,19 +146,41 @@ class CaptureVolume:
         # logger.info(
         #     f"Prior to bundle adjustment (stage {str(self.stage)}), RMSE is: {self.rmse}"
         # )
-        logger.info(f"Beginning bundle adjustment to calculated stage {self.stage+1}")
-        self.least_sq_result = least_squares(
-            xy_reprojection_error,
-            initial_param_estimate,
-            jac_sparsity=self.point_estimates.get_sparsity_pattern(),
-            verbose=2,
-            x_scale="jac",
-            loss="linear",
-            ftol=1e-8,
-            method="trf",
-            # xy_reprojection error takes the vectorized param estimates as first arg and capture volume as second
-            args=(self,),
+        self.fixed_ports = tuple(fixed_ports) if fixed_ports is not None else ()
+
+        if loss == "linear":
+            f_scale = 1.0
+        elif f_scale is None:
+            f_scale = robust_loss_scale(xy_reprojection_error(initial_param_estimate, self), loss)
+            logger.info(f"Using {loss} loss with a scale of {f_scale:.3f} pixels")
+
+        monitor = ProgressMonitor(
+            lambda residual: rms_reproj_error(residual, self.point_estimates.camera_indices),
+            loss=loss,
+            f_scale=f_scale,
+            callback=callback,
+            max_iterations=max_iterations,
+            max_time=max_time,
+            rmse_tolerance=rmse_tolerance,
         )
+        fun = monitor.wrap_fun(xy_reprojection_error)
+
+        logger.info(f"Beginning bundle adjustment to calculated stage {self.stage+1}")
+        try:
+            self.least_sq_result = self._solve(solver, monitor, fun, initial_param_estimate, loss, f_scale)
+            monitor.finish(self.least_sq_result.x, self.least_sq_result.fun)
+        except StopBundleAdjustment as stop:
+            logger.info(f"Bundle adjustment stopped after {monitor.iteration} iterations: {stop}")
+            self.least_sq_result = OptimizeResult(
+                x=monitor.reported_x,
+                cost=monitor.history[-1].cost,
+                fun=monitor.last_residual,
+                nfev=monitor.nfev,
+                njev=monitor.njev,
+                status=STOPPED_STATUS,
+                message=str(stop),
+                success=True,
+            )
 
         self.camera_array.update_extrinsic_params(self.least_sq_result.x)
         self.point_estimates.update_obj_xyz(self.least_sq_result.x)
@@ -109,6 +188,40 @@ class CaptureVolume:
 
         logger.info(f"Following bundle adjustment (stage {str(self.stage)}), RMSE is: {self.rmse['overall']}")
 
+    def _solve(
+        self, solver: str, monitor: ProgressMonitor, fun: Callable, initial_param_estimate, loss: str, f_scale: float
+    ) -> OptimizeResult:
+        if solver == "scipy":
+            return least_squares(
+                fun,
+                initial_param_estimate,
+                jac=monitor.wrap_jac(xy_reprojection_jacobian, xy_reprojection_error),
+                verbose=0,
+                x_scale="jac",
+                loss=loss,
+                f_scale=f_scale,
+                ftol=1e-8,
+                method="trf",
+                # xy_reprojection error (and its jacobian) take the vectorized param estimates as first arg
+                # and capture volume as second
+                args=(self,),
+            )
+        elif solver == "schur":
+            return levenberg_marquardt(
+                fun,
+                monitor.wrap_jac(xy_reprojection_jacobian_blocks, xy_reprojection_error),
+                initial_param_estimate,
+                camera_indices=self.point_estimates.camera_param_indices,
+                point_indices=self.point_estimates.obj_indices,
+                n_cameras=self.point_estimates.n_cameras,
+                ftol=1e-8,
+                loss=loss,
+                f_scale=f_scale,
+                args=(self,),
+            )
+        else:
+            raise ValueError(f"Unknown bundle adjustment solver: {solver}")
+
     def get_xyz_points(self):
         """Get 3d positions arrived at by bundle adjustment"""
         n_cameras = len(self.camera_array.cameras)
@@ -143,6 +256,55 @@ class CaptureVolume:
         self.shift_origin(origin_transform)
 
 
+@jit(nopython=True, parallel=True, cache=True)
+def _xy_reprojection_error(
+    rotations: np.ndarray,
+    translations: np.ndarray,
+    intrinsics: np.ndarray,
+    distortions: np.ndarray,
+    points_3d: np.ndarray,
+    camera_param_indices: np.ndarray,
+    obj_indices: np.ndarray,
+    img: np.ndarray,
+    xy_error: np.ndarray,
+):
+    """
+    Writes the x,y reprojection error of each observation into xy_error (shape (2n,)).
+
+    Follows the pinhole and Brown-Conrady model of cv2.projectPoints: intrinsics rows are (fx, fy, cx, cy)
+    and distortion rows are (k1, k2, p1, p2, k3). Rotation matrices, translations and intrinsics are
+    indexed by camera_param_indices.
+    """
+    for obs in prange(obj_indices.shape[0]):
+        cam = camera_param_indices[obs]
+        point = obj_indices[obs]
+        R = rotations[cam]
+        X = points_3d[point, 0]
+        Y = points_3d[point, 1]
+        Z = points_3d[point, 2]
+
+        x = R[0, 0] * X + R[0, 1] * Y + R[0, 2] * Z + translations[cam, 0]
+        y = R[1, 0] * X + R[1, 1] * Y + R[1, 2] * Z + translations[cam, 1]
+        z = R[2, 0] * X + R[2, 1] * Y + R[2, 2] * Z + translations[cam, 2]
+        # opencv leaves points on the camera plane unscaled rather than dividing by zero
+        if z != 0.0:
+            x /= z
+            y /= z
+
+        k1 = distortions[cam, 0]
+        k2 = distortions[cam, 1]
+        p1 = distortions[cam, 2]
+        p2 = distortions[cam, 3]
+        k3 = distortions[cam, 4]
+        r2 = x * x + y * y
+        radial = 1.0 + r2 * (k1 + r2 * (k2 + r2 * k3))
+        x_distorted = x * radial + 2.0 * p1 * x * y + p2 * (r2 + 2.0 * x * x)
+        y_distorted = y * radial + p1 * (r2 + 2.0 * y * y) + 2.0 * p2 * x * y
+
+        xy_error[2 * obs] = intrinsics[cam, 0] * x_distorted + intrinsics[cam, 2] - img[obs, 0]
+        xy_error[2 * obs + 1] = intrinsics[cam, 1] * y_distorted + intrinsics[cam, 3] - img[obs, 1]
+
+
 def xy_reprojection_error(current_param_estimates, capture_volume: CaptureVolume):
     """
     current_param_estimates:
@@ -151,64 +313,114 @@ def xy_reprojection_error(current_param_estimates, capture_volume: CaptureVolume
     This function exists outside of the CaptureVolume class because the first argument must be the vector of parameters
     that is being adjusted by the least_squares optimization.
 
+    Returns the x,y reprojection error of each observation as a single vector (x0, y0, x1, y1, ...).
     """
-    # Create one combined array primarily to make sure all calculations line up
-    ## unpack the working estimates of the camera parameters (could be extr. or intr.)
-    camera_params = current_param_estimates[: capture_volume.point_estimates.n_cameras * CAMERA_PARAM_COUNT].reshape(
-        (capture_volume.point_estimates.n_cameras, CAMERA_PARAM_COUNT)
+    point_estimates = capture_volume.point_estimates
+    camera_array = capture_volume.camera_array
+    n_cameras = point_estimates.n_cameras
+
+    ## unpack the working estimates of the camera parameters and the 3d point locations
+    camera_params = current_param_estimates[: n_cameras * CAMERA_PARAM_COUNT].reshape((n_cameras, CAMERA_PARAM_COUNT))
+    points_3d = current_param_estimates[n_cameras * CAMERA_PARAM_COUNT :].reshape((point_estimates.n_obj_points, 3))
+
+    # gather the parameters of each camera observing the points, in the order of point_estimates.camera_param_indices
+    ports = point_estimates.camera_groups.keys()
+    rotations = np.empty((len(ports), 3, 3))
+    translations = np.empty((len(ports), 3))
+    intrinsics = np.empty((len(ports), 4))
+    distortions = np.zeros((len(ports), 5))
+    for i, port in enumerate(ports):
+        # if a camera is being ignored, it will not show up on the parameter list
+        # so you must use the port index to make sure you read the correct params
+        port_index = camera_array.port_index[port]
+        rotations[i] = cv2.Rodrigues(camera_params[port_index, 0:3])[0]
+        translations[i] = camera_params[port_index, 3:6]
+
+        cam = camera_array.cameras[port]
+        intrinsics[i] = cam.matrix[0, 0], cam.matrix[1, 1], cam.matrix[0, 2], cam.matrix[1, 2]
+        camera_distortions = np.ravel(cam.distortions)[:5]
+        distortions[i, : len(camera_distortions)] = camera_distortions
+
+    xy_error = np.empty(2 * point_estimates.n_img_points)
+    _xy_reprojection_error(
+        rotations,
+        translations,
+        intrinsics,
+        distortions,
+        np.ascontiguousarray(points_3d),
+        point_estimates.camera_param_indices,
+        point_estimates.obj_indices,
+        point_estimates.img,
+        xy_error,
     )
 
-    ## similarly unpack the 3d point location estimates
-    points_3d = current_param_estimates[capture_volume.point_estimates.n_cameras * CAMERA_PARAM_COUNT :].reshape(
-        (capture_volume.point_estimates.n_obj_points, 3)
-    )
+    return xy_error
 
-    ## create zero columns as placeholders for the reprojected 2d points
-    rows = capture_volume.point_estimates.camera_indices.shape[0]
-    blanks = np.zeros((rows, 2), dtype=np.float64)
-
-    ## hstack all these arrays for ease of reference
-    points_3d_and_2d = np.hstack(
-        [
-            np.array([capture_volume.point_estimates.camera_indices]).T,
-            points_3d[capture_volume.point_estimates.obj_indices],
-            capture_volume.point_estimates.img,
-            blanks,
-        ]
-    )
 
-    # iterate across cameras...while this injects a loop in the residual function
-    # it should scale linearly with the number of cameras...a tradeoff for stable
-    # and explicit calculations...
+def xy_reprojection_jacobian_blocks(current_param_estimates, capture_volume: CaptureVolume) -> np.ndarray:
+    """
+    Nonzero blocks of the jacobian of `xy_reprojection_error`, shape (observation, x/y, 9), where the last axis
+    holds the 6 parameters of the observation's camera followed by the 3 coordinates of its object point.
 
-    for port, cam in capture_volume.camera_array.cameras.items():
-        cam_points = np.where(capture_volume.point_estimates.camera_indices == port)
-        object_points = points_3d_and_2d[cam_points][:, 1:4]
+    Each 2d observation depends only on the 6 extrinsic parameters of its camera and the 3 coordinates of its
+    object point. The camera block comes directly from the jacobian returned by cv2.projectPoints. Because the
+    point in the camera frame is R @ X + t, the derivative with respect to the world point X is the derivative
+    with respect to t rotated by R, so the point block comes from the same call.
 
-        # if a camera is being ignored, it will not show up on the parameter list
-        # so you must use the port index to make sure you read the correct params
+    The camera blocks of any capture_volume.fixed_ports are left at zero so that the solvers do not move them.
+    """
+    point_estimates = capture_volume.point_estimates
+    n_cameras = point_estimates.n_cameras
+
+    camera_params = current_param_estimates[: n_cameras * CAMERA_PARAM_COUNT].reshape((n_cameras, CAMERA_PARAM_COUNT))
+    points_3d = current_param_estimates[n_cameras * CAMERA_PARAM_COUNT :].reshape((point_estimates.n_obj_points, 3))
+
+    n_img_points = point_estimates.n_img_points
+    # (observation, x/y, 6 camera parameters followed by 3 point coordinates)
+    jacobian_values = np.zeros((n_img_points, 2, CAMERA_PARAM_COUNT + 3))
+
+    for port, cam_points in point_estimates.camera_groups.items():
+        cam = capture_volume.camera_array.cameras[port]
         port_index = capture_volume.camera_array.port_index[port]
-        cam_matrix = cam.matrix
         rvec = camera_params[port_index][0:3]
         tvec = camera_params[port_index][3:6]
-        distortions = cam.distortions
+        object_points = points_3d[point_estimates.obj_indices[cam_points]]
+
+        # columns of the opencv jacobian are rvec, tvec, focal length, principal point, distortions
+        _proj, cam_jacobian = cv2.projectPoints(
+            object_points.astype(np.float64), rvec, tvec, cam.matrix, cam.distortions
+        )
+        cam_jacobian = cam_jacobian.reshape(-1, 2, cam_jacobian.shape[1])
+
+        rotation = cv2.Rodrigues(rvec)[0]
+        if port not in capture_volume.fixed_ports:
+            jacobian_values[cam_points, :, :CAMERA_PARAM_COUNT] = cam_jacobian[:, :, :CAMERA_PARAM_COUNT]
+        jacobian_values[cam_points, :, CAMERA_PARAM_COUNT:] = cam_jacobian[:, :, 3:6] @ rotation
 
-        # get the projection of the 2d points on the image plane; ignore the jacobian
-        cam_proj_points, _jac = cv2.projectPoints(object_points.astype(np.float64), rvec, tvec, cam_matrix, distortions)
+    return jacobian_values
 
-        points_3d_and_2d[cam_points, 6:8] = cam_proj_points[:, 0, :]
 
-    points_proj = points_3d_and_2d[:, 6:8]
+def xy_reprojection_jacobian(current_param_estimates, capture_volume: CaptureVolume) -> csr_matrix:
+    """Analytic sparse jacobian of `xy_reprojection_error` with respect to the vectorized parameters."""
+    point_estimates = capture_volume.point_estimates
+    jacobian_values = xy_reprojection_jacobian_blocks(current_param_estimates, capture_volume)
 
-    xy_reprojection_error = (points_proj - capture_volume.point_estimates.img).ravel()
-    # capture_volume.rmse = rms_reproj_error(xy_reprojection_error)
-    # if round(perf_counter(), 2) * 10 % 1 == 0: # log less frequently
-    #     logger.info(
-    #         f"Optimizing... RMSE of reprojection = {capture_volume.rmse}"
-    #     )
+    indices, indptr = point_estimates.get_jacobian_structure()
+    shape = (2 * point_estimates.n_img_points, len(current_param_estimates))
+    return csr_matrix((jacobian_values.ravel(), indices, indptr), shape=shape)
+
+
+def robust_loss_scale(xy_reproj_error: np.ndarray, loss: str) -> float:
+    """
+    f_scale for a robust loss, from the standard deviation of the x,y reprojection errors estimated
+    with the median absolute deviation so that the outliers themselves do not inflate it.
+    """
+    deviation = np.abs(xy_reproj_error - np.median(xy_reproj_error))
+    sigma = 1.4826 * np.median(deviation)
+    if sigma == 0:
+        sigma = 1.0
 
-    # reshape the x,y reprojection error to a single vector
-    return xy_reprojection_error
+    return ROBUST_LOSS_TUNING[loss] * sigma
 
 
 def rms_reproj_error(xy_reproj_error, camera_indices):
@@ -216,16 +428,15 @@ def rms_reproj_error(xy_reproj_error, camera_indices):
     Returns a dictionary that shows the
     """
     rmse = {}
-    xy_reproj_error = xy_reproj_error.reshape(-1, 2)
-    euclidean_distance_error = np.sqrt(np.sum(xy_reproj_error**2, axis=1))
-    rmse["overall"] = np.sqrt(np.mean(euclidean_distance_error**2))
-
-    for port in np.unique(camera_indices):
-        camera_errors = euclidean_distance_error[camera_indices == port]
-        rmse[str(port)] = np.sqrt(np.mean(camera_errors**2))
-    # for port in camera_indices
-    # logger.info(f"Optimization run with {xy_reproj_error.shape[0]} image points")
-    # logger.info(f"RMSE of reprojection is {rmse}")
+    squared_distance_error = np.sum(xy_reproj_error.reshape(-1, 2) ** 2, axis=1)
+    rmse["overall"] = np.sqrt(np.mean(squared_distance_error))
+
+    # a single pass over the observations rather than a mask per camera
+    ports, camera_param_indices = np.unique(camera_indices, return_inverse=True)
+    camera_sum = np.bincount(camera_param_indices, weights=squared_distance_error)
+    camera_count = np.bincount(camera_param_indices)
+    for port, camera_rmse in zip(ports, np.sqrt(camera_sum / camera_count)):
+        rmse[str(port)] = camera_rmse
     return rmse
 
 
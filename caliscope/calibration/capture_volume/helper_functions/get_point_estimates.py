@@ -7,6 +7,9 @@ import caliscope.logger
 from caliscope.calibration.capture_volume.helper_functions.get_stereotriangulated_table import (
     get_stereotriangulated_table,
 )
+from caliscope.calibration.capture_volume.helper_functions.subsample_point_estimates import (
+    subsample_point_estimates,
+)
 from caliscope.calibration.capture_volume.point_estimates import PointEstimates
 from caliscope.cameras.camera_array import CameraArray
 
@@ -74,10 +77,15 @@ def get_merged_2d_3d(stereotriangulated_table):
     return merged_point_data
 
 
-def get_point_estimates(camera_array: CameraArray, point_data_path: Path) -> PointEstimates:
+def get_point_estimates(
+    camera_array: CameraArray, point_data_path: Path, max_observations: int | None = None
+) -> PointEstimates:
     """
     formats the triangulated_points.csv file into a PointEstimateData that has the
     data structured in a way that is amenable to bundle adjustment
+
+    If max_observations is provided, a subset of board views that covers the capture volume
+    and each camera's image is kept (see `subsample_point_estimates`)
     """
 
     logger.info("Creating point history object based on camera_array and stereotriangulated_table")
@@ -94,7 +102,7 @@ def get_point_estimates(camera_array: CameraArray, point_data_path: Path) -> Poi
     obj = np.array(points_3d_df[["x_3d", "y_3d", "z_3d"]])
     # obj_corner_id = np.array(points_3d_df[["corner_id"]])
 
-    return PointEstimates(
+    point_estimates = PointEstimates(
         sync_indices=sync_index,
         camera_indices=camera_indices,
         point_id=corner_id,
@@ -103,3 +111,8 @@ def get_point_estimates(camera_array: CameraArray, point_data_path: Path) -> Poi
         obj=obj,
         # obj_corner_id=obj_corner_id,
     )
+
+    if max_observations is not None:
+        subsample_point_estimates(point_estimates, camera_array, max_observations)
+
+    return point_estimates
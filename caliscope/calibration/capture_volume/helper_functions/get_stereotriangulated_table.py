@@ -4,100 +4,43 @@
 # things into a PointHistory object that can be used to optimize the CaptureVolume
 from pathlib import Path
 
-import numpy as np
 import pandas as pd
 
 import caliscope.logger
 from caliscope.cameras.camera_array import CameraArray
-from caliscope.packets import FramePacket, PointPacket, SyncPacket
 from caliscope.triangulate.array_stereo_triangulator import ArrayStereoTriangulator
-from caliscope.triangulate.stereo_points_builder import (
-    StereoPointsBuilder,
-    StereoPointsPacket,
-    SynchedStereoPointsPacket,
-)
+from caliscope.triangulate.stereo_points_builder import StereoPointsBuilder
 
 logger = caliscope.logger.get(__name__)
 
 
-def get_stereotriangulated_table(camera_array: CameraArray, point_data_path: Path) -> pd.DataFrame:
+def get_stereotriangulated_table(
+    camera_array: CameraArray, point_data_path: Path, save_to_csv: bool = True
+) -> pd.DataFrame:
+    """
+    Triangulate every point observed by a pair of cameras, independently for each pair.
+
+    save_to_csv: if True, the table is also written to stereotriangulated_points.csv alongside the
+    point data for inspection
+    """
     logger.info(f"Beginning to create stereotriangulated points from data stored at {point_data_path}")
     point_data = pd.read_csv(point_data_path)
 
-    xy_sync_indices = point_data["sync_index"].to_numpy()
-    sync_indices = np.unique(xy_sync_indices)
-
-    # xy_camera_indices = point_data["port"].to_numpy()
-    # ports = np.unique(xy_camera_indices)
+    # pull ports from camera_array.port_index to ensure only non-ignored cameras are processed
     ports = [key for key in camera_array.port_index.keys()]
 
     paired_point_builder = StereoPointsBuilder(ports)
-
-    # Create the infrastructure for the pairwise triangulation
     array_triangulator = ArrayStereoTriangulator(camera_array)
-    stereotriangulated_table = None
-
-    logger.info("Begin reconstructing SyncPackets and SynchedStereoPairs... ")
-    for sync_index in sync_indices:
-        if sync_index % 25 == 0:
-            logger.info(f"Processing stereotriangulation estimates...currently at sync index {sync_index}")
-        # pull in the data that shares the same sync index
-        port_points = point_data.query(f"sync_index == {sync_index}")
-
-        # initialize a dict to hold all the frame packets
-        frame_packets = {}
-
-        for port in ports:
-            # Create the Frame packet for each port at this sync_index
-            # and roll up into dictionary
-            if port in port_points["port"].unique():
-                points = port_points.query(f"port == {port}")
-                frame_time = points["frame_time"].iloc[0]
-                frame_index = points["frame_index"].iloc[0]
-
-                point_id = points["point_id"].to_numpy()
-
-                img_loc_x = points["img_loc_x"].to_numpy()
-                img_loc_y = points["img_loc_y"].to_numpy()
-                img_loc = np.vstack([img_loc_x, img_loc_y]).T
-
-                obj_loc_x = points["obj_loc_x"].to_numpy()
-                obj_loc_y = points["obj_loc_y"].to_numpy()
-                obj_loc = np.vstack([obj_loc_x, obj_loc_y]).T
-
-                point_packet = PointPacket(point_id, img_loc, obj_loc)
-                frame_packet = FramePacket(
-                    port=port,
-                    frame_index=frame_index,
-                    frame_time=frame_time,
-                    frame=None,
-                    points=point_packet,
-                )
-                frame_packets[port] = frame_packet
-            else:
-                frame_packets[port] = None
-
-        # create the sync packet for this sync index
-        sync_packet = SyncPacket(sync_index, frame_packets)
 
-        # get the paired point packets for all port pairs at this sync index
-        synched_stereo_points: SynchedStereoPointsPacket = paired_point_builder.get_synched_paired_points(sync_packet)
-        # print(synched_paired_points)
-        array_triangulator.triangulate_synched_points(synched_stereo_points)
+    logger.info("Joining observations shared by each pair of cameras...")
+    stereo_points_table = paired_point_builder.get_stereo_points_table(point_data)
 
-        for pair in synched_stereo_points.pairs:
-            triangulated_pair: StereoPointsPacket = synched_stereo_points.stereo_points_packets[pair]
-            if triangulated_pair is not None:
-                if stereotriangulated_table is None:
-                    stereotriangulated_table = triangulated_pair.to_table()
-                else:
-                    new_table = triangulated_pair.to_table()
-                    for key, value in new_table.items():
-                        stereotriangulated_table[key].extend(value)
+    logger.info(f"Triangulating {len(stereo_points_table)} stereo pair observations")
+    stereotriangulated_table = array_triangulator.triangulate_stereo_points_table(stereo_points_table)
 
-    logger.info(f"Saving stereotriangulated_points.csv to {point_data_path.parent} for inspection")
-    stereotriangulated_table = pd.DataFrame(stereotriangulated_table)
-    stereotriangulated_table.to_csv(Path(point_data_path.parent, "stereotriangulated_points.csv"))
+    if save_to_csv:
+        logger.info(f"Saving stereotriangulated_points.csv to {point_data_path.parent} for inspection")
+        stereotriangulated_table.to_csv(Path(point_data_path.parent, "stereotriangulated_points.csv"))
 
     logger.info("Returning dataframe of stereotriangulated points to caller")
 
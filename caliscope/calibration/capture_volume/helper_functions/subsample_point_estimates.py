@@ -0,0 +1,147 @@
+import heapq
+
+import numpy as np
+
+import caliscope.logger
+from caliscope.calibration.capture_volume.point_estimates import PointEstimates
+from caliscope.cameras.camera_array import CameraArray
+
+logger = caliscope.logger.get(__name__)
+
+POSITION_BINS = 4  # per axis of the box spanned by the board positions
+ORIENTATION_RESOLUTION = 2  # board normals are rounded to a grid with this many steps per unit length
+IMAGE_BINS = 4  # per axis of each camera's image
+
+# feature families describing what a board view adds to the calibration
+POSITION, ORIENTATION, IMAGE = 0, 1, 2
+
+
+def get_board_view_features(
+    point_estimates: PointEstimates, camera_array: CameraArray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Describe each board view (all observations at one sync index) by the coverage it provides: the region
+    of the capture volume holding the board, the orientation of the board, and the region of each camera's
+    image in which the board corners appear.
+
+    Returns the sync index of each view along with the feature ids of the views in CSR layout, so that the
+    features of view i are feature_ids[feature_ptr[i] : feature_ptr[i + 1]]
+    """
+    view_sync_indices, observation_views = np.unique(point_estimates.sync_indices, return_inverse=True)
+    n_views = len(view_sync_indices)
+
+    # object points each belong to a single sync index; any without observations are sorted past the last view
+    obj_views = np.full(point_estimates.n_obj_points, n_views, dtype=np.int64)
+    obj_views[point_estimates.obj_indices] = observation_views
+    obj_order = np.argsort(obj_views, kind="stable")
+    obj_bounds = np.searchsorted(obj_views[obj_order], np.arange(n_views + 1))
+
+    centroids = np.empty((n_views, 3))
+    normals = np.zeros((n_views, 3), dtype=np.int64)
+    has_normal = np.zeros(n_views, dtype=bool)
+    for view in range(n_views):
+        board_xyz = point_estimates.obj[obj_order[obj_bounds[view] : obj_bounds[view + 1]]]
+        centroids[view] = board_xyz.mean(axis=0)
+        if len(board_xyz) < 3:
+            continue
+
+        _, singular_values, vh = np.linalg.svd(board_xyz - centroids[view], full_matrices=False)
+        if singular_values[1] < 1e-6 * singular_values[0]:
+            continue  # the corners are collinear so the board plane is undetermined
+
+        normal = vh[2] * np.sign(vh[2][np.argmax(np.abs(vh[2]))])
+        normals[view] = np.round(normal * ORIENTATION_RESOLUTION)
+        has_normal[view] = True
+
+    low, high = centroids.min(axis=0), centroids.max(axis=0)
+    span = np.where(high > low, high - low, 1.0)
+    position_cells = np.clip(((centroids - low) / span * POSITION_BINS).astype(np.int64), 0, POSITION_BINS - 1)
+
+    ports, observation_ports = np.unique(point_estimates.camera_indices, return_inverse=True)
+    image_size = np.array([camera_array.cameras[port].size for port in ports], dtype=float)[observation_ports]
+    image_cells = np.clip((point_estimates.img / image_size * IMAGE_BINS).astype(np.int64), 0, IMAGE_BINS - 1)
+
+    # rows of (view, family, key...) so that every distinct feature gets its own id
+    features = np.vstack(
+        [
+            np.column_stack([np.arange(n_views), np.full(n_views, POSITION), position_cells]),
+            np.column_stack([np.flatnonzero(has_normal), np.full(has_normal.sum(), ORIENTATION), normals[has_normal]]),
+            np.column_stack(
+                [
+                    observation_views,
+                    np.full(len(observation_views), IMAGE),
+                    point_estimates.camera_indices,
+                    image_cells,
+                ]
+            ),
+        ]
+    )
+    features = np.unique(features, axis=0)  # a view counts each feature once
+    _, feature_ids = np.unique(features[:, 1:], axis=0, return_inverse=True)
+    feature_ptr = np.searchsorted(features[:, 0], np.arange(n_views + 1))
+
+    return view_sync_indices, feature_ids.ravel(), feature_ptr
+
+
+def select_board_views(
+    feature_ids: np.ndarray, feature_ptr: np.ndarray, view_sizes: np.ndarray, max_observations: int
+) -> np.ndarray:
+    """
+    Greedily pick board views until max_observations would be exceeded. Each view is scored by the sum of
+    1/(1 + n) over its features, where n is the number of already selected views sharing that feature, so
+    views covering new ground come first and repeated views of the same ground are taken last.
+
+    Scores can only decrease as views are selected, so a stale score from the heap is an upper bound and
+    only the view at the top needs to be rescored (lazy greedy evaluation).
+
+    Returns the indices of the selected views
+    """
+    feature_counts = np.zeros(feature_ids.max() + 1 if len(feature_ids) else 0)
+
+    def score(view: int) -> float:
+        return np.sum(1 / (1 + feature_counts[feature_ids[feature_ptr[view] : feature_ptr[view + 1]]]))
+
+    heap = [(-score(view), view) for view in range(len(view_sizes))]
+    heapq.heapify(heap)
+
+    selected = []
+    remaining = max_observations
+    while heap and remaining > 0:
+        _, view = heapq.heappop(heap)
+        if view_sizes[view] > remaining:
+            continue
+
+        current_score = score(view)
+        if heap and current_score < -heap[0][0]:
+            heapq.heappush(heap, (-current_score, view))
+            continue
+
+        selected.append(view)
+        remaining -= view_sizes[view]
+        feature_counts[feature_ids[feature_ptr[view] : feature_ptr[view + 1]]] += 1
+
+    return np.sort(np.array(selected, dtype=np.int64))
+
+
+def subsample_point_estimates(point_estimates: PointEstimates, camera_array: CameraArray, max_observations: int):
+    """
+    Reduce the point estimates in place to at most max_observations image points, keeping whole board views
+    chosen to cover the capture volume, the range of board orientations and the image of each camera.
+    Consecutive frames of a slowly moving board are nearly identical, so they add cost to bundle adjustment
+    without adding much information.
+    """
+    initial_count = point_estimates.n_img_points
+    if initial_count <= max_observations:
+        return
+
+    view_sync_indices, feature_ids, feature_ptr = get_board_view_features(point_estimates, camera_array)
+    view_sizes = np.bincount(np.searchsorted(view_sync_indices, point_estimates.sync_indices))
+    selected_views = select_board_views(feature_ids, feature_ptr, view_sizes, max_observations)
+
+    keep = np.isin(point_estimates.sync_indices, view_sync_indices[selected_views])
+    point_estimates.filter_observations(keep)
+
+    logger.info(
+        f"Subsampled {len(selected_views)} of {len(view_sync_indices)} board views for bundle adjustment, "
+        f"keeping {point_estimates.n_img_points} of {initial_count} observations"
+    )
@@ -0,0 +1,177 @@
+"""
+Update an existing calibration when cameras or extrinsic recordings are added, rather than repeating the
+stereocalibration of every pair and the bundle adjustment of the whole capture volume from scratch.
+"""
+
+from pathlib import Path
+from typing import Callable
+
+import cv2
+import numpy as np
+import pandas as pd
+
+import caliscope.logger
+from caliscope.calibration.capture_volume.capture_volume import CaptureVolume
+from caliscope.calibration.capture_volume.helper_functions.get_point_estimates import get_point_estimates
+from caliscope.calibration.capture_volume.point_estimates import PointEstimates
+from caliscope.calibration.capture_volume.progress_monitor import BundleAdjustmentProgress
+from caliscope.cameras.camera_array import CameraArray
+from caliscope.triangulate.triangulation import triangulate_xy
+
+logger = caliscope.logger.get(__name__)
+
+MIN_PNP_POINTS = 6
+PNP_REPROJECTION_THRESHOLD = 8.0  # pixels
+
+
+def get_uncalibrated_ports(camera_array: CameraArray) -> list[int]:
+    """ports of the cameras in use that do not yet have extrinsics"""
+    return [
+        port
+        for port in camera_array.port_index.keys()
+        if camera_array.cameras[port].rotation is None or camera_array.cameras[port].translation is None
+    ]
+
+
+def initialize_camera_pose(camera_array: CameraArray, port: int, xy: pd.DataFrame):
+    """
+    Estimate the extrinsics of the camera at port from its view of points that are triangulated by the
+    cameras that are already calibrated (a perspective-n-point problem), and set them on the camera.
+    """
+    uncalibrated_ports = get_uncalibrated_ports(camera_array)
+    calibrated_array = CameraArray(
+        {
+            p: cam
+            for p, cam in camera_array.cameras.items()
+            if p in camera_array.port_index and p not in uncalibrated_ports
+        }
+    )
+
+    calibrated_xy = xy[xy["port"].isin(calibrated_array.cameras.keys())]
+    xyz = triangulate_xy(calibrated_xy, calibrated_array)
+    port_xy = xy[xy["port"] == port].merge(xyz, on=["sync_index", "point_id"])
+
+    if len(port_xy) < MIN_PNP_POINTS:
+        raise ValueError(
+            f"Camera {port} shares only {len(port_xy)} points with the calibrated cameras; "
+            f"at least {MIN_PNP_POINTS} are needed to locate it"
+        )
+
+    camera = camera_array.cameras[port]
+    object_points = port_xy[["x_coord", "y_coord", "z_coord"]].to_numpy(dtype=np.float64)
+    image_points = port_xy[["img_loc_x", "img_loc_y"]].to_numpy(dtype=np.float64)
+    success, rvec, tvec, inliers = cv2.solvePnPRansac(
+        object_points,
+        image_points,
+        camera.matrix,
+        camera.distortions,
+        reprojectionError=PNP_REPROJECTION_THRESHOLD,
+    )
+    if not success:
+        raise ValueError(f"Unable to locate camera {port} from the {len(port_xy)} points it shares with the others")
+
+    camera.rotation = cv2.Rodrigues(rvec)[0]
+    camera.translation = tvec.ravel()
+    logger.info(f"Initialized camera {port} from {len(inliers)} of {len(port_xy)} shared points")
+
+
+def merge_point_estimates(
+    point_estimates: PointEstimates, new_point_estimates: PointEstimates, sync_offset: int | None = None
+) -> PointEstimates:
+    """
+    Combine the point estimates of two recordings, or two sets of observations from the same recording.
+
+    By default the sync indices of the new point estimates are shifted past those already in use so that
+    the board views of two recordings remain distinct. For observations from the same recording (e.g. once
+    a camera has been added to it), pass a sync_offset of 0: any observation of a sync index, camera and
+    point that is already present is dropped, and the remaining observations of points that are already
+    estimated are attached to the existing object points.
+    """
+    if sync_offset is None:
+        sync_offset = int(point_estimates.sync_indices.max()) + 1 if point_estimates.n_img_points > 0 else 0
+
+    keys = ["sync_index", "camera", "point_id"]
+    existing = pd.DataFrame(
+        {
+            "sync_index": point_estimates.sync_indices.astype(np.int64),
+            "camera": point_estimates.camera_indices.astype(np.int64),
+            "point_id": point_estimates.point_id.astype(np.int64),
+            "obj_index": point_estimates.obj_indices.astype(np.int64),
+        }
+    )
+    new = pd.DataFrame(
+        {
+            "sync_index": new_point_estimates.sync_indices.astype(np.int64) + sync_offset,
+            "camera": new_point_estimates.camera_indices.astype(np.int64),
+            "point_id": new_point_estimates.point_id.astype(np.int64),
+            "new_obj_index": new_point_estimates.obj_indices.astype(np.int64),
+        }
+    )
+
+    duplicate = new.merge(existing[keys].assign(duplicate=True), how="left", on=keys)["duplicate"].notna()
+    if duplicate.any():
+        logger.info(f"Dropping {duplicate.sum()} observations that are already in the point estimates")
+    keep = ~duplicate.to_numpy()
+
+    # a left merge preserves the order of the new observations
+    existing_points = existing[["sync_index", "point_id", "obj_index"]].drop_duplicates(["sync_index", "point_id"])
+    new = new[keep].merge(existing_points, how="left", on=["sync_index", "point_id"])
+    unmatched = new["obj_index"].isna().to_numpy()
+    new_obj_index = new["new_obj_index"].to_numpy()
+
+    # object points seen only in the new observations are appended to those already estimated
+    added_obj = np.unique(new_obj_index[unmatched])
+    obj_remap = np.full(new_point_estimates.n_obj_points, -1, dtype=np.int64)
+    obj_remap[added_obj] = point_estimates.n_obj_points + np.arange(len(added_obj))
+    obj_indices = np.where(unmatched, obj_remap[new_obj_index], new["obj_index"].fillna(-1).to_numpy(np.int64))
+
+    return PointEstimates(
+        sync_indices=np.concatenate([point_estimates.sync_indices, new["sync_index"].to_numpy()]),
+        camera_indices=np.concatenate([point_estimates.camera_indices, new["camera"].to_numpy()]),
+        point_id=np.concatenate([point_estimates.point_id, new["point_id"].to_numpy()]),
+        img=np.vstack([point_estimates.img, new_point_estimates.img[keep]]),
+        obj_indices=np.concatenate([point_estimates.obj_indices, obj_indices]),
+        obj=np.vstack([point_estimates.obj, new_point_estimates.obj[added_obj]]),
+    )
+
+
+def calibrate_incrementally(
+    camera_array: CameraArray,
+    point_data_path: Path,
+    point_estimates: PointEstimates | None = None,
+    solver: str = "schur",
+    max_observations: int | None = None,
+    sync_offset: int | None = None,
+    callback: Callable[[BundleAdjustmentProgress], bool | None] = None,
+) -> CaptureVolume:
+    """
+    Extend a calibrated camera array with the observations recorded at point_data_path.
+
+    Cameras without extrinsics are first located against the points triangulated by the calibrated cameras.
+    The new observations are then triangulated and appended to the existing point_estimates (if provided).
+    Bundle adjustment first fits the new cameras and points with the previously calibrated cameras held in
+    place, which brings the new data into agreement with the existing solution, and then refines everything
+    jointly starting from that point.
+
+    sync_offset is passed to `merge_point_estimates`; use 0 when point_data_path holds the recording that
+    point_estimates came from (e.g. re-tracked to include an added camera). callback is passed to
+    `CaptureVolume.optimize`.
+    """
+    previously_calibrated = [port for port in camera_array.port_index.keys()]
+    xy = pd.read_csv(point_data_path)
+
+    for port in get_uncalibrated_ports(camera_array):
+        previously_calibrated.remove(port)
+        initialize_camera_pose(camera_array, port, xy)
+
+    new_point_estimates = get_point_estimates(camera_array, point_data_path, max_observations=max_observations)
+    if point_estimates is not None:
+        new_point_estimates = merge_point_estimates(point_estimates, new_point_estimates, sync_offset)
+
+    capture_volume = CaptureVolume(camera_array, new_point_estimates)
+    logger.info(f"Fitting new data to the calibration of cameras {previously_calibrated}")
+    capture_volume.optimize(solver=solver, fixed_ports=previously_calibrated, callback=callback)
+    logger.info("Refining all cameras jointly")
+    capture_volume.optimize(solver=solver, callback=callback)
+
+    return capture_volume
@@ -0,0 +1,60 @@
+"""
+Bundle adjust a camera array that has been initialized from the stereocalibration of its pairs.
+"""
+
+from copy import deepcopy
+from pathlib import Path
+from typing import Callable
+
+import caliscope.logger
+from caliscope.calibration.capture_volume.capture_volume import CaptureVolume
+from caliscope.calibration.capture_volume.helper_functions.get_point_estimates import get_point_estimates
+from caliscope.calibration.capture_volume.helper_functions.subsample_point_estimates import (
+    subsample_point_estimates,
+)
+from caliscope.calibration.capture_volume.progress_monitor import BundleAdjustmentProgress
+from caliscope.calibration.capture_volume.quality_controller import QualityController
+from caliscope.cameras.camera_array import CameraArray
+
+logger = caliscope.logger.get(__name__)
+
+
+def calibrate_capture_volume(
+    camera_array: CameraArray,
+    point_data_path: Path,
+    filtered_fraction: float,
+    loss: str = "cauchy",
+    max_observations: int | None = None,
+    callback: Callable[[BundleAdjustmentProgress], bool | None] = None,
+    rmse_tolerance: float = None,
+) -> CaptureVolume:
+    """
+    Fit the extrinsics of camera_array to the observations at point_data_path.
+
+    The cameras are fit in a single bundle adjustment with a robust loss, so outlying observations barely
+    move the solution. The worst fitting filtered_fraction of observations are then removed from it as a
+    post-pass; refitting the remainder would only repeat the robust solution at the cost of a second solve.
+    If max_observations is provided, only a subset of board views that covers the capture volume is used for
+    the fit (see `subsample_point_estimates`). The returned capture volume holds every board view regardless,
+    triangulated by the fitted cameras, so that any of them can be used to set the origin.
+    """
+    point_estimates = get_point_estimates(camera_array, point_data_path)
+
+    fit_point_estimates = deepcopy(point_estimates)
+    if max_observations is not None:
+        subsample_point_estimates(fit_point_estimates, camera_array, max_observations)
+
+    capture_volume = CaptureVolume(camera_array, fit_point_estimates)
+    capture_volume.optimize(solver="schur", loss=loss, callback=callback, rmse_tolerance=rmse_tolerance)
+
+    if fit_point_estimates.n_img_points < point_estimates.n_img_points:
+        logger.info("Triangulating the board views left out of bundle adjustment with the fitted cameras")
+        point_estimates = get_point_estimates(camera_array, point_data_path)
+        capture_volume = CaptureVolume(camera_array, point_estimates, stage=capture_volume.stage)
+        # with every camera held in place, each object point is fit independently of the others
+        capture_volume.optimize(solver="schur", loss=loss, fixed_ports=list(camera_array.port_index.keys()))
+
+    logger.info(f"Removing the worst fitting {filtered_fraction*100} percent of points from the model")
+    QualityController(capture_volume).filter_point_estimates(filtered_fraction)
+
+    return capture_volume
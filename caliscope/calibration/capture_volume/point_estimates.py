@@ -1,13 +1,19 @@
 from dataclasses import dataclass
+from typing import Callable
 
 import numpy as np
-from scipy.sparse import lil_matrix
+from scipy.sparse import csr_matrix
 
 import caliscope.logger
 
 logger = caliscope.logger.get(__name__)
 
 CAMERA_PARAM_COUNT = 6
+# each residual depends on the parameters of one camera and the coordinates of one object point
+PARAMS_PER_RESIDUAL = CAMERA_PARAM_COUNT + 3
+
+# the grouping of observations by camera and the structure of the bundle adjustment jacobian depend only on these
+OBSERVATION_ATTRIBUTES = frozenset(["camera_indices", "obj_indices"])
 
 
 @dataclass
@@ -26,6 +32,12 @@ class PointEstimates:
     obj: np.ndarray  # x,y,z estimates of object points
     # obj_corner_id: np.ndarray # the charuco corner ID of the xyz object point; is this necessary?
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in OBSERVATION_ATTRIBUTES:
+            # values derived from the previous observations are now stale
+            super().__setattr__("_cache", {})
+
     def __post_init__(self):
         self.sync_indices = self.sync_indices.astype(np.int32)
         self.camera_indices = self.camera_indices.astype(np.int16)
@@ -46,7 +58,64 @@ class PointEstimates:
     def n_img_points(self):
         return self.img.shape[0]
 
-    def get_sparsity_pattern(self):
+    def get_cached(self, key, build: Callable):
+        """
+        Returns the value stored under key, calling build() to create it if this is the first request
+        since the observations were last changed. Cached values should be treated as read-only.
+        """
+        # instances pickled before caching was introduced have no cache
+        cache = self.__dict__.setdefault("_cache", {})
+        if key not in cache:
+            cache[key] = build()
+        return cache[key]
+
+    @property
+    def camera_param_indices(self) -> np.ndarray:
+        """
+        For each observation, the index of its camera's parameter block in the vectorized parameters.
+        Cameras are assigned parameter blocks in sorted order of their port.
+        """
+        return self.get_cached(
+            "camera_param_indices",
+            lambda: np.unique(self.camera_indices, return_inverse=True)[1].astype(np.int32),
+        )
+
+    @property
+    def camera_groups(self) -> dict[int, np.ndarray]:
+        """Indices of the observations made by each camera, keyed by port"""
+
+        def build_camera_groups():
+            order = np.argsort(self.camera_param_indices, kind="stable")
+            ports = np.unique(self.camera_indices)
+            bounds = np.searchsorted(self.camera_param_indices[order], np.arange(len(ports) + 1))
+            return {int(port): order[bounds[i] : bounds[i + 1]] for i, port in enumerate(ports)}
+
+        return self.get_cached("camera_groups", build_camera_groups)
+
+    def get_jacobian_structure(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        CSR column indices and row pointers of the bundle adjustment jacobian, built once and then cached
+        until the observations change.
+
+        Rows 2*i and 2*i+1 hold the x and y residual of observation i. Each row has PARAMS_PER_RESIDUAL
+        entries: the parameters of the observation's camera followed by the coordinates of its object point.
+        """
+
+        def build_jacobian_structure():
+            camera_columns = self.camera_param_indices[:, None] * CAMERA_PARAM_COUNT + np.arange(CAMERA_PARAM_COUNT)
+            point_columns = (
+                self.n_cameras * CAMERA_PARAM_COUNT + self.obj_indices.astype(np.int64)[:, None] * 3 + np.arange(3)
+            )
+            # x and y residuals of an observation share the same columns
+            row_columns = np.hstack([camera_columns, point_columns])
+            indices = np.repeat(row_columns, 2, axis=0).ravel().astype(np.int32)
+            indptr = np.arange(0, len(indices) + 1, PARAMS_PER_RESIDUAL, dtype=np.int32)
+            return indices, indptr
+
+        # obj is replaced after each optimization, but the structure only depends on its size
+        return self.get_cached(("jacobian_structure", self.n_obj_points), build_jacobian_structure)
+
+    def get_sparsity_pattern(self) -> csr_matrix:
         """
         provide the sparsity structure for the Jacobian (elements that are not zero)
         n_points: number of unique 3d points
@@ -54,24 +123,29 @@ class PointEstimates:
 
         point_indices: a vector that maps the 2d points to their associated 3d point
         """
-
+        indices, indptr = self.get_jacobian_structure()
         m = self.camera_indices.size * 2
         n = self.n_cameras * CAMERA_PARAM_COUNT + self.n_obj_points * 3
-        A = lil_matrix((m, n), dtype=int)
-
-        i = np.arange(self.camera_indices.size)
-        for s in range(CAMERA_PARAM_COUNT):
-            A[2 * i, self.camera_indices * CAMERA_PARAM_COUNT + s] = 1
-            A[2 * i + 1, self.camera_indices * CAMERA_PARAM_COUNT + s] = 1
 
-        for s in range(3):
-            A[2 * i, self.n_cameras * CAMERA_PARAM_COUNT + self.obj_indices * 3 + s] = 1
-            A[
-                2 * i + 1,
-                self.n_cameras * CAMERA_PARAM_COUNT + self.obj_indices * 3 + s,
-            ] = 1
+        return csr_matrix((np.ones(len(indices), dtype=int), indices, indptr), shape=(m, n))
 
-        return A
+    def filter_observations(self, keep: np.ndarray):
+        """
+        Remove the observations where keep is False, in place. Object points left with fewer than two
+        observations can no longer be localized, so they are removed as well and the remaining object
+        points are renumbered in their original order.
+        """
+        obj_counts = np.bincount(self.obj_indices[keep], minlength=self.n_obj_points)
+        keep = keep & (obj_counts[self.obj_indices] > 1)
+        kept_obj = obj_counts > 1
+        new_obj_indices = np.cumsum(kept_obj) - 1
+
+        self.sync_indices = self.sync_indices[keep]
+        self.camera_indices = self.camera_indices[keep]
+        self.point_id = self.point_id[keep]
+        self.img = self.img[keep]
+        self.obj_indices = new_obj_indices[self.obj_indices[keep]].astype(np.int32)
+        self.obj = self.obj[kept_obj]
 
     def update_obj_xyz(self, least_sq_result_x):
         """
@@ -0,0 +1,130 @@
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable
+
+import numpy as np
+
+import caliscope.logger
+from caliscope.calibration.capture_volume.schur_solver import LOSS_FUNCTIONS
+
+logger = caliscope.logger.get(__name__)
+
+
+@dataclass
+class BundleAdjustmentProgress:
+    iteration: int  # accepted steps so far; 0 is the starting estimate
+    cost: float  # the cost being minimized, including any robust loss
+    rmse: dict  # reprojection RMSE overall and by camera (see rms_reproj_error)
+    elapsed: float  # seconds since the optimization began
+
+
+class StopBundleAdjustment(Exception):
+    """Raised from within the optimization to end it at the most recent estimate"""
+
+
+class ProgressMonitor:
+    """
+    Observes a bundle adjustment through the functions handed to the solver. Both solvers evaluate the
+    jacobian exactly once at each accepted estimate, just after evaluating the residuals there, so each
+    jacobian evaluation marks an iteration.
+
+    At every iteration the callback (if any) receives a BundleAdjustmentProgress and may return True to
+    cancel. The optimization is also stopped once max_iterations or max_time (seconds) is reached, or when
+    an iteration improves the overall RMSE by less than rmse_tolerance relative to the previous iteration.
+
+    get_rmse maps the residuals to the reprojection RMSE overall and by camera.
+    """
+
+    def __init__(
+        self,
+        get_rmse: Callable[[np.ndarray], dict],
+        loss: str = "linear",
+        f_scale: float = 1.0,
+        callback: Callable[[BundleAdjustmentProgress], bool | None] = None,
+        max_iterations: int = None,
+        max_time: float = None,
+        rmse_tolerance: float = None,
+    ):
+        self.get_rmse = get_rmse
+        self.loss_function = LOSS_FUNCTIONS[loss]
+        self.f_scale = f_scale
+        self.callback = callback
+        self.max_iterations = max_iterations
+        self.max_time = max_time
+        self.rmse_tolerance = rmse_tolerance
+
+        self.start_time = perf_counter()
+        self.iteration = -1
+        self.stop_reason = None
+        self.history: list[BundleAdjustmentProgress] = []
+
+        self.last_x = None
+        self.last_residual = None
+        self.reported_x = None
+        self.nfev = 0
+        self.njev = 0
+
+    def wrap_fun(self, fun: Callable) -> Callable:
+        def monitored_fun(x, *args):
+            residual = fun(x, *args)
+            self.nfev += 1
+            # copied as scipy rescales the residuals in place when using a robust loss
+            self.last_x, self.last_residual = x.copy(), residual.copy()
+            return residual
+
+        return monitored_fun
+
+    def wrap_jac(self, jac: Callable, fun: Callable) -> Callable:
+        def monitored_jac(x, *args):
+            if self.last_x is None or not np.array_equal(x, self.last_x):
+                self.last_x, self.last_residual = x.copy(), fun(x, *args)
+            self.njev += 1
+            self.update(x, self.last_residual)
+            return jac(x, *args)
+
+        return monitored_jac
+
+    def get_cost(self, residual: np.ndarray) -> float:
+        return 0.5 * self.f_scale**2 * np.sum(self.loss_function((residual / self.f_scale) ** 2)[0])
+
+    def record(self, x: np.ndarray, residual: np.ndarray) -> BundleAdjustmentProgress:
+        self.iteration += 1
+        self.reported_x = x.copy()
+        progress = BundleAdjustmentProgress(
+            iteration=self.iteration,
+            cost=self.get_cost(residual),
+            rmse=self.get_rmse(residual),
+            elapsed=perf_counter() - self.start_time,
+        )
+        self.history.append(progress)
+        logger.info(
+            f"Bundle adjustment iteration {progress.iteration}: cost {progress.cost:.6e}, "
+            f"RMSE {progress.rmse['overall']:.4f}, {progress.elapsed:.2f} s"
+        )
+        return progress
+
+    def finish(self, x: np.ndarray, residual: np.ndarray):
+        """report the final estimate if the solver ended without evaluating the jacobian there"""
+        if self.reported_x is None or not np.array_equal(x, self.reported_x):
+            progress = self.record(x, residual)
+            if self.callback is not None:
+                self.callback(progress)
+
+    def update(self, x: np.ndarray, residual: np.ndarray):
+        """record the progress at a new estimate and raise StopBundleAdjustment if the solve should end"""
+        progress = self.record(x, residual)
+
+        if self.callback is not None and self.callback(progress):
+            self.stop_reason = "The optimization was cancelled."
+        elif self.max_iterations is not None and progress.iteration >= self.max_iterations:
+            self.stop_reason = f"The iteration budget of {self.max_iterations} was reached."
+        elif self.max_time is not None and progress.elapsed >= self.max_time:
+            self.stop_reason = f"The time budget of {self.max_time} s was reached."
+        elif self.rmse_tolerance is not None and len(self.history) > 1:
+            previous_rmse = self.history[-2].rmse["overall"]
+            improvement = (previous_rmse - progress.rmse["overall"]) / previous_rmse
+            if improvement < self.rmse_tolerance:
+                self.stop_reason = f"The RMSE improved by less than {self.rmse_tolerance:.1e} in an iteration."
+
+        if self.stop_reason is not None:
+            raise StopBundleAdjustment(self.stop_reason)
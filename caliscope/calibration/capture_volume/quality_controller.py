@@ -9,7 +9,6 @@ from scipy import stats
 
 import caliscope.logger
 from caliscope.calibration.capture_volume.capture_volume import CaptureVolume, xy_reprojection_error
-from caliscope.calibration.capture_volume.point_estimates import PointEstimates
 from caliscope.calibration.charuco import Charuco
 
 logger = caliscope.logger.get(__name__)
@@ -272,40 +271,17 @@ class QualityController:
         return filtered_data_2d
 
     def filter_point_estimates(self, fraction_to_remove: float):
+        """
+        Remove the observations with the highest reprojection error (and any object points left with a single
+        observation) from the capture volume's point estimates. Uses the same percentile ranking as data_2d.
+        """
         percentile_cutoff = 1 - fraction_to_remove
-        filtered_data_2d = self.get_filtered_data_2d(percentile_cutoff)
-
-        objects_3d = (
-            filtered_data_2d.filter(["original_obj_id", "obj_x", "obj_y", "obj_z"])
-            .drop_duplicates()
-            .reset_index()
-            .drop("index", axis=1)
-            .reset_index()
-            .rename(columns={"index": "filtered_obj_id"})
-        )
 
-        old_new_mapping = objects_3d.filter(["filtered_obj_id", "original_obj_id"])
-
-        filtered_data_2d = filtered_data_2d.merge(old_new_mapping, how="right", on=["original_obj_id"])
-
-        # get revised point_estimates
-        sync_indices = filtered_data_2d["sync_index"].to_numpy()
-        camera_indices = filtered_data_2d["camera"].to_numpy()
-        point_id = filtered_data_2d["charuco_id"].to_numpy()
-        img = filtered_data_2d.filter(["img_x", "img_y"]).to_numpy()
-        obj_indices = filtered_data_2d["filtered_obj_id"].to_numpy()
-        obj = objects_3d.filter(["obj_x", "obj_y", "obj_z"]).to_numpy()
-
-        filtered_point_estimates = PointEstimates(
-            sync_indices=sync_indices,
-            camera_indices=camera_indices,
-            point_id=point_id,
-            img=img,
-            obj_indices=obj_indices,
-            obj=obj,
-        )
+        xy_error = self.capture_volume.get_xy_reprojection_error().reshape(-1, 2)
+        reproj_error = np.sqrt(np.sum(xy_error**2, axis=1))
+        reproj_error_percentile = stats.rankdata(reproj_error) * 100 / len(reproj_error)
 
-        self.capture_volume.point_estimates = filtered_point_estimates
+        self.capture_volume.point_estimates.filter_observations(reproj_error_percentile < percentile_cutoff * 100)
 
 
 def get_capture_volume(capture_volume_pkl_path: Path) -> CaptureVolume:
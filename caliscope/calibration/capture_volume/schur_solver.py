@@ -0,0 +1,365 @@
+"""
+Levenberg-Marquardt for bundle adjustment that exploits the camera/point block structure of the problem.
+
+Each observation's residual depends on one camera (6 parameters) and one object point (3 coordinates),
+so the normal equations take the form
+
+    [U   W] [dc]     [gc]
+    [W.T V] [dp] = - [gp]
+
+where U is block diagonal over cameras and V is block diagonal over points. The point update is
+eliminated with the Schur complement S = U - W V^-1 W.T, which is only (6 * n_cameras) square. Solving
+it is cheap regardless of the number of points, and each point is then recovered from its own 3x3 system.
+"""
+
+from typing import Callable
+
+import numpy as np
+from numba import jit
+from scipy.optimize import OptimizeResult
+
+import caliscope.logger
+
+logger = caliscope.logger.get(__name__)
+
+CAMERA_PARAM_COUNT = 6
+POINT_PARAM_COUNT = 3
+
+# points are eliminated in chunks to bound the memory used by the dense per-point blocks
+POINT_CHUNK_SIZE = 2**15
+
+# scaling of the damping term is clipped to this range, as in Ceres
+MIN_DIAGONAL = 1e-6
+MAX_DIAGONAL = 1e32
+
+# range of the damping factor; the search for a cost reducing step gives up beyond the maximum
+MIN_DAMPING = 1e-12
+MAX_DAMPING = 1e16
+
+EPS = np.finfo(float).eps
+
+
+def _linear_loss(z: np.ndarray) -> np.ndarray:
+    return np.vstack([z, np.ones_like(z), np.ones_like(z)])
+
+
+def _huber_loss(z: np.ndarray) -> np.ndarray:
+    inlier = z <= 1
+    rho = np.empty((3, z.size))
+    rho[0] = np.where(inlier, z, 2 * np.sqrt(z) - 1)
+    rho[1] = np.where(inlier, 1, 1 / np.sqrt(np.maximum(z, 1)))
+    rho[2] = inlier
+    return rho
+
+
+def _cauchy_loss(z: np.ndarray) -> np.ndarray:
+    return np.vstack([np.log1p(z), 1 / (1 + z), 1 / (1 + z)])
+
+
+# loss functions rho(z) of the squared scaled residual z, returned as rows of a (3, n) array holding rho, its
+# first derivative (as in scipy.optimize.least_squares) and the curvature given to each residual in the normal
+# equations. That is the exact second derivative of the loss with respect to the residual where it is
+# non-negative; cauchy is not convex, so its residuals are weighted by rho' as in reweighted least squares
+LOSS_FUNCTIONS = {"linear": _linear_loss, "huber": _huber_loss, "cauchy": _cauchy_loss}
+
+
+@jit(nopython=True, cache=True)
+def _accumulate_normal_equations(
+    jacobian_blocks: np.ndarray,
+    residual: np.ndarray,
+    camera_indices: np.ndarray,
+    point_indices: np.ndarray,
+    U: np.ndarray,
+    V: np.ndarray,
+    W: np.ndarray,
+    g_camera: np.ndarray,
+    g_point: np.ndarray,
+):
+    """
+    Adds each observation's contribution to the camera blocks U (n_cameras, 6, 6), the point blocks
+    V (n_points, 3, 3), the gradients g_camera and g_point and writes its own camera/point block W (n, 6, 3).
+    """
+    for obs in range(camera_indices.shape[0]):
+        camera = camera_indices[obs]
+        point = point_indices[obs]
+        for row in range(2):
+            r = residual[2 * obs + row]
+            J = jacobian_blocks[obs, row]
+            for a in range(CAMERA_PARAM_COUNT):
+                g_camera[camera, a] += J[a] * r
+                for b in range(CAMERA_PARAM_COUNT):
+                    U[camera, a, b] += J[a] * J[b]
+                for b in range(POINT_PARAM_COUNT):
+                    W[obs, a, b] += J[a] * J[CAMERA_PARAM_COUNT + b]
+            for a in range(POINT_PARAM_COUNT):
+                g_point[point, a] += J[CAMERA_PARAM_COUNT + a] * r
+                for b in range(POINT_PARAM_COUNT):
+                    V[point, a, b] += J[CAMERA_PARAM_COUNT + a] * J[CAMERA_PARAM_COUNT + b]
+
+
+@jit(nopython=True, cache=True)
+def _fill_point_chunk(
+    W: np.ndarray,
+    V_inverse: np.ndarray,
+    g_point: np.ndarray,
+    camera_indices: np.ndarray,
+    point_indices: np.ndarray,
+    observations: np.ndarray,
+    chunk_start: int,
+    point_W: np.ndarray,
+    point_Y: np.ndarray,
+    schur_rhs: np.ndarray,
+):
+    """
+    Lays out W.T and (W V^-1).T for a chunk of points as (3 * chunk points, 6 * n_cameras) matrices so that
+    the chunk's contribution to the Schur complement is point_Y.T @ point_W, and adds W V^-1 gp to schur_rhs.
+    """
+    for obs in observations:
+        camera = camera_indices[obs]
+        point = point_indices[obs]
+        row = (point - chunk_start) * POINT_PARAM_COUNT
+        for a in range(CAMERA_PARAM_COUNT):
+            column = camera * CAMERA_PARAM_COUNT + a
+            for b in range(POINT_PARAM_COUNT):
+                y = (
+                    W[obs, a, 0] * V_inverse[point, 0, b]
+                    + W[obs, a, 1] * V_inverse[point, 1, b]
+                    + W[obs, a, 2] * V_inverse[point, 2, b]
+                )
+                point_W[row + b, column] += W[obs, a, b]
+                point_Y[row + b, column] += y
+                schur_rhs[column] += y * g_point[point, b]
+
+
+@jit(nopython=True, cache=True)
+def _back_substitute(
+    W: np.ndarray,
+    V_inverse: np.ndarray,
+    g_point: np.ndarray,
+    camera_step: np.ndarray,
+    camera_indices: np.ndarray,
+    point_indices: np.ndarray,
+) -> np.ndarray:
+    """solve V dp = -(gp + sum of W.T dc over the point's observations) for every point"""
+    point_rhs = -g_point
+    for obs in range(camera_indices.shape[0]):
+        camera = camera_indices[obs]
+        point = point_indices[obs]
+        for b in range(POINT_PARAM_COUNT):
+            for a in range(CAMERA_PARAM_COUNT):
+                point_rhs[point, b] -= W[obs, a, b] * camera_step[camera, a]
+
+    point_step = np.empty_like(point_rhs)
+    for point in range(point_rhs.shape[0]):
+        for a in range(POINT_PARAM_COUNT):
+            point_step[point, a] = (
+                V_inverse[point, a, 0] * point_rhs[point, 0]
+                + V_inverse[point, a, 1] * point_rhs[point, 1]
+                + V_inverse[point, a, 2] * point_rhs[point, 2]
+            )
+    return point_step
+
+
+def _damp(blocks: np.ndarray, damping: float) -> np.ndarray:
+    """add the Marquardt damping term to the diagonal of each block"""
+    diagonal = np.clip(np.diagonal(blocks, axis1=1, axis2=2), MIN_DIAGONAL, MAX_DIAGONAL)
+    damped = blocks.copy()
+    size = blocks.shape[1]
+    damped[:, np.arange(size), np.arange(size)] += damping * diagonal
+    return damped
+
+
+class SchurNormalEquations:
+    """
+    The blocks of the normal equations at one parameter estimate. They are reused while searching for a
+    damping factor that reduces the cost, so only the damping and the solve are repeated.
+    """
+
+    def __init__(
+        self,
+        residual: np.ndarray,
+        jacobian_blocks: np.ndarray,
+        camera_indices: np.ndarray,
+        point_indices: np.ndarray,
+        n_cameras: int,
+        n_points: int,
+    ):
+        self.camera_indices = camera_indices
+        self.point_indices = point_indices
+        self.n_cameras = n_cameras
+        self.n_points = n_points
+
+        self.U = np.zeros((n_cameras, CAMERA_PARAM_COUNT, CAMERA_PARAM_COUNT))
+        self.V = np.zeros((n_points, POINT_PARAM_COUNT, POINT_PARAM_COUNT))
+        self.W = np.zeros((len(camera_indices), CAMERA_PARAM_COUNT, POINT_PARAM_COUNT))
+        self.g_camera = np.zeros((n_cameras, CAMERA_PARAM_COUNT))
+        self.g_point = np.zeros((n_points, POINT_PARAM_COUNT))
+        _accumulate_normal_equations(
+            jacobian_blocks,
+            residual,
+            camera_indices,
+            point_indices,
+            self.U,
+            self.V,
+            self.W,
+            self.g_camera,
+            self.g_point,
+        )
+
+        # observations sorted by point so that each chunk of points is a contiguous run of observations
+        self.order = np.argsort(point_indices, kind="stable")
+        self.point_bounds = np.searchsorted(point_indices[self.order], np.arange(n_points + 1))
+
+    @property
+    def gradient_norm(self) -> float:
+        return max(np.abs(self.g_camera).max(initial=0), np.abs(self.g_point).max(initial=0))
+
+    def solve(self, damping: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the camera and point updates (shapes (n_cameras, 6) and (n_points, 3)) for the given damping.
+        Raises np.linalg.LinAlgError if the reduced camera system is singular.
+        """
+        camera_size = self.n_cameras * CAMERA_PARAM_COUNT
+        V_inverse = np.linalg.inv(_damp(self.V, damping))
+
+        schur = np.zeros((camera_size, camera_size))
+        schur_rhs = -self.g_camera.ravel()
+        camera_blocks = _damp(self.U, damping)
+        for camera in range(self.n_cameras):
+            block = slice(camera * CAMERA_PARAM_COUNT, (camera + 1) * CAMERA_PARAM_COUNT)
+            schur[block, block] = camera_blocks[camera]
+
+        # subtract W V^-1 W.T one chunk of points at a time. Within a chunk, the W blocks of each point are
+        # laid out densely over all cameras so that the reduction is a single matrix product.
+        for chunk_start in range(0, self.n_points, POINT_CHUNK_SIZE):
+            chunk_stop = min(chunk_start + POINT_CHUNK_SIZE, self.n_points)
+            observations = self.order[self.point_bounds[chunk_start] : self.point_bounds[chunk_stop]]
+
+            point_W = np.zeros(((chunk_stop - chunk_start) * POINT_PARAM_COUNT, camera_size))
+            point_Y = np.zeros_like(point_W)
+            _fill_point_chunk(
+                self.W,
+                V_inverse,
+                self.g_point,
+                self.camera_indices,
+                self.point_indices,
+                observations,
+                chunk_start,
+                point_W,
+                point_Y,
+                schur_rhs,
+            )
+            schur -= point_Y.T @ point_W
+
+        camera_step = np.linalg.solve(schur, schur_rhs).reshape(self.n_cameras, CAMERA_PARAM_COUNT)
+        point_step = _back_substitute(
+            self.W, V_inverse, self.g_point, camera_step, self.camera_indices, self.point_indices
+        )
+
+        return camera_step, point_step
+
+
+def levenberg_marquardt(
+    fun: Callable,
+    jacobian_blocks: Callable,
+    x0: np.ndarray,
+    camera_indices: np.ndarray,
+    point_indices: np.ndarray,
+    n_cameras: int,
+    args: tuple = (),
+    ftol: float = 1e-8,
+    gtol: float = 1e-8,
+    max_iterations: int = 100,
+    initial_damping: float = 1e-3,
+    loss: str = "linear",
+    f_scale: float = 1.0,
+) -> OptimizeResult:
+    """
+    Minimize 0.5 * f_scale**2 * sum(rho((fun(x) / f_scale)**2)) where x holds n_cameras blocks of 6 camera
+    parameters followed by the 3 coordinates of each object point, and rho is the named loss function
+    ("linear", "huber" or "cauchy", as in scipy.optimize.least_squares).
+
+    fun(x, *args) returns the residuals (x0, y0, x1, y1, ...) of each observation and jacobian_blocks(x, *args)
+    returns, for each observation, the (2, 9) derivative of its residuals with respect to its camera's
+    parameters followed by its point's coordinates. camera_indices and point_indices give the camera and
+    point of each observation.
+
+    The result mirrors the fields of scipy.optimize.least_squares that are used elsewhere in caliscope.
+    """
+    loss_function = LOSS_FUNCTIONS[loss]
+
+    def get_cost(residual: np.ndarray) -> float:
+        return 0.5 * f_scale**2 * np.sum(loss_function((residual / f_scale) ** 2)[0])
+
+    camera_size = n_cameras * CAMERA_PARAM_COUNT
+    n_points = (len(x0) - camera_size) // POINT_PARAM_COUNT
+    camera_indices = np.asarray(camera_indices, dtype=np.int64)
+    point_indices = np.asarray(point_indices, dtype=np.int64)
+
+    x = np.array(x0, dtype=np.float64)
+    residual = fun(x, *args)
+    cost = get_cost(residual)
+    initial_cost = cost
+    damping = initial_damping
+    nfev, njev = 1, 0
+    status, message = 0, "The maximum number of iterations is exceeded."
+
+    for iteration in range(max_iterations):
+        # robust losses are handled by rescaling the residuals and jacobian rows so that the least squares
+        # normal equations have the gradient of the robust cost and the curvature given by the loss function
+        rho = loss_function((residual / f_scale) ** 2)
+        jacobian_scale = np.sqrt(np.maximum(rho[2], EPS))
+        scaled_residual = residual * rho[1] / jacobian_scale
+        scaled_jacobian = jacobian_blocks(x, *args) * jacobian_scale.reshape(-1, 2, 1)
+
+        equations = SchurNormalEquations(
+            scaled_residual, scaled_jacobian, camera_indices, point_indices, n_cameras, n_points
+        )
+        njev += 1
+
+        if equations.gradient_norm < gtol:
+            status, message = 1, "`gtol` termination condition is satisfied."
+            break
+
+        # increase the damping until a step reduces the cost
+        while damping <= MAX_DAMPING:
+            try:
+                camera_step, point_step = equations.solve(damping)
+            except np.linalg.LinAlgError:
+                damping *= 10
+                continue
+
+            x_new = x + np.concatenate([camera_step.ravel(), point_step.ravel()])
+            residual_new = fun(x_new, *args)
+            cost_new = get_cost(residual_new)
+            nfev += 1
+
+            if cost_new < cost:
+                break
+            damping *= 10
+        else:
+            # heavily damped steps are vanishingly small, so the estimate can no longer improve
+            status, message = 3, "No step reduced the cost before the damping limit was reached."
+            break
+
+        cost_reduction = cost - cost_new
+        x, residual, cost = x_new, residual_new, cost_new
+        damping = max(damping / 10, MIN_DAMPING)
+        logger.info(f"Schur LM iteration {iteration + 1}: cost {cost:.6e}, damping {damping:.1e}")
+
+        if cost_reduction < ftol * cost:
+            status, message = 2, "`ftol` termination condition is satisfied."
+            break
+
+    logger.info(f"Schur LM finished after {nfev} evaluations: cost {initial_cost:.6e} -> {cost:.6e}. {message}")
+
+    return OptimizeResult(
+        x=x,
+        cost=cost,
+        fun=residual,
+        nfev=nfev,
+        njev=njev,
+        status=status,
+        message=message,
+        success=status > 0,
+    )
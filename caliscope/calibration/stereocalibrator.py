@@ -1,3 +1,5 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from itertools import combinations
 from pathlib import Path
 
@@ -11,6 +13,19 @@ from caliscope import __root__
 
 logger = caliscope.logger.get(__name__)
 
+# each worker process receives its own pickled copy of the stereocalibrator (point data included) once, when it
+# starts, rather than along with every pair
+_worker_stereocalibrator = None
+
+
+def _set_worker_stereocalibrator(stereocalibrator):
+    global _worker_stereocalibrator
+    _worker_stereocalibrator = stereocalibrator
+
+
+def _stereo_calibrate_pair(pair: tuple, boards_sampled: int):
+    return _worker_stereocalibrator.stereo_calibrate(pair, boards_sampled)
+
 
 class StereoCalibrator:
     def __init__(
@@ -115,25 +130,18 @@ class StereoCalibrator:
         return all_boards
 
     def get_stereopair_data(self, pair: tuple, boards_sampled: int, random_state=1) -> pd.DataFrame or None:
-        # convenience function to get the points that are in the overlap regions of the pairs
-        def in_pair(row: int, pair: tuple):
-            """
-            Uses the coverage_region string generated previously to flag points that are in
-            a shared region of the pair
-            """
-            a, b = pair
-            port_check = row.port == a or row.port == b
-
-            a, b = str(a), str(b)
-
-            region_check = ("_" + a + "_") in row.coverage_region and ("_" + b + "_") in row.coverage_region
-            return region_check and port_check
-
-        # flag the points that belong to the pair overlap regions
-        self.all_point_data["in_pair"] = self.all_point_data.apply(in_pair, axis=1, args=(pair,))
+        # flag the points of the pair's cameras that are in a region shared by both (see points_with_coverage_region)
+        # the point data is left unaltered as it is shared across the pairs being calibrated
+        a, b = pair
+        coverage_region = self.all_point_data["coverage_region"]
+        in_pair = (
+            self.all_point_data["port"].isin(pair)
+            & coverage_region.str.contains(f"_{a}_", regex=False)
+            & coverage_region.str.contains(f"_{b}_", regex=False)
+        )
 
         # group points into boards and get the total count for sample weighting below
-        pair_points = self.all_point_data[self.all_point_data["in_pair"]]
+        pair_points = self.all_point_data[in_pair]
         pair_boards = (
             pair_points.filter(["sync_index", "port", "point_id"])
             .groupby(["sync_index", "port"])
@@ -164,9 +172,16 @@ class StereoCalibrator:
 
         return selected_pair_points
 
-    def stereo_calibrate_all(self, boards_sampled=10):
+    def stereo_calibrate_all(self, boards_sampled=10, workers: int = 1):
         """Iterates across all camera pairs. Intrinsic parameters are pulled
         from camera and combined with obj and img points for each pair.
+
+        With workers > 1 the pairs are calibrated independently of one another in a pool of processes.
+        This is opt-in library API: starting each worker and sending it a copy of the stereocalibrator takes
+        a second or two, while a pair typically calibrates in tens of milliseconds, so the Controller
+        calibrates serially. It can pay off on multi-core machines with many cameras and boards sampled.
+        Results are collected in the order of `self.pairs` and the config is written once at the end, so the
+        output does not depend on the number of workers.
         """
         logger.info("Deleting previous stereocalibrations from config")
         # clear out the previous stereocalibrations
@@ -175,9 +190,7 @@ class StereoCalibrator:
                 del self.config[key]
 
         logger.info(f"Beginning stereocalibration of pairs {self.pairs}")
-        for pair in self.pairs:
-            error, rotation, translation = self.stereo_calibrate(pair, boards_sampled)
-
+        for pair, (error, rotation, translation) in zip(self.pairs, self.calibrate_pairs(boards_sampled, workers)):
             if error is not None:
                 # only store data if there was sufficient stereopair coverage to get
                 # a good calibration
@@ -197,6 +210,23 @@ class StereoCalibrator:
         with open(self.config_path, "w") as f:
             rtoml.dump(self.config, f)
 
+    def calibrate_pairs(self, boards_sampled: int, workers: int = 1) -> list[tuple]:
+        """stereocalibrate each of self.pairs, returning (error, rotation, translation) for each in order"""
+        workers = min(workers, len(self.pairs))
+
+        if workers <= 1:
+            return [self.stereo_calibrate(pair, boards_sampled) for pair in self.pairs]
+
+        logger.info(f"Calibrating {len(self.pairs)} pairs across {workers} processes")
+        # spawned rather than forked as the GUI calls this with other threads running
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_set_worker_stereocalibrator,
+            initargs=(self,),
+        ) as executor:
+            return list(executor.map(_stereo_calibrate_pair, self.pairs, [boards_sampled] * len(self.pairs)))
+
     def stereo_calibrate(self, pair, boards_sampled=10):
         stereocalibration_flags = cv2.CALIB_FIX_INTRINSIC
         criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 40, 0.000001)
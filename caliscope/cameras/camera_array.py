@@ -1,7 +1,9 @@
 # %%
 
 from collections import OrderedDict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Callable
 
 import cv2
 import numpy as np
@@ -12,6 +14,12 @@ import caliscope.logger
 logger = caliscope.logger.get(__name__)
 CAMERA_PARAM_COUNT = 6
 
+# quantities derived from a camera (projection matrices, undistortion maps, etc.) depend only on these
+CALIBRATION_ATTRIBUTES = frozenset(["size", "matrix", "distortions", "rotation", "translation", "ignore"])
+
+# shared across all cameras so that a version identifies a single calibration state
+_calibration_versions = count()
+
 
 @dataclass
 class CameraData:
@@ -34,6 +42,38 @@ class CameraData:
     translation: np.ndarray = None  # camera relative to world
     rotation: np.ndarray = None  # camera relative to world
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in CALIBRATION_ATTRIBUTES:
+            # values cached from the previous calibration are now stale
+            super().__setattr__("calibration_version", next(_calibration_versions))
+            super().__setattr__("_cache", {})
+
+    def get_cached(self, key: str, build: Callable):
+        """
+        Returns the value stored under key, calling build() to create it if this is the first request
+        since the camera's calibration was last changed. Cached values should be treated as read-only.
+        """
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def has_cached(self, key: str) -> bool:
+        """True if a value is stored under key for the camera's current calibration"""
+        return key in self._cache
+
+    def __getstate__(self):
+        # cached values are rebuilt on demand rather than pickled as some are large (e.g. undistortion maps)
+        state = self.__dict__.copy()
+        state.pop("_cache", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # versions are only meaningful within a process, and pickles made before caching have none
+        super().__setattr__("calibration_version", next(_calibration_versions))
+        super().__setattr__("_cache", {})
+
     @property
     def transformation(self):
         """ "
@@ -145,6 +185,29 @@ class CameraArray:
     At the moment all it is doing is holding a dictionary of CameraData objects"""
 
     cameras: dict
+    _cache: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def get_cached(self, key: str, build: Callable):
+        """
+        Returns the value stored under key, calling build() to create it if this is the first request
+        since any camera was added, removed or recalibrated. Cached values should be treated as read-only.
+        """
+        state = tuple((port, cam.calibration_version) for port, cam in self.cameras.items())
+        cached = self._cache.get(key)
+        if cached is None or cached[0] != state:
+            cached = (state, build())
+            self._cache[key] = cached
+        return cached[1]
+
+    def __getstate__(self):
+        # cached values are rebuilt on demand; some (e.g. numba typed dicts) cannot be pickled
+        state = self.__dict__.copy()
+        state.pop("_cache", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cache = {}
 
     @property
     def port_index(self):
@@ -154,16 +217,18 @@ class CameraArray:
         is being ignored. Used to manage reference to camera parameters in xy_reprojection_error
         used within the least_squares optimization of the capture volume.
         """
-        not_ignored_ports = [port for port, cam in self.cameras.items() if not cam.ignore]
-        not_ignored_ports.sort()
-        not_ignored_indices = [i for i in range(len(not_ignored_ports))]
-        port_indices = {port: i for port, i in zip(not_ignored_ports, not_ignored_indices)}
 
-        return port_indices
+        def build_port_index():
+            not_ignored_ports = [port for port, cam in self.cameras.items() if not cam.ignore]
+            not_ignored_ports.sort()
+            not_ignored_indices = [i for i in range(len(not_ignored_ports))]
+            return {port: i for port, i in zip(not_ignored_ports, not_ignored_indices)}
+
+        return self.get_cached("port_index", build_port_index)
 
     @property
     def index_port(self):
-        return {value: key for key, value in self.port_index.items()}
+        return self.get_cached("index_port", lambda: {value: key for key, value in self.port_index.items()})
 
     def get_extrinsic_params(self):
         """for each camera build the CAMERA_PARAM_COUNT element parameter index
@@ -193,9 +258,12 @@ class CameraArray:
         flat_camera_params = least_sq_result_x[0 : n_cameras * n_cam_param]
         new_camera_params = flat_camera_params.reshape(n_cameras, n_cam_param)
 
+        # read once as each camera update invalidates the cached mapping
+        index_port = self.index_port
+
         # update camera array with new positional data
         for index in range(len(new_camera_params)):
-            port = self.index_port[index]  # correct in case ignoring a camera
+            port = index_port[index]  # correct in case ignoring a camera
             cam_vec = new_camera_params[index, :]
             self.cameras[port].extrinsics_from_vector(cam_vec)
 
@@ -215,8 +283,43 @@ class CameraArray:
                 full_intrinsics = False
         return full_intrinsics
 
+    @property
+    def fundamental_matrices(self) -> np.ndarray:
+        """
+        Fundamental matrices between all pairs of cameras, relating undistorted pixel coordinates.
+        Returned as a dense array indexed by port such that for a point seen at x_A in camera A
+        and x_B in camera B:  x_B.T @ F[port_A, port_B] @ x_A == 0
+
+        A dense array (rather than a dictionary keyed by pair) keeps this directly usable within numba.
+        """
+        return self.get_cached("fundamental_matrices", self._build_fundamental_matrices)
+
+    def _build_fundamental_matrices(self) -> np.ndarray:
+        max_port = max(self.cameras.keys())
+        fundamental = np.zeros((max_port + 1, max_port + 1, 3, 3), dtype=np.float64)
+
+        for port_A, cam_A in self.cameras.items():
+            for port_B, cam_B in self.cameras.items():
+                if port_A == port_B:
+                    continue
+
+                # pose of camera B relative to camera A
+                rotation = cam_B.rotation @ cam_A.rotation.T
+                translation = cam_B.translation - rotation @ cam_A.translation
+
+                t_x, t_y, t_z = translation
+                translation_cross = np.array([[0, -t_z, t_y], [t_z, 0, -t_x], [-t_y, t_x, 0]])
+                essential = translation_cross @ rotation
+
+                fundamental[port_A, port_B] = np.linalg.inv(cam_B.matrix).T @ essential @ np.linalg.inv(cam_A.matrix)
+
+        return fundamental
+
     @property
     def projection_matrices(self) -> Dict:
+        return self.get_cached("projection_matrices", self._build_projection_matrices)
+
+    def _build_projection_matrices(self) -> Dict:
         logger.info("Creating camera array projection matrices")
         proj_mat = Dict()
         for port, cam in self.cameras.items():
@@ -29,6 +29,7 @@ class ConfigSettings(Enum):
     camera_count = "camera_count"
     save_tracked_points_video = "save_tracked_points_video"
     fps_sync_stream_processing = "fps_sync_stream_processing"
+    landmark_whitelist = "landmark_whitelist"
 
 
 # %%
@@ -43,6 +44,8 @@ class Configurator:
     def __init__(self, workspace_path: Path) -> None:
         self.workspace_path = workspace_path
         self.config_toml_path = Path(self.workspace_path, "config.toml")
+        # point estimates are saved in binary form; the toml file is only read from older workspaces
+        self.point_estimates_npz_path = Path(self.workspace_path, "point_estimates.npz")
         self.point_estimates_toml_path = Path(self.workspace_path, "point_estimates.toml")
 
         if exists(self.config_toml_path):
@@ -84,6 +87,28 @@ class Configurator:
         else:
             return self.dict[ConfigSettings.fps_sync_stream_processing.value]
 
+    def get_landmark_whitelist(self, tracker_name: str) -> list[str] | None:
+        """
+        Landmark names to retain for a given tracker, stored in config.toml as:
+
+        [landmark_whitelist]
+        HOLISTIC = ["left_wrist", "right_wrist"]
+
+        returns None (i.e. keep all landmarks) when no whitelist is set for the tracker
+        """
+        whitelists = self.dict.get(ConfigSettings.landmark_whitelist.value, {})
+        return whitelists.get(tracker_name, None)
+
+    def save_landmark_whitelist(self, tracker_name: str, landmark_names: list[str] | None):
+        whitelists = self.dict.get(ConfigSettings.landmark_whitelist.value, {})
+        if landmark_names is None:
+            whitelists.pop(tracker_name, None)
+        else:
+            whitelists[tracker_name] = list(landmark_names)
+
+        self.dict[ConfigSettings.landmark_whitelist.value] = whitelists
+        self.update_config_toml()
+
     def refresh_config_from_toml(self):
         logger.info("Populating config dictionary with config.toml data")
         # with open(self.config_toml_path, "r") as f:
@@ -94,6 +119,14 @@ class Configurator:
         # with open(self.config_toml_path, "r") as f:
         self.dict["point_estimates"] = rtoml.load(self.point_estimates_toml_path)
 
+    def refresh_point_estimates_from_npz(self):
+        logger.info("Populating config dictionary with point_estimates.npz data")
+        with np.load(self.point_estimates_npz_path) as point_estimates_npz:
+            self.dict["point_estimates"] = {key: point_estimates_npz[key] for key in point_estimates_npz.files}
+
+    def point_estimates_saved(self) -> bool:
+        return self.point_estimates_npz_path.exists() or self.point_estimates_toml_path.exists()
+
     def update_config_toml(self):
         # alphabetize by key to maintain standardized layout
         sorted_dict = {key: value for key, value in sorted(self.dict.items())}
@@ -182,7 +215,10 @@ class Configurator:
         # only load point estimates into dictionary if saved more recently than last loaded
 
         if "point_estimates" not in self.dict.keys():
-            self.refresh_point_estimates_from_toml()
+            if self.point_estimates_npz_path.exists():
+                self.refresh_point_estimates_from_npz()
+            else:
+                self.refresh_point_estimates_from_toml()
 
         temp_data = self.dict["point_estimates"].copy()
         for key, value in temp_data.items():
@@ -221,8 +257,21 @@ class Configurator:
 
         return charuco
 
+    def get_charuco_pyramid_levels(self) -> int:
+        """
+        Number of times frames are halved before searching them for aruco markers (see CharucoTracker),
+        stored in config.toml as:
+
+        [charuco]
+        pyramid_levels = 1
+
+        returns 0 (i.e. search at full resolution) when not set
+        """
+        return self.dict.get("charuco", {}).get("pyramid_levels", 0)
+
     def save_charuco(self, charuco: Charuco):
-        self.dict["charuco"] = charuco.__dict__
+        # pyramid_levels configures the tracker rather than the board, so it is kept when the board changes
+        self.dict["charuco"] = {**charuco.__dict__, "pyramid_levels": self.get_charuco_pyramid_levels()}
         logger.info(f"Saving charuco with params {charuco.__dict__} to config")
         self.update_config_toml()
 
@@ -314,17 +363,16 @@ class Configurator:
     #     return cameras
 
     def save_point_estimates(self, point_estimates: PointEstimates):
-        logger.info("Saving point estimates to toml...")
+        """
+        Arrays are stored uncompressed in point_estimates.npz, so saving and loading are limited only by disk
+        speed. Any point_estimates.toml from an older version is left in place but no longer read.
+        """
+        logger.info("Saving point estimates to npz...")
 
         temp_data = asdict(point_estimates)
-
-        for key, params in temp_data.items():
-            temp_data[key] = params.tolist()
-
         self.dict["point_estimates"] = temp_data
 
-        with open(self.point_estimates_toml_path, "w") as f:
-            rtoml.dump(self.dict["point_estimates"], f)
+        np.savez(self.point_estimates_npz_path, **temp_data)
 
 
 if __name__ == "__main__":
@@ -1,3 +1,4 @@
+import os
 from collections import OrderedDict
 from pathlib import Path
 from time import sleep, time
@@ -7,10 +8,9 @@ from PySide6.QtCore import QObject, QThread, Signal
 
 import caliscope.logger
 from caliscope.calibration.capture_volume.capture_volume import CaptureVolume
-from caliscope.calibration.capture_volume.helper_functions.get_point_estimates import (
-    get_point_estimates,
-)
-from caliscope.calibration.capture_volume.point_estimates import PointEstimates
+from caliscope.calibration.capture_volume.incremental_calibration import calibrate_incrementally
+from caliscope.calibration.capture_volume.initial_calibration import calibrate_capture_volume
+from caliscope.calibration.capture_volume.progress_monitor import BundleAdjustmentProgress
 from caliscope.calibration.capture_volume.quality_controller import QualityController
 from caliscope.calibration.charuco import Charuco
 from caliscope.calibration.stereocalibrator import StereoCalibrator
@@ -33,6 +33,11 @@ logger = caliscope.logger.get(__name__)
 FILTERED_FRACTION = (
     0.025  # by default, 2.5% of image points with highest reprojection error are filtered out during calibration
 )
+ROBUST_LOSS = "cauchy"  # limits the influence of outlying observations during the initial bundle adjustment
+MAX_OBSERVATIONS = 100_000  # larger calibrations are subsampled to a diverse set of board views for bundle adjustment
+RMSE_TOLERANCE = 1e-4  # bundle adjustment ends once an iteration improves the RMSE by less than this fraction
+# threads detecting charuco corners during extrinsic processing; every stream reads this many frames ahead
+CHARUCO_TRACKER_WORKERS = min(4, os.cpu_count() or 1)
 
 
 # class CalibrationStage(Enum):
@@ -55,6 +60,7 @@ class Controller(QObject):
     enable_inputs = Signal(int, bool)  # port, enable
     post_processing_complete = Signal()
     show_synched_frames = Signal()
+    bundle_adjustment_progress = Signal(object)  # BundleAdjustmentProgress
 
     def __init__(self, workspace_dir: Path):
         super().__init__()
@@ -66,7 +72,9 @@ class Controller(QObject):
         self.camera_array = CameraArray({})  # empty camera array at init
         logger.info("Retrieving charuco from config")
         self.charuco = self.config.get_charuco()
-        self.charuco_tracker = CharucoTracker(self.charuco)
+        self.charuco_tracker = CharucoTracker(
+            self.charuco, pyramid_levels=self.config.get_charuco_pyramid_levels(), workers=CHARUCO_TRACKER_WORKERS
+        )
 
         logger.info("Building workpace guide")
         self.workspace_guide = WorkspaceGuide(self.workspace, self.camera_count)
@@ -75,6 +83,7 @@ class Controller(QObject):
         self.workspace_guide.recording_dir.mkdir(exist_ok=True, parents=True)
 
         self.capture_volume = None
+        self.bundle_adjustment_stop_requested = False
 
         # needs to exist before main widget can connect to its finished signal
         self.load_workspace_thread = QThread()
@@ -130,7 +139,7 @@ class Controller(QObject):
         """
         cameras_good = self.camera_array.all_extrinsics_calibrated()
         logger.info(f"All extrinsics calculated: {cameras_good}")
-        point_estimates_good = self.config.point_estimates_toml_path.exists()
+        point_estimates_good = self.config.point_estimates_saved()
         logger.info(f"Point estimates available: {point_estimates_good}")
         all_data_available = self.workspace_guide.all_extrinsic_mp4s_available()
         logger.info(f"All underlying data available: {all_data_available}")
@@ -146,7 +155,10 @@ class Controller(QObject):
     def update_charuco(self, charuco: Charuco):
         self.charuco = charuco
         self.config.save_charuco(self.charuco)
-        self.charuco_tracker = CharucoTracker(self.charuco)
+        self.charuco_tracker.close()
+        self.charuco_tracker = CharucoTracker(
+            self.charuco, pyramid_levels=self.config.get_charuco_pyramid_levels(), workers=CHARUCO_TRACKER_WORKERS
+        )
 
         if hasattr(self, "intrinsic_stream_manager"):
             logger.info("Updating charuco within the intrinsic stream manager")
@@ -158,6 +170,7 @@ class Controller(QObject):
             recording_dir=self.workspace_guide.extrinsic_dir,
             all_camera_data=self.camera_array.cameras,
             tracker=self.charuco_tracker,
+            cache_points=True,
         )
 
     # def process_extrinsic_streams(self, fps_target=None):
@@ -319,43 +332,49 @@ class Controller(QObject):
         # Note that the corner distance accuracy calcs need validation...I'm not relying on them now...
         self.quality_controller = QualityController(self.capture_volume, charuco=self.charuco)
 
-    def calibrate_capture_volume(self):
+    def track_extrinsic_charuco(self):
         """
-        This is where the camera array 6 DoF is set. Many, many things are happening
-        here, but they are all necessary steps of the process so I didn't want to
-        try to encapsulate any further
+        Track the charuco in the extrinsic calibration recording, blocking until the 2D points have been saved
+        to self.extrinsic_calibration_xy
         """
+        output_path = Path(self.workspace_guide.extrinsic_dir, "CHARUCO", "xy_CHARUCO.csv")
+        if output_path.exists():
+            output_path.unlink()  # make sure this doesn't exist to begin with.
 
-        def worker():
-            output_path = Path(self.workspace_guide.extrinsic_dir, "CHARUCO", "xy_CHARUCO.csv")
-            if output_path.exists():
-                output_path.unlink()  # make sure this doesn't exist to begin with.
+        self.load_extrinsic_stream_manager()
 
-            self.load_extrinsic_stream_manager()
+        # config settings that help to throttle processing rate to manage resource demands
+        include_video = self.config.get_save_tracked_points()
+        fps_target = self.config.get_fps_sync_stream_processing()
 
-            # config settings that help to throttle processing rate to manage resource demands
-            include_video = self.config.get_save_tracked_points()
-            fps_target = self.config.get_fps_sync_stream_processing()
+        self.extrinsic_stream_manager.process_streams(fps_target=fps_target, include_video=include_video)
+        logger.info(f"Processing of extrinsic calibration begun...waiting for output to populate: {output_path}")
 
-            self.extrinsic_stream_manager.process_streams(fps_target=fps_target, include_video=include_video)
-            logger.info(f"Processing of extrinsic calibration begun...waiting for output to populate: {output_path}")
+        logger.info("About to signal that synched frames should be shown")
+        self.show_synched_frames.emit()
 
-            logger.info("About to signal that synched frames should be shown")
-            self.show_synched_frames.emit()
+        while not output_path.exists():
+            sleep(0.5)
+            # moderate the frequency with which logging statements get made
+            if round(time()) % 3 == 0:
+                logger.info(f"Waiting for 2D tracked points to populate at {output_path}")
 
-            while not output_path.exists():
-                sleep(0.5)
-                # moderate the frequency with which logging statements get made
-                if round(time()) % 3 == 0:
-                    logger.info(f"Waiting for 2D tracked points to populate at {output_path}")
+        # note that this processing will wait until it is complete
+        # self.process_extrinsic_streams(fps_target=100)
+        logger.info("Processing if extrinsic caliberation streams complete...")
+        self.charuco_tracker.close()
 
-            # note that this processing will wait until it is complete
-            # self.process_extrinsic_streams(fps_target=100)
-            logger.info("Processing if extrinsic caliberation streams complete...")
+        self.extrinsic_calibration_xy = Path(self.workspace, "calibration", "extrinsic", "CHARUCO", "xy_CHARUCO.csv")
 
-            self.extrinsic_calibration_xy = Path(
-                self.workspace, "calibration", "extrinsic", "CHARUCO", "xy_CHARUCO.csv"
-            )
+    def calibrate_capture_volume(self):
+        """
+        This is where the camera array 6 DoF is set. Many, many things are happening
+        here, but they are all necessary steps of the process so I didn't want to
+        try to encapsulate any further
+        """
+
+        def worker():
+            self.track_extrinsic_charuco()
 
             stereocalibrator = StereoCalibrator(self.config.config_toml_path, self.extrinsic_calibration_xy)
             stereocalibrator.stereo_calibrate_all(boards_sampled=10)
@@ -365,18 +384,58 @@ class Controller(QObject):
                 self.config.config_toml_path
             ).get_best_camera_array()
 
-            self.point_estimates: PointEstimates = get_point_estimates(self.camera_array, self.extrinsic_calibration_xy)
+            self.bundle_adjustment_stop_requested = False
+            self.capture_volume = calibrate_capture_volume(
+                self.camera_array,
+                self.extrinsic_calibration_xy,
+                FILTERED_FRACTION,
+                loss=ROBUST_LOSS,
+                max_observations=MAX_OBSERVATIONS,
+                callback=self.report_bundle_adjustment_progress,
+                rmse_tolerance=RMSE_TOLERANCE,
+            )
+            self.point_estimates = self.capture_volume.point_estimates
+            self.quality_controller = QualityController(self.capture_volume, self.charuco)
 
-            self.capture_volume = CaptureVolume(self.camera_array, self.point_estimates)
-            self.capture_volume.optimize()
+            # saves both point estimates and camera array
+            self.config.save_capture_volume(self.capture_volume)
 
-            self.quality_controller = QualityController(self.capture_volume, self.charuco)
+        self.calibrate_capture_volume_thread = QThread()
+        self.calibrate_capture_volume_thread.run = worker
+        self.calibrate_capture_volume_thread.finished.connect(self.capture_volume_calibrated.emit)
+        self.calibrate_capture_volume_thread.start()
+
+    def extend_capture_volume(self, point_data_path: Path | None = None):
+        """
+        Update the saved calibration rather than repeating it from scratch, locating any cameras that have
+        been added since and refining the capture volume with the new observations.
 
-            logger.info(f"Removing the worst fitting {FILTERED_FRACTION*100} percent of points from the model")
-            self.quality_controller.filter_point_estimates(FILTERED_FRACTION)
-            self.capture_volume.optimize()
+        point_data_path: 2D points tracked from an additional extrinsic recording. If not provided, the charuco
+        is tracked again in the extrinsic calibration recording so that the added cameras are included.
+        """
+
+        def worker():
+            if point_data_path is None:
+                self.track_extrinsic_charuco()
+                xy_path = self.extrinsic_calibration_xy
+                sync_offset = 0  # the same recording that the saved point estimates came from
+            else:
+                xy_path = point_data_path
+                sync_offset = None
+
+            point_estimates = self.config.get_point_estimates() if self.config.point_estimates_saved() else None
+
+            self.bundle_adjustment_stop_requested = False
+            self.capture_volume = calibrate_incrementally(
+                self.camera_array,
+                xy_path,
+                point_estimates=point_estimates,
+                sync_offset=sync_offset,
+                callback=self.report_bundle_adjustment_progress,
+            )
+            self.point_estimates = self.capture_volume.point_estimates
+            self.quality_controller = QualityController(self.capture_volume, self.charuco)
 
-            # saves both point estimates and camera array
             self.config.save_capture_volume(self.capture_volume)
 
         self.calibrate_capture_volume_thread = QThread()
@@ -384,6 +443,15 @@ class Controller(QObject):
         self.calibrate_capture_volume_thread.finished.connect(self.capture_volume_calibrated.emit)
         self.calibrate_capture_volume_thread.start()
 
+    def report_bundle_adjustment_progress(self, progress: BundleAdjustmentProgress) -> bool:
+        """passed to CaptureVolume.optimize; returns True to end the bundle adjustment early"""
+        self.bundle_adjustment_progress.emit(progress)
+        return self.bundle_adjustment_stop_requested
+
+    def stop_bundle_adjustment(self):
+        """the current bundle adjustment is ended at its latest estimate, which is then used for the calibration"""
+        self.bundle_adjustment_stop_requested = True
+
     def process_recordings(self, recording_path: Path, tracker_enum: TrackerEnum):
         """
         Initiates worker thread to begin post processing.
@@ -394,7 +462,8 @@ class Controller(QObject):
         def worker():
             logger.info(f"Beginning to process video files at {recording_path}")
             logger.info(f"Creating post processor for {recording_path}")
-            self.post_processor = PostProcessor(self.camera_array, recording_path, tracker_enum)
+            landmark_whitelist = self.config.get_landmark_whitelist(tracker_enum.name)
+            self.post_processor = PostProcessor(self.camera_array, recording_path, tracker_enum, landmark_whitelist)
 
             # config settings that help to throttle processing rate to manage resource demands
             include_video = self.config.get_save_tracked_points()
@@ -6,6 +6,7 @@ from PySide6.QtCore import QFileSystemWatcher, Qt
 from PySide6.QtWidgets import QGridLayout, QHBoxLayout, QLabel, QPushButton, QSpinBox, QTextBrowser, QWidget
 
 import caliscope.logger
+from caliscope.calibration.capture_volume.progress_monitor import BundleAdjustmentProgress
 from caliscope.controller import Controller
 from caliscope.gui.synched_frames_display import SynchedFramesDisplay
 from caliscope.gui.utils.spinbox_utils import setup_spinbox_sizing
@@ -24,6 +25,9 @@ class WorkspaceSummaryWidget(QWidget):
         self.open_workspace_folder_btn = QPushButton("Open Workspace Folder", self)
         self.calibrate_btn = QPushButton("Calibrate Capture Volume", self)
         self.reload_workspace_btn = QPushButton("Reload Workspace")
+        self.stop_bundle_adjustment_btn = QPushButton("Stop Bundle Adjustment", self)
+        self.stop_bundle_adjustment_btn.setEnabled(False)
+        self.bundle_adjustment_status = QLabel()
 
         self.camera_count_spin = QSpinBox()
         self.camera_count_spin.setValue(self.controller.get_camera_count())
@@ -54,18 +58,39 @@ class WorkspaceSummaryWidget(QWidget):
         self.layout.addWidget(self.reload_workspace_btn, 1, 1)
         self.layout.addWidget(self.open_workspace_folder_btn, 1, 2)
         self.layout.addWidget(self.calibrate_btn, 1, 3)
+        self.layout.addWidget(self.bundle_adjustment_status, 2, 0, 1, 3)
+        self.layout.addWidget(self.stop_bundle_adjustment_btn, 2, 3)
 
     def connect_widgets(self):
         self.open_workspace_folder_btn.clicked.connect(self.open_workspace)
         self.calibrate_btn.clicked.connect(self.on_calibrate_btn_clicked)
         self.camera_count_spin.valueChanged.connect(self.set_camera_count)
         self.controller.show_synched_frames.connect(self.show_synched_frames)
+        self.stop_bundle_adjustment_btn.clicked.connect(self.on_stop_bundle_adjustment_btn_clicked)
+        self.controller.bundle_adjustment_progress.connect(self.show_bundle_adjustment_progress)
+        self.controller.capture_volume_calibrated.connect(self.on_capture_volume_calibrated)
 
     def on_calibrate_btn_clicked(self):
         logger.info("Calling controller to process extrinsic streams into 2D data")
         # Call the extrinsic calibration method in the controller
         self.controller.calibrate_capture_volume()
 
+    def show_bundle_adjustment_progress(self, progress: BundleAdjustmentProgress):
+        self.stop_bundle_adjustment_btn.setEnabled(True)
+        self.bundle_adjustment_status.setText(
+            f"Bundle adjustment iteration {progress.iteration}: RMSE {progress.rmse['overall']:.3f} pixels "
+            f"({progress.elapsed:.1f} s)"
+        )
+
+    def on_stop_bundle_adjustment_btn_clicked(self):
+        logger.info("Stopping bundle adjustment at its current estimate")
+        self.stop_bundle_adjustment_btn.setEnabled(False)
+        self.controller.stop_bundle_adjustment()
+
+    def on_capture_volume_calibrated(self):
+        self.stop_bundle_adjustment_btn.setEnabled(False)
+        self.bundle_adjustment_status.setText("")
+
     def set_camera_count(self, value):
         self.controller.set_camera_count(value)
 
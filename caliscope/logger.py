@@ -2,6 +2,7 @@
 # Detail will be logged to a single file with INFO logged to the console
 
 import logging
+import multiprocessing
 import os
 import sys
 from pathlib import Path
@@ -11,13 +12,27 @@ from PySide6 import QtCore
 from caliscope import __log_dir__
 
 # only one file handler accross package so all messages logged to one file
+in_main_process = multiprocessing.current_process().name == "MainProcess"
+log_path = Path(__log_dir__, "calibration.log")
+file_log_format = " %(levelname)8s| %(name)30s| %(lineno)3d|  %(message)s"
+app_dir_file_handler = None  # created along with the first logger (see get_file_handler)
 
-app_dir_file_handler = logging.FileHandler(Path(__log_dir__, "calibration.log"), "w+")
-app_dir_file_handler.setLevel(logging.INFO)
 
-file_log_format = " %(levelname)8s| %(name)30s| %(lineno)3d|  %(message)s"
-file_formatter = logging.Formatter(file_log_format)
-app_dir_file_handler.setFormatter(file_formatter)
+def get_file_handler() -> logging.FileHandler:
+    """
+    The main process starts the log afresh when the handler is created; all processes (including the
+    workers of the StereoCalibrator) then append to it so that their messages do not overwrite one another
+    """
+    global app_dir_file_handler
+    if app_dir_file_handler is None:
+        if in_main_process:
+            log_path.write_text("")
+
+        app_dir_file_handler = logging.FileHandler(log_path, "a")
+        app_dir_file_handler.setLevel(logging.INFO)
+        app_dir_file_handler.setFormatter(logging.Formatter(file_log_format))
+
+    return app_dir_file_handler
 
 
 console_handler = logging.StreamHandler()
@@ -89,11 +104,11 @@ def get(name):  # as in __name__
 
     logger.setLevel(logging.INFO)
 
-    logger.addHandler(app_dir_file_handler)
+    logger.addHandler(get_file_handler())
     logger.addHandler(console_handler)
 
-    # avoid stepping through XStream object if in debug
-    if os.getenv("DEBUG") != "1":
+    # avoid stepping through XStream object if in debug or in a worker process with no GUI to receive it
+    if os.getenv("DEBUG") != "1" and in_main_process:
         qt_handler = QtHandler()
         logger.addHandler(qt_handler)
 
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
 from dataclasses import dataclass
 
 import cv2
@@ -100,6 +101,110 @@ class Tracker(ABC):
         """
         pass
 
+    @property
+    def batch_size(self) -> int:
+        """
+        OPTIONAL PROPERTY
+
+        Number of frames that a RecordedStream should read ahead and hand to `submit` together.
+        Trackers that can amortize overhead across frames (e.g. a worker pool or a batched CNN) can
+        override this along with `submit`. The default of 1 keeps the one-frame-at-a-time behavior.
+        """
+        return 1
+
+    def submit(self, frames: list[np.ndarray], ports: list[int], rotation_counts: list[int]) -> list[Future]:
+        """
+        OPTIONAL METHOD
+
+        Begin processing a batch of frames and return one Future per frame that resolves to its PointPacket.
+        Futures must be returned in the same order as the frames.
+
+        The default adapter simply runs `get_points` on each frame, so any tracker works with the batch API.
+        """
+        futures = []
+        for frame, port, rotation_count in zip(frames, ports, rotation_counts):
+            future = Future()
+            try:
+                future.set_result(self.get_points(frame, port, rotation_count))
+            except Exception as e:
+                future.set_exception(e)
+            futures.append(future)
+
+        return futures
+
+    def get_points_batch(
+        self, frames: list[np.ndarray], ports: list[int], rotation_counts: list[int]
+    ) -> list[PointPacket]:
+        """
+        Blocking version of `submit`
+        """
+        return [future.result() for future in self.submit(frames, ports, rotation_counts)]
+
+    def close(self):
+        """
+        OPTIONAL METHOD
+
+        Release any resources held for processing (e.g. a worker pool) once the frames submitted so far
+        are done. Called by the owner of the tracker when a round of processing is complete; the tracker
+        may still be used afterwards.
+        """
+        pass
+
+    landmark_whitelist: set[str] | None = None
+
+    @property
+    def landmark_names(self) -> set[str] | None:
+        """
+        OPTIONAL PROPERTY
+
+        Every name that `get_point_name` can return. Used to check a landmark whitelist for names that the
+        tracker never produces. The default of None skips that check.
+        """
+        return None
+
+    def set_landmark_whitelist(self, landmark_names: list[str] | None):
+        """
+        Restrict the landmarks passed on by `include_landmark` to those named (None keeps all of them).
+        Raises a ValueError for any name the tracker does not produce, as a misspelled landmark would
+        otherwise silently yield no points.
+        """
+        if landmark_names is None:
+            self.landmark_whitelist = None
+            return
+
+        landmark_whitelist = set(landmark_names)
+        if self.landmark_names is not None:
+            unknown_names = landmark_whitelist - self.landmark_names
+            if unknown_names:
+                raise ValueError(f"Unknown landmarks in the {self.name} whitelist: {sorted(unknown_names)}")
+
+        self.landmark_whitelist = landmark_whitelist
+
+    def include_landmark(self, point_id: int) -> bool:
+        """
+        OPTIONAL METHOD
+
+        Trackers can call this while extracting landmarks so that only those named in `landmark_whitelist`
+        are passed on (all landmarks are kept when no whitelist is set). Filtering at the source means
+        the xy data, triangulation and export all shrink together.
+        """
+        if self.landmark_whitelist is None:
+            return True
+        return self.get_point_name(point_id) in self.landmark_whitelist
+
+    @property
+    def cache_parameters(self) -> dict:
+        """
+        OPTIONAL PROPERTY
+
+        Any settings that change the points a tracker returns for a given frame (e.g. detection confidence
+        thresholds or board dimensions). These become part of the key used by the PointCache so that
+        cached points are not reused after the tracker configuration changes.
+        """
+        if self.landmark_whitelist is None:
+            return {}
+        return {"landmark_whitelist": sorted(self.landmark_whitelist)}
+
     @property
     def metarig_mapped(self):
         """
@@ -30,12 +30,23 @@ class PostProcessor:
     The post processor will archive the active config.toml file into the subdirectory
     """
 
-    def __init__(self, camera_array: CameraArray, recording_path: Path, tracker_enum: TrackerEnum):
+    def __init__(
+        self,
+        camera_array: CameraArray,
+        recording_path: Path,
+        tracker_enum: TrackerEnum,
+        landmark_whitelist: list[str] | None = None,
+    ):
         self.camera_array = camera_array
         self.recording_path = recording_path
         self.tracker_enum = tracker_enum
         self.tracker_name = tracker_enum.name
-        self.tracker = tracker_enum.value()
+
+        # only tracked landmarks named in the whitelist are carried through xy, xyz and trc output
+        if landmark_whitelist is None:
+            self.tracker = tracker_enum.value()
+        else:
+            self.tracker = tracker_enum.value(landmark_whitelist=landmark_whitelist)
 
         # save out current camera array to output folder
         tracker_subdirectory = Path(self.recording_path, self.tracker_name)
@@ -44,7 +55,7 @@ class PostProcessor:
 
         logger.info(f"Creating sync stream manager for videos stored in {self.recording_path}")
         self.sync_stream_manager = SynchronizedStreamManager(
-            self.recording_path, self.camera_array.cameras, self.tracker
+            self.recording_path, self.camera_array.cameras, self.tracker, cache_points=True
         )
 
     def create_xy(self, fps_target=100, include_video=True):
@@ -63,13 +74,29 @@ class PostProcessor:
             )
             logger.info(f"(Stage 1 of 2): {percent_complete}% of frames processed for (x,y) landmark detection")
 
-    def create_xyz(self, xy_gap_fill=3, xyz_gap_fill=3, cutoff_freq=6, include_trc=True) -> None:
+        self.tracker.close()
+
+    def create_xyz(
+        self,
+        xy_gap_fill=3,
+        xyz_gap_fill=3,
+        cutoff_freq=6,
+        include_trc=True,
+        epipolar_threshold=None,
+        inlier_threshold=None,
+    ) -> None:
         """
         creates xyz_{tracker name}.csv file within the recording_path directory
 
         Uses the two functions above, first creating the xy points based on the tracker if they
         don't already exist, the triangulating them. Makes use of an internal method self.triangulate_xy_data
 
+        epipolar_threshold: optional distance in pixels used to screen out inconsistent 2D observations
+        (e.g. a swapped left/right hand in one view) prior to triangulation
+
+        inlier_threshold: optional reprojection error in pixels beyond which a view is left out of a
+        point's triangulation when it disagrees with the consensus of the other views
+
         """
 
         tracker_output_path = Path(self.recording_path, self.tracker_name)
@@ -86,7 +113,9 @@ class PostProcessor:
             logger.info("Filling small gaps in (x,y) data")
             xy = gap_fill_xy(xy, max_gap_size=xy_gap_fill)
             logger.info("Beginning data triangulation")
-            xyz = triangulate_xy(xy, self.camera_array)
+            xyz = triangulate_xy(
+                xy, self.camera_array, epipolar_threshold=epipolar_threshold, inlier_threshold=inlier_threshold
+            )
         else:
             logger.warning("No points tracked. Terminating post-processing early.")
             return
@@ -0,0 +1,158 @@
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+
+import caliscope.logger
+from caliscope.packets import PointPacket, Tracker
+
+logger = caliscope.logger.get(__name__)
+
+CACHE_SUBFOLDER = "point_cache"
+HASH_CHUNK_SIZE = 2**20  # read video files 1 MB at a time when hashing
+
+
+class PointCache:
+    """
+    On-disk store of the PointPackets a tracker produced for each frame of a video.
+
+    2D landmarks depend only on the video content, the tracker and the orientation of the frames,
+    so they can be reused when a recording is reprocessed (e.g. after recalibrating the camera array).
+    The cache file name is a hash of (video file hash, port, tracker name, tracker parameters, rotation_count)
+    and within the file each PointPacket is stored by its frame_index.
+
+    Files are written to a `point_cache` subfolder of the directory holding the videos.
+    """
+
+    def __init__(self, directory: Path, port: int, tracker: Tracker, rotation_count: int):
+        self.directory = directory
+        self.port = port
+        self.tracker = tracker
+        self.rotation_count = rotation_count
+
+        video_path = Path(self.directory, f"port_{self.port}.mp4")
+        key = {
+            "video_hash": hash_file(video_path),
+            "port": self.port,
+            "tracker_name": self.tracker.name,
+            "tracker_parameters": self.tracker.cache_parameters,
+            "rotation_count": self.rotation_count,
+        }
+        key_hash = hashlib.sha1(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+        self.path = Path(self.directory, CACHE_SUBFOLDER, f"{self.tracker.name}_port_{self.port}_{key_hash}.npz")
+
+        self.packets = {}
+        self.new_packets_added = False
+
+        if self.path.exists():
+            self.load()
+
+    def get(self, frame_index: int) -> PointPacket | None:
+        """returns None when the frame has not been tracked before"""
+        return self.packets.get(frame_index, None)
+
+    def add(self, frame_index: int, point_packet: PointPacket):
+        self.packets[frame_index] = point_packet
+        self.new_packets_added = True
+
+    def load(self):
+        logger.info(f"Loading cached {self.tracker.name} points for port {self.port} from {self.path}")
+        data = np.load(self.path)
+
+        frame_indices = data["frame_indices"]
+        # each frame's points occupy the rows between consecutive offsets
+        offsets = data["offsets"]
+        has_obj_loc = data["has_obj_loc"]
+        has_confidence = data["has_confidence"]
+        point_id = data["point_id"]
+        img_loc = data["img_loc"]
+        obj_loc = data["obj_loc"]
+        confidence = data["confidence"]
+
+        for i, frame_index in enumerate(frame_indices):
+            start, stop = offsets[i], offsets[i + 1]
+            if stop > start:
+                frame_obj_loc = obj_loc[start:stop] if has_obj_loc[i] else None
+                frame_confidence = confidence[start:stop] if has_confidence[i] else None
+                packet = PointPacket(point_id[start:stop], img_loc[start:stop], frame_obj_loc, frame_confidence)
+            else:
+                packet = PointPacket(np.array([]), np.array([]), np.array([]) if has_obj_loc[i] else None)
+
+            self.packets[int(frame_index)] = packet
+
+        self.new_packets_added = False
+
+    def save(self):
+        """only writes to disk when there are points that were not previously cached"""
+        if not self.new_packets_added:
+            return
+
+        frame_indices = np.array(sorted(self.packets.keys()), dtype=np.int64)
+        offsets = [0]
+        has_obj_loc = []
+        has_confidence = []
+        point_id = []
+        img_loc = []
+        obj_loc = []
+        confidence = []
+        img_loc_dtype = np.float64
+
+        for frame_index in frame_indices:
+            packet: PointPacket = self.packets[frame_index]
+            point_count = len(packet.point_id)
+            offsets.append(offsets[-1] + point_count)
+            has_obj_loc.append(packet.obj_loc is not None)
+            has_confidence.append(packet.confidence is not None)
+
+            if point_count > 0:
+                img_loc_dtype = packet.img_loc.dtype
+                point_id.append(packet.point_id)
+                img_loc.append(packet.img_loc)
+
+                if packet.obj_loc is not None:
+                    obj_loc.append(packet.obj_loc)
+                else:
+                    obj_loc.append(np.full((point_count, 3), np.nan))
+
+                if packet.confidence is not None:
+                    confidence.append(packet.confidence)
+                else:
+                    confidence.append(np.full(point_count, np.nan))
+
+        if len(point_id) > 0:
+            point_id = np.hstack(point_id)
+            img_loc = np.vstack(img_loc).astype(img_loc_dtype)
+            obj_loc = np.vstack(obj_loc)
+            confidence = np.hstack(confidence)
+        else:
+            point_id = np.array([], dtype=np.int64)
+            img_loc = np.empty((0, 2))
+            obj_loc = np.empty((0, 3))
+            confidence = np.array([])
+
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        logger.info(f"Saving {len(frame_indices)} frames of {self.tracker.name} points to cache at {self.path}")
+        # write via a file handle so that numpy does not append a second .npz suffix
+        with open(self.path, "wb") as f:
+            np.savez(
+                f,
+                frame_indices=frame_indices,
+                offsets=np.array(offsets, dtype=np.int64),
+                has_obj_loc=np.array(has_obj_loc, dtype=bool),
+                has_confidence=np.array(has_confidence, dtype=bool),
+                point_id=point_id,
+                img_loc=img_loc,
+                obj_loc=obj_loc,
+                confidence=confidence,
+            )
+        self.new_packets_added = False
+
+
+def hash_file(path: Path) -> str:
+    """hash of the full file content so that a re-recorded video with the same name is not mistaken for the old one"""
+    file_hash = hashlib.sha1()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
@@ -1,4 +1,6 @@
 import logging
+from collections import deque
+from concurrent.futures import Future
 from pathlib import Path
 from queue import Queue
 from threading import Event, Thread
@@ -9,7 +11,8 @@ import numpy as np
 import pandas as pd
 
 import caliscope.logger
-from caliscope.packets import FramePacket, Tracker
+from caliscope.packets import FramePacket, PointPacket, Tracker
+from caliscope.recording.point_cache import PointCache
 
 logger = caliscope.logger.get(__name__)
 logger.setLevel(logging.INFO)
@@ -31,6 +34,7 @@ class RecordedStream:
         fps_target: int = None,
         tracker: Tracker = None,
         break_on_last=True,
+        cache_points=False,
     ):
         # self.port = port
         self.directory = directory
@@ -43,6 +47,20 @@ class RecordedStream:
 
         self.tracker = tracker
 
+        # reuse the tracked points from a previous pass through the same video with the same tracker
+        if cache_points and self.tracker is not None:
+            self.point_cache = PointCache(self.directory, self.port, self.tracker, self.rotation_count)
+        else:
+            self.point_cache = None
+
+        # batched trackers are fed frames read ahead of playback during automated processing.
+        # Interactive playback (break_on_last == False) stays one frame at a time so jumps are cheap
+        if self.tracker is not None and self.break_on_last:
+            self.read_ahead_size = self.tracker.batch_size
+        else:
+            self.read_ahead_size = 1
+        self.read_ahead = deque()
+
         video_path = str(Path(self.directory, f"port_{self.port}.mp4"))
         self.capture = cv2.VideoCapture(video_path)
 
@@ -162,11 +180,101 @@ class RecordedStream:
         self.thread = Thread(target=self._play_worker, args=[], daemon=False)
         self.thread.start()
 
+    def get_point_data(self, frame: np.ndarray) -> PointPacket:
+        """
+        Track points on the current frame, or pull them from the point cache if this frame
+        has already been processed by the same tracker
+        """
+        if self.point_cache is not None:
+            point_data = self.point_cache.get(self.frame_index)
+            if point_data is None:
+                point_data = self.tracker.get_points(frame, self.port, self.rotation_count)
+                self.point_cache.add(self.frame_index, point_data)
+        else:
+            point_data = self.tracker.get_points(frame, self.port, self.rotation_count)
+
+        return point_data
+
+    def read_next_frame(self) -> tuple[bool, np.ndarray, PointPacket]:
+        """
+        Returns (success, frame, point_data) for self.frame_index.
+
+        If the tracker works on batches, frames are read ahead of the current frame index and
+        handed to `tracker.submit` together, so that the tracker can process them concurrently.
+        Otherwise this is a single read from the capture followed by `get_point_data`.
+        """
+        if self.read_ahead_size > 1:
+            if len(self.read_ahead) == 0:
+                self.fill_read_ahead()
+
+            if len(self.read_ahead) == 0:
+                return False, None, None
+
+            frame_index, frame, point_data = self.read_ahead.popleft()
+            if isinstance(point_data, Future):
+                point_data = point_data.result()
+                if self.point_cache is not None:
+                    self.point_cache.add(frame_index, point_data)
+
+            return True, frame, point_data
+
+        success, frame = self.capture.read()
+        if not success:
+            return False, None, None
+
+        if self.tracker is not None:
+            point_data = self.get_point_data(frame)
+        else:
+            point_data = None
+
+        return True, frame, point_data
+
+    def fill_read_ahead(self):
+        """
+        Read up to `read_ahead_size` frames and submit the ones without cached points to the tracker
+        """
+        frames_to_track = []
+        entries_to_track = []
+
+        for offset in range(self.read_ahead_size):
+            frame_index = self.frame_index + offset
+            if frame_index > self.last_frame_index:
+                break
+
+            success, frame = self.capture.read()
+            if not success:
+                break
+
+            cached_points = None if self.point_cache is None else self.point_cache.get(frame_index)
+            entry = [frame_index, frame, cached_points]
+            self.read_ahead.append(entry)
+
+            if cached_points is None:
+                frames_to_track.append(frame)
+                entries_to_track.append(entry)
+
+        if len(frames_to_track) > 0:
+            futures = self.tracker.submit(
+                frames_to_track,
+                [self.port] * len(frames_to_track),
+                [self.rotation_count] * len(frames_to_track),
+            )
+            for entry, future in zip(entries_to_track, futures):
+                entry[2] = future
+
     def _play_worker(self):
         """
         Places FramePacket on the out_q, mimicking the behaviour of the LiveStream.
+        Points tracked along the way are saved to the point cache however playback ends
+        (last frame reached, stop_event set, or an error)
         """
+        try:
+            self._play_frames()
+        finally:
+            if self.point_cache is not None:
+                self.point_cache.save()
 
+    def _play_frames(self):
         self.frame_index = self.start_frame_index
         logger.info(f"Beginning playback of video for port {self.port}")
 
@@ -189,16 +297,14 @@ class RecordedStream:
             if self.milestones is not None:
                 sleep(self.wait_to_next_frame())
             # logger.info(f"about to read frame {self.frame_index} from capture at port {self.port}")
-            success, self.frame = self.capture.read()
+            success, self.frame, self.point_data = self.read_next_frame()
 
             if not success:
                 break
 
             if self.tracker is not None:
-                self.point_data = self.tracker.get_points(self.frame, self.port, self.rotation_count)
                 draw_instructions = self.tracker.scatter_draw_instructions
             else:
-                self.point_data = None
                 draw_instructions = None
 
             frame_packet = FramePacket(
@@ -222,6 +328,7 @@ class RecordedStream:
 
             if self.frame_index > self.last_frame_index and self.break_on_last:
                 logger.info(f"Ending recorded playback at port {self.port}")
+
                 # time of -1 indicates end of stream
                 frame_packet = FramePacket(
                     port=self.port,
@@ -258,3 +365,4 @@ class RecordedStream:
                 self.frame_index = self._jump_q.get()
                 logger.info(f"Setting port {self.port} capture object to frame index {self.frame_index}")
                 self.capture.set(cv2.CAP_PROP_POS_FRAMES, self.frame_index)
+                self.read_ahead.clear()
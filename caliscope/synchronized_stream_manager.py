@@ -33,10 +33,16 @@ class SynchronizedStreamManager:
         recording_dir: Path,
         all_camera_data: dict[CameraData],
         tracker: Tracker = None,
+        cache_points: bool = False,
     ) -> None:
+        """
+        cache_points: store tracked points alongside the videos so that reprocessing the same recording
+                      with the same tracker does not need to run the tracker again
+        """
         self.recording_dir = recording_dir
         self.all_camera_data = all_camera_data
         self.tracker = tracker
+        self.cache_points = cache_points
 
         self.subfolder_name = "processed" if tracker is None else self.tracker.name
         self.output_dir = Path(self.recording_dir, self.subfolder_name)
@@ -55,6 +61,7 @@ class SynchronizedStreamManager:
                 rotation_count=camera.rotation_count,
                 tracker=self.tracker,
                 break_on_last=True,
+                cache_points=self.cache_points,
             )
 
             self.streams[camera.port] = stream
@@ -2,6 +2,9 @@
 # detector and the corner drawer...like, there will need to be something that
 # accumulates a frame of corners to be drawn onto the displayed frame.
 
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+
 import cv2
 import numpy as np
 
@@ -14,12 +17,27 @@ logger = caliscope.logger.get(__name__)
 
 
 class CharucoTracker(Tracker):
-    def __init__(self, charuco):
+    def __init__(self, charuco, pyramid_levels: int = 0, workers: int = 1):
+        """
+        pyramid_levels: number of times the frame is halved (cv2.pyrDown) before searching for
+                        aruco markers. The markers are large relative to the charuco corners so they can
+                        be found on a coarse image, while corner interpolation and subpixel refinement
+                        still happen on the full resolution frame. Default of 0 detects at full resolution.
+
+        workers: size of the pool used by `submit` to detect corners on a batch of frames at once.
+                 OpenCV releases the GIL during detection so a thread pool runs the frames in parallel.
+                 The pool is started by the first batch and shut down by `close`.
+        """
         # need camera to know resolution and to assign calibration parameters
         # to camera
         self.charuco = charuco
         self.board = charuco.board
         self.dictionary_object = self.charuco.dictionary_object
+        self.pyramid_levels = pyramid_levels
+
+        self.workers = workers
+        self.executor = None
+        self.executor_lock = Lock()  # streams sharing the tracker submit from their own threads
 
         # for subpixel corner correction
         self.criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.0001)
@@ -49,6 +67,33 @@ class CharucoTracker(Tracker):
 
         return point_packet
 
+    @property
+    def batch_size(self) -> int:
+        return self.workers
+
+    def submit(self, frames: list[np.ndarray], ports: list[int], rotation_counts: list[int]) -> list[Future]:
+        if self.workers == 1:
+            return super().submit(frames, ports, rotation_counts)
+
+        with self.executor_lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="charuco_tracker")
+
+            return [
+                self.executor.submit(self.get_points, frame, port, rotation_count)
+                for frame, port, rotation_count in zip(frames, ports, rotation_counts)
+            ]
+
+    def close(self):
+        with self.executor_lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+                self.executor = None
+
+    @property
+    def cache_parameters(self) -> dict:
+        return {**self.charuco.__dict__, "pyramid_levels": self.pyramid_levels}
+
     def get_point_name(self, point_id: int) -> str:
         return str(point_id)
 
@@ -63,7 +108,7 @@ class CharucoTracker(Tracker):
         img_loc = np.array([])
 
         # detect if aruco markers are present
-        aruco_corners, aruco_ids, rejected = cv2.aruco.detectMarkers(gray_frame, self.dictionary_object)
+        aruco_corners, aruco_ids = self.detect_markers(gray_frame)
 
         # if so, then interpolate to the Charuco Corners and return what you found
         if len(aruco_corners) > 3:
@@ -98,6 +143,27 @@ class CharucoTracker(Tracker):
 
         return ids, img_loc
 
+    def detect_markers(self, gray_frame):
+        """
+        Search for aruco markers on a downsampled level of the image pyramid and map the marker
+        corners back to the full resolution frame. With no pyramid levels this is simply `detectMarkers`
+        """
+        if self.pyramid_levels == 0:
+            aruco_corners, aruco_ids, rejected = cv2.aruco.detectMarkers(gray_frame, self.dictionary_object)
+            return aruco_corners, aruco_ids
+
+        coarse_frame = gray_frame
+        for _ in range(self.pyramid_levels):
+            coarse_frame = cv2.pyrDown(coarse_frame)
+
+        aruco_corners, aruco_ids, rejected = cv2.aruco.detectMarkers(coarse_frame, self.dictionary_object)
+
+        # pyrDown places pixel x of the coarse level at pixel 2x of the finer level
+        scale = 2**self.pyramid_levels
+        aruco_corners = tuple((corners * scale).astype(np.float32) for corners in aruco_corners)
+
+        return aruco_corners, aruco_ids
+
     def get_obj_loc(self, ids: np.ndarray):
         """Objective position of charuco corners in a board frame of reference"""
         # if self.ids == np.array([0]):
@@ -17,7 +17,10 @@ logger = caliscope.logger.get(__name__)
 
 class FaceTracker(Tracker):
     # Initialize MediaPipe Facemeshes and Drawing utility
-    def __init__(self) -> None:
+    def __init__(self, landmark_whitelist: list[str] | None = None) -> None:
+        # optionally restrict output to the named landmarks
+        self.set_landmark_whitelist(landmark_whitelist)
+
         self.in_queue = Queue(-1)
         self.out_queue = Queue(-1)
 
@@ -53,6 +56,8 @@ class FaceTracker(Tracker):
                 if results.multi_face_landmarks:
                     for face_landmarks in results.multi_face_landmarks:
                         for landmark_id, landmark in enumerate(face_landmarks.landmark):
+                            if not self.include_landmark(landmark_id):
+                                continue
                             point_ids.append(landmark_id)
 
                             # mediapipe expresses in terms of percent of frame, so must map to pixel position
@@ -84,6 +89,11 @@ class FaceTracker(Tracker):
 
         return point_packet
 
+    @property
+    def landmark_names(self) -> set[str]:
+        # refine_landmarks adds the iris landmarks
+        return {str(landmark_id) for landmark_id in range(mp.solutions.face_mesh.FACEMESH_NUM_LANDMARKS_WITH_IRISES)}
+
     def get_point_name(self, point_id: int) -> str:
         return str(point_id)
 
@@ -17,7 +17,10 @@ logger = caliscope.logger.get(__name__)
 
 class HandTracker(Tracker):
     # Initialize MediaPipe Hands and Drawing utility
-    def __init__(self) -> None:
+    def __init__(self, landmark_whitelist: list[str] | None = None) -> None:
+        # optionally restrict output to the named landmarks
+        self.set_landmark_whitelist(landmark_whitelist)
+
         self.in_queue = Queue(-1)
         self.out_queue = Queue(-1)
 
@@ -71,6 +74,8 @@ class HandTracker(Tracker):
                             side_adjustment_factor = 100
 
                         for landmark_id, landmark in enumerate(hand_landmarks.landmark):
+                            if not self.include_landmark(landmark_id + side_adjustment_factor):
+                                continue
                             point_ids.append(landmark_id + side_adjustment_factor)
 
                             # mediapipe expresses in terms of percent of frame, so must map to pixel position
@@ -104,6 +109,12 @@ class HandTracker(Tracker):
 
         return point_packet
 
+    @property
+    def landmark_names(self) -> set[str]:
+        # right hand landmarks are offset by 100 (see run_frame_processor)
+        landmark_ids = range(len(mp.solutions.hands.HandLandmark))
+        return {str(landmark_id + side_offset) for side_offset in [0, 100] for landmark_id in landmark_ids}
+
     def get_point_name(self, point_id: int) -> str:
         return str(point_id)
 
@@ -126,7 +126,10 @@ FACE_OFFSET = 500
 
 ###
 class HolisticTracker(Tracker):
-    def __init__(self) -> None:
+    def __init__(self, landmark_whitelist: list[str] | None = None) -> None:
+        # optionally restrict output to the named landmarks
+        self.set_landmark_whitelist(landmark_whitelist)
+
         # each port gets its own mediapipe context manager
         # use a dictionary of queues for passing
         self.in_queues = {}
@@ -163,7 +166,7 @@ class HolisticTracker(Tracker):
                         if landmark.x < 0 or landmark.x > 1 or landmark.y < 0 or landmark.y > 1:
                             # ignore
                             pass
-                        else:
+                        elif self.include_landmark(landmark_id + POSE_OFFSET):
                             point_ids.append(landmark_id + POSE_OFFSET)
                             landmark_xy.append((x, y))
 
@@ -174,7 +177,7 @@ class HolisticTracker(Tracker):
                         if landmark.x < 0 or landmark.x > 1 or landmark.y < 0 or landmark.y > 1:
                             # ignore
                             pass
-                        else:
+                        elif self.include_landmark(landmark_id + RIGHT_HAND_OFFSET):
                             point_ids.append(landmark_id + RIGHT_HAND_OFFSET)
                             landmark_xy.append((x, y))
 
@@ -185,7 +188,7 @@ class HolisticTracker(Tracker):
                         if landmark.x < 0 or landmark.x > 1 or landmark.y < 0 or landmark.y > 1:
                             # ignore
                             pass
-                        else:
+                        elif self.include_landmark(landmark_id + LEFT_HAND_OFFSET):
                             point_ids.append(landmark_id + LEFT_HAND_OFFSET)
                             landmark_xy.append((x, y))
 
@@ -196,7 +199,7 @@ class HolisticTracker(Tracker):
                         if landmark.x < 0 or landmark.x > 1 or landmark.y < 0 or landmark.y > 1:
                             # ignore
                             pass
-                        else:
+                        elif self.include_landmark(landmark_id + FACE_OFFSET):
                             point_ids.append(landmark_id + FACE_OFFSET)
                             landmark_xy.append((x, y))
 
@@ -225,6 +228,11 @@ class HolisticTracker(Tracker):
 
         return point_packet
 
+    @property
+    def landmark_names(self) -> set[str]:
+        face_names = {"face_" + str(face_id) for face_id in range(mp.solutions.face_mesh.FACEMESH_NUM_LANDMARKS)}
+        return set(POINT_NAMES.values()) | face_names
+
     def get_point_name(self, point_id) -> str:
         if point_id < FACE_OFFSET:
             point_name = POINT_NAMES[point_id]
@@ -52,7 +52,10 @@ POINT_NAMES = {
 
 
 class PoseTracker(Tracker):
-    def __init__(self) -> None:
+    def __init__(self, landmark_whitelist: list[str] | None = None) -> None:
+        # optionally restrict output to the named landmarks
+        self.set_landmark_whitelist(landmark_whitelist)
+
         # each port gets its own mediapipe context manager
         # use a dictionary of queues for passing
         self.in_queues = {}
@@ -87,6 +90,8 @@ class PoseTracker(Tracker):
 
                 if results.pose_landmarks:
                     for landmark_id, landmark in enumerate(results.pose_landmarks.landmark):
+                        if not self.include_landmark(landmark_id):
+                            continue
                         point_ids.append(landmark_id)
 
                         # mediapipe expresses in terms of percent of frame, so must map to pixel position
@@ -118,6 +123,10 @@ class PoseTracker(Tracker):
 
         return point_packet
 
+    @property
+    def landmark_names(self) -> set[str]:
+        return set(POINT_NAMES.values())
+
     def get_point_name(self, point_id) -> str:
         return POINT_NAMES[point_id]
 
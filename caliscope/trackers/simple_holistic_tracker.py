@@ -173,7 +173,10 @@ FACE_OFFSET = 500
 
 
 class SimpleHolisticTracker(Tracker):
-    def __init__(self) -> None:
+    def __init__(self, landmark_whitelist: list[str] | None = None) -> None:
+        # optionally restrict output to the named landmarks
+        self.set_landmark_whitelist(landmark_whitelist)
+
         # each port gets its own mediapipe context manager
         # use a dictionary of queues for passing
         self.in_queues = {}
@@ -228,7 +231,7 @@ class SimpleHolisticTracker(Tracker):
                             # some of the pose values are too noisy to bother with including considering that
                             # holistic face and hand tracking is so good
                             # ignore those points that aren't in the POINT_NAMES list
-                            if mapped_point_id in POINT_NAMES:
+                            if mapped_point_id in POINT_NAMES and self.include_landmark(mapped_point_id):
                                 point_ids.append(landmark_id + POSE_OFFSET)
                                 landmark_xy.append((x, y))
 
@@ -239,7 +242,7 @@ class SimpleHolisticTracker(Tracker):
                         if landmark.x < 0 or landmark.x > 1 or landmark.y < 0 or landmark.y > 1:
                             # ignore
                             pass
-                        else:
+                        elif self.include_landmark(landmark_id + RIGHT_HAND_OFFSET):
                             point_ids.append(landmark_id + RIGHT_HAND_OFFSET)
                             landmark_xy.append((x, y))
 
@@ -250,7 +253,7 @@ class SimpleHolisticTracker(Tracker):
                         if landmark.x < 0 or landmark.x > 1 or landmark.y < 0 or landmark.y > 1:
                             # ignore
                             pass
-                        else:
+                        elif self.include_landmark(landmark_id + LEFT_HAND_OFFSET):
                             point_ids.append(landmark_id + LEFT_HAND_OFFSET)
                             landmark_xy.append((x, y))
 
@@ -265,7 +268,7 @@ class SimpleHolisticTracker(Tracker):
                             face_id = landmark_id + FACE_OFFSET
                             # only track the point if it is in the list of names above
                             # this will significantly reduce the data tracked.
-                            if face_id in POINT_NAMES.keys():
+                            if face_id in POINT_NAMES.keys() and self.include_landmark(face_id):
                                 point_ids.append(landmark_id + FACE_OFFSET)
                                 landmark_xy.append((x, y))
 
@@ -303,6 +306,10 @@ class SimpleHolisticTracker(Tracker):
 
         return point_packet
 
+    @property
+    def landmark_names(self) -> set[str]:
+        return set(POINT_NAMES.values())
+
     def get_point_name(self, point_id) -> str:
         # this if/else should be unnecessary now that only select points are being passed on up the chain.
         # if point_id < FACE_OFFSET:
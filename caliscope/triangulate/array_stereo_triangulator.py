@@ -2,6 +2,7 @@ from itertools import combinations
 
 import cv2
 import numpy as np
+import pandas as pd
 
 import caliscope.logger
 from caliscope.cameras.camera_array import CameraArray, CameraData
@@ -36,6 +37,31 @@ class ArrayStereoTriangulator:
             if paired_point_packet is not None:
                 self.triangulators[pair].add_3D_points(paired_point_packet)
 
+    def triangulate_stereo_points_table(self, stereo_points_table: pd.DataFrame) -> pd.DataFrame:
+        """
+        Batch equivalent of triangulate_synched_points for the output of StereoPointsBuilder.get_stereo_points_table
+
+        Each pair is triangulated in a single call across all of its sync indices.
+        returns the table with x_pos, y_pos, z_pos inserted ahead of the 2D observations
+        """
+        xy_A = stereo_points_table[["x_A", "y_A"]].to_numpy(dtype=np.float64)
+        xy_B = stereo_points_table[["x_B", "y_B"]].to_numpy(dtype=np.float64)
+        xyz = np.full((len(stereo_points_table), 3), np.nan)
+
+        for pair, pair_rows in stereo_points_table.groupby(["port_A", "port_B"]).indices.items():
+            pair = tuple(int(port) for port in pair)
+            if pair not in self.triangulators:
+                continue
+
+            xyz[pair_rows] = self.triangulators[pair].triangulate(xy_A[pair_rows], xy_B[pair_rows])
+
+        stereotriangulated_table = stereo_points_table.copy()
+        position = stereotriangulated_table.columns.get_loc("x_A")
+        for axis, column in enumerate(["x_pos", "y_pos", "z_pos"]):
+            stereotriangulated_table.insert(position + axis, column, xyz[:, axis])
+
+        return stereotriangulated_table
+
 
 class StereoPairTriangulator:
     def __init__(self, camera_A: CameraData, camera_B: CameraData):
@@ -63,18 +89,27 @@ class StereoPairTriangulator:
             xy_B = paired_points.img_loc_B
 
         if xy_A.shape[0] > 0:
-            points_A_undistorted = undistort(xy_A, self.camera_A)
-            points_B_undistorted = undistort(xy_B, self.camera_B)
-
-            # triangulate points outputs data in 4D homogenous coordinate system
-            # note that these are in a world frame of reference
-            xyzw_h = cv2.triangulatePoints(self.proj_A, self.proj_B, points_A_undistorted, points_B_undistorted)
-
-            xyz_h = xyzw_h.T[:, :3]
-            w = xyzw_h[3, :]
-            xyz = np.divide(xyz_h.T, w).T  # convert to euclidean coordinates
+            xyz = self.triangulate(xy_A, xy_B)
         else:
             xyz = np.array([])
 
         # update the paired point packet with the 3d positions
         paired_points.xyz = xyz
+
+    def triangulate(self, xy_A: np.ndarray, xy_B: np.ndarray) -> np.ndarray:
+        """
+        xy_A, xy_B: (n,2) distorted image points of the same n objects as seen by each camera
+        returns (n,3) positions in the world frame of reference
+        """
+        points_A_undistorted = undistort(xy_A, self.camera_A)
+        points_B_undistorted = undistort(xy_B, self.camera_B)
+
+        # triangulate points outputs data in 4D homogenous coordinate system
+        # note that these are in a world frame of reference
+        xyzw_h = cv2.triangulatePoints(self.proj_A, self.proj_B, points_A_undistorted, points_B_undistorted)
+
+        xyz_h = xyzw_h.T[:, :3]
+        w = xyzw_h[3, :]
+        xyz = np.divide(xyz_h.T, w).T  # convert to euclidean coordinates
+
+        return xyz
@@ -4,6 +4,7 @@ from itertools import combinations
 from pathlib import Path
 
 import numpy as np
+import pandas as pd
 
 import caliscope.logger
 from caliscope.cameras.synchronizer import Synchronizer
@@ -72,6 +73,50 @@ class StereoPointsBuilder:
 
         return SynchedStereoPointsPacket(sync_index, paired_points_packets)
 
+    def get_stereo_points_table(self, point_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Batch equivalent of get_synched_paired_points over a full xy table (as saved in xy.csv)
+
+        For each pair, the observations of port_A and port_B are joined on (sync_index, point_id)
+        in a single merge rather than rebuilding SyncPackets one sync index at a time.
+        Rows are ordered by sync_index, then pair, then point_id.
+
+        returns a dataframe with columns: pair, port_A, port_B, sync_index, point_id, x_A, y_A, x_B, y_B
+        """
+        observations = point_data[["sync_index", "port", "point_id", "img_loc_x", "img_loc_y"]].drop_duplicates(
+            subset=["sync_index", "port", "point_id"]
+        )
+        port_observations = {port: df.drop(columns="port") for port, df in observations.groupby("port")}
+
+        pair_tables = []
+        for pair in self.pairs:
+            port_A, port_B = pair
+            if port_A not in port_observations or port_B not in port_observations:
+                continue
+
+            pair_table = port_observations[port_A].merge(
+                port_observations[port_B], on=["sync_index", "point_id"], suffixes=("_A", "_B")
+            )
+            if len(pair_table) == 0:
+                continue
+
+            pair_table = pair_table.rename(
+                columns={"img_loc_x_A": "x_A", "img_loc_y_A": "y_A", "img_loc_x_B": "x_B", "img_loc_y_B": "y_B"}
+            ).sort_values(["sync_index", "point_id"])
+            pair_table.insert(0, "pair", [pair] * len(pair_table))
+            pair_table.insert(1, "port_A", port_A)
+            pair_table.insert(2, "port_B", port_B)
+            pair_tables.append(pair_table)
+
+        columns = ["pair", "port_A", "port_B", "sync_index", "point_id", "x_A", "y_A", "x_B", "y_B"]
+        if len(pair_tables) == 0:
+            return pd.DataFrame(columns=columns)
+
+        # stable sort keeps pairs (and point ids within them) in order within each sync index
+        stereo_points_table = pd.concat(pair_tables)[columns].sort_values("sync_index", kind="stable")
+
+        return stereo_points_table.reset_index(drop=True)
+
 
 @dataclass
 class StereoPointsPacket:
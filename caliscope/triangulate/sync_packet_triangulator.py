@@ -1,23 +1,44 @@
+from collections import deque
 from pathlib import Path
 from queue import Queue
 from threading import Event, Thread
+from time import perf_counter
 
 import numpy as np
-import pandas as pd
 
 import caliscope.logger
-from caliscope.cameras.camera_array import CameraArray
+from caliscope.cameras.camera_array import CameraArray, CameraData
 from caliscope.cameras.synchronizer import Synchronizer, SyncPacket
 from caliscope.packets import XYZPacket
-from caliscope.triangulate.triangulation import triangulate_sync_index
+from caliscope.triangulate.triangulation import (
+    get_dense_projection_matrices,
+    get_undistortion_map,
+    triangulate_sync_index,
+    undistort,
+    undistort_lookup,
+)
+from caliscope.triangulate.xyz_writer import XYZChunkWriter
 
 logger = caliscope.logger.get(__name__)
 
+LATENCY_WINDOW = 1000  # number of recent packets used for latency percentiles
+INITIAL_BUFFER_CAPACITY = 1024  # observations per sync packet; grows as needed
+
 
 class SyncPacketTriangulator:
     """
-    Will place 3d packets on subscribed queues and save consolidated data in csv
-    format to output_path if provided
+    Will place 3d packets on subscribed queues and stream consolidated data in csv
+    format into recording_directory if provided (see XYZChunkWriter)
+
+    Image points are undistorted and gathered into preallocated columnar buffers before triangulation.
+    The time taken to turn each sync packet into an xyz packet is tracked and available via
+    `latency_percentiles`.
+
+    real_time: intended for live display. Image points are undistorted through per-camera lookup tables
+    that are built up front, triangulation uses the cheaper normal equations and, if processing falls
+    behind, stale sync packets are skipped so that output stays current. Skipped packets are not
+    triangulated, so this should not be used when the xyz history is the goal. Otherwise points are
+    undistorted directly (or through a camera's lookup table if one has already been built).
     """
 
     def __init__(
@@ -26,28 +47,38 @@ class SyncPacketTriangulator:
         synchronizer: Synchronizer,
         recording_directory: Path = None,
         tracker_name: str = None,  # used only for getting the point names and tracker name
+        real_time: bool = False,
     ):
         self.camera_array = camera_array
         self.synchronizer = synchronizer
         self.recording_directory = recording_directory
+        self.real_time = real_time
+        self.triangulation_method = "normal" if real_time else "svd"
 
         self.stop_thread = Event()
         self.stop_thread.clear()
 
         self.tracker_name = tracker_name
 
-        self.xyz_history = {
-            "sync_index": [],
-            "point_id": [],
-            "x_coord": [],
-            "y_coord": [],
-            "z_coord": [],
-        }
+        self.xyz_writer = XYZChunkWriter(self.get_output_path())
 
         self.sync_packet_in_q = Queue(-1)
         self.synchronizer.subscribe_to_sync_packets(self.sync_packet_in_q)
 
-        self.projection_matrices = self.camera_array.projection_matrices
+        self.projection_matrices = get_dense_projection_matrices(self.camera_array)
+
+        if self.real_time:
+            # build lookup tables up front so the first packets are not delayed
+            for camera in self.camera_array.cameras.values():
+                get_undistortion_map(camera)
+        self.warm_up()
+
+        self.port_buffer = np.empty(INITIAL_BUFFER_CAPACITY, dtype=np.int64)
+        self.point_id_buffer = np.empty(INITIAL_BUFFER_CAPACITY, dtype=np.int64)
+        self.img_buffer = np.empty((INITIAL_BUFFER_CAPACITY, 2), dtype=np.float64)
+
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.dropped_packet_count = 0
 
         self.subscribers = []
         self.running = True
@@ -60,7 +91,85 @@ class SyncPacketTriangulator:
     def unsubscriber(self, queue: Queue):
         self.subscribers.remove(queue)
 
+    @property
+    def latency_percentiles(self) -> dict | None:
+        """
+        p50 and p99 of the milliseconds taken to triangulate recent sync packets
+        (from removal off the queue to the xyz packet being published)
+        """
+        if len(self.latencies) == 0:
+            return None
+
+        p50, p99 = np.percentile(np.array(self.latencies), [50, 99])
+        return {"p50": p50 * 1000, "p99": p99 * 1000}
+
+    def load_triangulation_inputs(self, sync_packet: SyncPacket) -> int:
+        """
+        Fills the columnar buffers with the undistorted points of the sync packet
+        returns the number of observations loaded
+        """
+        observation_count = 0
+        for port, frame_packet in sync_packet.frame_packets.items():
+            if frame_packet is None or frame_packet.points is None or port not in self.camera_array.cameras:
+                continue
+
+            point_count = len(frame_packet.points.point_id)
+            if point_count == 0:
+                continue
+
+            stop = observation_count + point_count
+            if stop > len(self.port_buffer):
+                self.grow_buffers(stop)
+
+            self.port_buffer[observation_count:stop] = port
+            self.point_id_buffer[observation_count:stop] = frame_packet.points.point_id
+            self.img_buffer[observation_count:stop] = self.undistort(
+                frame_packet.points.img_loc, self.camera_array.cameras[port]
+            ).T
+            observation_count = stop
+
+        return observation_count
+
+    def undistort(self, points: np.ndarray, camera: CameraData) -> np.ndarray:
+        if self.real_time or camera.has_cached("undistortion_map"):
+            return undistort_lookup(points, camera)
+        return undistort(points, camera)
+
+    def warm_up(self):
+        """
+        Compile the jitted kernels on a dummy observation so that compilation time
+        does not land on the first sync packets
+        """
+        ports = list(self.camera_array.cameras.keys())[:2]
+        if len(ports) < 2:
+            return
+
+        img_xy = np.array([[0.0, 0.0], [0.0, 0.0]])
+        for port in ports:
+            self.undistort(img_xy, self.camera_array.cameras[port])
+
+        triangulate_sync_index(
+            self.projection_matrices,
+            np.array(ports, dtype=np.int64),
+            np.zeros(2, dtype=np.int64),
+            img_xy,
+            method=self.triangulation_method,
+        )
+
+    def grow_buffers(self, minimum_capacity: int):
+        capacity = max(minimum_capacity, 2 * len(self.port_buffer))
+        self.port_buffer = np.empty(capacity, dtype=np.int64)
+        self.point_id_buffer = np.empty(capacity, dtype=np.int64)
+        self.img_buffer = np.empty((capacity, 2), dtype=np.float64)
+
     def process_incoming(self):
+        try:
+            self.triangulate_incoming()
+        finally:
+            # cleared even if saving fails so that anything waiting on the triangulator is released
+            self.running = False
+
+    def triangulate_incoming(self):
         # waiting to set running property here was causing issues with identifying state of thread.
         # set property to true then start thread...
 
@@ -68,6 +177,14 @@ class SyncPacketTriangulator:
         while not self.stop_thread.is_set():
             sync_packet: SyncPacket = self.sync_packet_in_q.get()
 
+            if self.real_time:
+                # only the most recent packet matters for live display, so skip any that have gone stale
+                while sync_packet is not None and not self.sync_packet_in_q.empty():
+                    sync_packet = self.sync_packet_in_q.get()
+                    self.dropped_packet_count += 1
+
+            start = perf_counter()
+
             if sync_packet is None:
                 # No more sync packets after this... wind down
                 self.stop_thread.set()
@@ -78,18 +195,17 @@ class SyncPacketTriangulator:
                 )
                 # only attempt to process if data exists
                 if sync_packet.frame_packet_count >= 2:
-                    cameras, point_ids, imgs_xy = sync_packet.triangulation_inputs
                     logger.debug("Attempting to triangulate synced frames")
-                    # prepare for jit
-                    cameras = np.array(cameras)
-                    point_ids = np.array(point_ids)
-                    imgs_xy = np.array(imgs_xy)
+                    observation_count = self.load_triangulation_inputs(sync_packet)
+                    cameras = self.port_buffer[:observation_count]
+                    point_ids = self.point_id_buffer[:observation_count]
+                    imgs_xy = self.img_buffer[:observation_count]
 
                     logger.debug(f"Cameras are {cameras} and point_ids are {point_ids}")
                     if len(np.unique(cameras)) >= 2:
                         logger.debug(f"Points observed on cameras {np.unique(cameras)}")
                         point_id_xyz, points_xyz = triangulate_sync_index(
-                            self.projection_matrices, cameras, point_ids, imgs_xy
+                            self.projection_matrices, cameras, point_ids, imgs_xy, method=self.triangulation_method
                         )
 
                         logger.debug(
@@ -97,7 +213,7 @@ class SyncPacketTriangulator:
                         )
 
                         xyz_packet = XYZPacket(sync_packet.sync_index, point_id_xyz, points_xyz)
-                        logger.info(
+                        logger.debug(
                             f"Placing xyz pacKet for index {sync_packet.sync_index} with {len(xyz_packet.point_ids)} points"  # noqa E501
                         )
                         for q in self.subscribers:
@@ -106,34 +222,37 @@ class SyncPacketTriangulator:
                         # if self.output_path is not None:
                         self.add_packet_to_history(xyz_packet)
 
-        self.running = False
+                        self.latencies.append(perf_counter() - start)
+
+        latency = self.latency_percentiles
+        if latency is not None:
+            logger.info(
+                f"Triangulation latency per sync packet: p50 {latency['p50']:.2f} ms, p99 {latency['p99']:.2f} ms "
+                f"({self.dropped_packet_count} stale packets skipped)"
+            )
 
         if self.recording_directory is not None:
             logger.info(f"Saving xyz point data to {self.recording_directory}")
-            self.save_history()
-
-    def add_packet_to_history(self, xyz_packet: XYZPacket):
-        point_count = len(xyz_packet.point_ids)
+        self.save_history()
 
-        if point_count > 0:
-            self.xyz_history["sync_index"].extend([xyz_packet.sync_index] * point_count)
-            self.xyz_history["point_id"].extend(xyz_packet.point_ids)
-
-            xyz_array = np.array(xyz_packet.point_xyz)
-            self.xyz_history["x_coord"].extend(xyz_array[:, 0].tolist())
-            self.xyz_history["y_coord"].extend(xyz_array[:, 1].tolist())
-            self.xyz_history["z_coord"].extend(xyz_array[:, 2].tolist())
-
-    def save_history(self) -> None:
+    def get_output_path(self) -> Path | None:
         """
-        If a recording directory is provided, then save the xyz directory into it
+        If a recording directory is provided, then the xyz data is saved into it
         If a tracker name is provided, then base name on the tracker name
         """
-        df_xyz: pd.DataFrame = pd.DataFrame(self.xyz_history)
+        if self.recording_directory is None:
+            return None
 
-        if self.recording_directory is not None:
-            if self.tracker_name is None:
-                filename = "xyz.csv"
-            else:
-                filename = f"xyz_{self.tracker_name}.csv"
-                df_xyz.to_csv(Path(self.recording_directory, filename))
+        if self.tracker_name is None:
+            filename = "xyz.csv"
+        else:
+            filename = f"xyz_{self.tracker_name}.csv"
+
+        return Path(self.recording_directory, filename)
+
+    def add_packet_to_history(self, xyz_packet: XYZPacket):
+        self.xyz_writer.add(xyz_packet)
+
+    def save_history(self) -> None:
+        """Write out any buffered points and wait for the xyz file to be complete"""
+        self.xyz_writer.close()
@@ -0,0 +1,141 @@
+from pathlib import Path
+from queue import Full, Queue
+from threading import Thread
+
+import numpy as np
+import pandas as pd
+
+import caliscope.logger
+from caliscope.packets import XYZPacket
+
+logger = caliscope.logger.get(__name__)
+
+CHUNK_SIZE = 2**16  # points held in memory before a block is handed off for writing
+MAX_PENDING_CHUNKS = 4  # blocks waiting on the writer thread before add() blocks
+WRITER_CHECK_INTERVAL = 0.5  # seconds between checks that the writer thread is still running while add() blocks
+XYZ_COLUMNS = ["sync_index", "point_id", "x_coord", "y_coord", "z_coord"]
+
+
+class XYZChunkWriter:
+    """
+    Streams triangulated points to csv in fixed-size blocks so that memory stays bounded over long sessions
+    and the data written so far survives if the process dies.
+
+    Points are copied into a preallocated block. Full blocks are placed on a bounded queue and appended to
+    the csv by a background thread. The row index carries across blocks so that the completed file matches
+    what `pd.DataFrame(history).to_csv(path)` would have produced from the full session.
+
+    If path is None, points are discarded. If writing fails (e.g. the disk is full), the error is raised
+    from the next call to add, flush or close.
+    """
+
+    def __init__(self, path: Path | None, chunk_size: int = CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.rows_written = 0
+        self.new_block()
+
+        self.chunk_q = Queue(MAX_PENDING_CHUNKS)
+        self.error: Exception | None = None
+        self.thread = None
+        if self.path is not None:
+            self.thread = Thread(target=self.write_chunks, args=(), daemon=True)
+            self.thread.start()
+
+    def new_block(self):
+        self.sync_index = np.empty(self.chunk_size, dtype=np.int64)
+        self.point_id = np.empty(self.chunk_size, dtype=np.int64)
+        self.xyz = np.empty((self.chunk_size, 3), dtype=np.float64)
+        self.row_count = 0
+
+    def add(self, xyz_packet: XYZPacket):
+        if self.path is None:
+            return
+
+        point_ids = np.asarray(xyz_packet.point_ids).reshape(-1)
+        point_xyz = np.asarray(xyz_packet.point_xyz).reshape(-1, 3)
+
+        # a packet may straddle the end of a block
+        start = 0
+        while start < len(point_ids):
+            stop = min(len(point_ids), start + self.chunk_size - self.row_count)
+            block_stop = self.row_count + stop - start
+
+            self.sync_index[self.row_count : block_stop] = xyz_packet.sync_index
+            self.point_id[self.row_count : block_stop] = point_ids[start:stop]
+            self.xyz[self.row_count : block_stop] = point_xyz[start:stop]
+            self.row_count = block_stop
+            start = stop
+
+            if self.row_count == self.chunk_size:
+                self.flush()
+
+    def flush(self):
+        """hand off the current block to the writer thread and start a new one"""
+        if self.row_count > 0:
+            block = (
+                self.sync_index[: self.row_count],
+                self.point_id[: self.row_count],
+                self.xyz[: self.row_count],
+            )
+            self.put_chunk(block)
+            self.new_block()
+
+    def close(self):
+        """write any remaining points and wait for the file to be complete"""
+        if self.thread is None:
+            return
+
+        self.flush()
+        self.put_chunk(None)
+        self.thread.join()
+        self.thread = None
+        self.check_writer()
+
+    def put_chunk(self, block: tuple | None):
+        """place a block on the queue, waiting for room only while the writer thread can still make it"""
+        while True:
+            self.check_writer()
+            try:
+                self.chunk_q.put(block, timeout=WRITER_CHECK_INTERVAL)
+                return
+            except Full:
+                continue
+
+    def check_writer(self):
+        """raise the error that stopped the writer thread, if any"""
+        if self.error is not None:
+            raise self.error
+        if self.thread is not None and not self.thread.is_alive():
+            raise RuntimeError(f"The thread writing xyz points to {self.path} has stopped")
+
+    def write_chunks(self):
+        try:
+            self.path.parent.mkdir(exist_ok=True, parents=True)
+            # truncate any file left by a previous session and write the header
+            pd.DataFrame({column: [] for column in XYZ_COLUMNS}).to_csv(self.path)
+
+            while True:
+                block = self.chunk_q.get()
+                if block is None:
+                    break
+
+                sync_index, point_id, xyz = block
+                row_count = len(sync_index)
+                df_xyz = pd.DataFrame(
+                    {
+                        "sync_index": sync_index,
+                        "point_id": point_id,
+                        "x_coord": xyz[:, 0],
+                        "y_coord": xyz[:, 1],
+                        "z_coord": xyz[:, 2],
+                    },
+                    index=pd.RangeIndex(self.rows_written, self.rows_written + row_count),
+                )
+                df_xyz.to_csv(self.path, mode="a", header=False)
+                self.rows_written += row_count
+
+            logger.info(f"Finished writing {self.rows_written} xyz points to {self.path}")
+        except Exception as e:
+            logger.error(f"Failed to write xyz points to {self.path}: {e}")
+            self.error = e
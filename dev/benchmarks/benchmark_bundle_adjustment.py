@@ -0,0 +1,126 @@
+"""
+Time the CaptureVolume bundle adjustment on a synthetic capture.
+
+A ring of 8 cameras observes a cloud of points, each seen by every camera. Camera extrinsics and
+point positions are perturbed from the truth and then optimized. The same problem is solved with
+the finite difference jacobian (estimated by scipy from the sparsity pattern) and with the analytic
+jacobian used by `CaptureVolume.optimize`, and then with the Schur complement Levenberg-Marquardt solver
+(`CaptureVolume.optimize(solver="schur")`).
+
+Usage: python benchmark_bundle_adjustment.py [point count]
+"""
+
+import sys
+from time import perf_counter
+
+import cv2
+import numpy as np
+from scipy.optimize import least_squares
+
+import caliscope.logger
+from caliscope.calibration.capture_volume.capture_volume import (
+    CaptureVolume,
+    xy_reprojection_error,
+    xy_reprojection_jacobian,
+    xy_reprojection_jacobian_blocks,
+)
+from caliscope.calibration.capture_volume.point_estimates import PointEstimates
+from caliscope.calibration.capture_volume.schur_solver import levenberg_marquardt
+from caliscope.cameras.camera_array import CameraArray, CameraData
+
+logger = caliscope.logger.get(__name__)
+
+CAMERA_COUNT = 8
+POINT_COUNT = 20_000
+
+
+def synthetic_capture_volume(seed: int = 0, point_count: int = POINT_COUNT) -> CaptureVolume:
+    rng = np.random.default_rng(seed)
+    matrix = np.array([[1000.0, 0, 640], [0, 1000.0, 360], [0, 0, 1]])
+    distortions = np.array([-0.1, 0.05, 0.001, -0.001, 0.0])
+
+    cameras = {}
+    for port in range(CAMERA_COUNT):
+        angle = 2 * np.pi * port / CAMERA_COUNT
+        camera_position = np.array([3 * np.cos(angle), 3 * np.sin(angle), 0])
+        z_axis = -camera_position / np.linalg.norm(camera_position)
+        x_axis = np.cross([0, 0, 1], z_axis)
+        y_axis = np.cross(z_axis, x_axis)
+        rotation = np.vstack([x_axis, y_axis, z_axis])
+        cameras[port] = CameraData(
+            port=port,
+            size=(1280, 720),
+            matrix=matrix,
+            distortions=distortions,
+            rotation=rotation,
+            translation=-rotation @ camera_position,
+        )
+    camera_array = CameraArray(cameras)
+
+    obj = rng.uniform(-0.5, 0.5, size=(point_count, 3))
+    obj_indices = np.tile(np.arange(point_count), CAMERA_COUNT)
+    camera_indices = np.repeat(np.arange(CAMERA_COUNT), point_count)
+    img = np.empty((len(obj_indices), 2))
+    for port, camera in cameras.items():
+        rvec = cv2.Rodrigues(camera.rotation)[0]
+        projected, _ = cv2.projectPoints(obj, rvec, camera.translation, camera.matrix, camera.distortions)
+        img[camera_indices == port] = projected[:, 0, :] + rng.normal(scale=0.5, size=(point_count, 2))
+
+    point_estimates = PointEstimates(
+        sync_indices=obj_indices,
+        camera_indices=camera_indices,
+        point_id=np.zeros_like(obj_indices),
+        img=img,
+        obj_indices=obj_indices,
+        obj=obj + rng.normal(scale=0.01, size=obj.shape),
+    )
+
+    # perturb all but the first camera
+    params = camera_array.get_extrinsic_params()
+    params[1:] += rng.normal(scale=0.01, size=params[1:].shape)
+    camera_array.update_extrinsic_params(params.ravel())
+
+    return CaptureVolume(camera_array, point_estimates)
+
+
+if __name__ == "__main__":
+    point_count = int(sys.argv[1]) if len(sys.argv) > 1 else POINT_COUNT
+    capture_volume = synthetic_capture_volume(point_count=point_count)
+    x0 = capture_volume.get_vectorized_params()
+    logger.info(f"{capture_volume.point_estimates.n_img_points} observations of {point_count} points")
+
+    def scipy_trf(**jacobian_option):
+        return least_squares(
+            xy_reprojection_error,
+            x0,
+            x_scale="jac",
+            loss="linear",
+            ftol=1e-8,
+            method="trf",
+            args=(capture_volume,),
+            **jacobian_option,
+        )
+
+    def schur():
+        return levenberg_marquardt(
+            xy_reprojection_error,
+            xy_reprojection_jacobian_blocks,
+            x0,
+            camera_indices=capture_volume.point_estimates.camera_param_indices,
+            point_indices=capture_volume.point_estimates.obj_indices,
+            n_cameras=capture_volume.point_estimates.n_cameras,
+            ftol=1e-8,
+            args=(capture_volume,),
+        )
+
+    solvers = {
+        "finite difference": lambda: scipy_trf(jac_sparsity=capture_volume.point_estimates.get_sparsity_pattern()),
+        "analytic": lambda: scipy_trf(jac=xy_reprojection_jacobian),
+        "schur": schur,
+    }
+    for name, solve in solvers.items():
+        start = perf_counter()
+        result = solve()
+        elapsed = perf_counter() - start
+        rmse = np.sqrt(np.mean(result.fun.reshape(-1, 2) ** 2) * 2)
+        logger.info(f"{name}: {elapsed:.2f} s | nfev {result.nfev} njev {result.njev} | final RMSE {rmse:.4f} px")
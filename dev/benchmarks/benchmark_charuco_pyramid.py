@@ -0,0 +1,97 @@
+"""
+Compare the full resolution charuco detection against the coarse-to-fine pyramid detection.
+
+Frames are read from the extrinsic calibration videos in tests/sessions. Because those videos are 720p,
+they can optionally be upscaled to approximate a 4K capture, which is where the pyramid is expected to pay off.
+Reports the mean time per frame and the agreement of the detected corners between the two methods.
+"""
+
+from pathlib import Path
+from time import perf_counter
+
+import cv2
+import numpy as np
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.configurator import Configurator
+from caliscope.trackers.charuco_tracker import CharucoTracker
+
+logger = caliscope.logger.get(__name__)
+
+SESSION = "post_monocal"
+MAX_FRAMES_PER_PORT = 100
+UPSCALE_TO_WIDTH = 3840  # set to None to benchmark at native resolution
+PYRAMID_LEVELS = [1, 2]
+
+
+def load_frames(session_path: Path) -> list:
+    frames = []
+    extrinsic_dir = Path(session_path, "calibration", "extrinsic")
+    for mp4 in sorted(extrinsic_dir.glob("port_*.mp4")):
+        port = int(mp4.stem.split("_")[1])
+        capture = cv2.VideoCapture(str(mp4))
+        for _ in range(MAX_FRAMES_PER_PORT):
+            success, frame = capture.read()
+            if not success:
+                break
+            frames.append((port, frame))
+        capture.release()
+    return frames
+
+
+def upscale(frame: np.ndarray) -> np.ndarray:
+    if UPSCALE_TO_WIDTH is None:
+        return frame
+    scale = UPSCALE_TO_WIDTH / frame.shape[1]
+    return cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+
+
+def run_tracker(tracker: CharucoTracker, frames: list) -> tuple[float, list]:
+    """frames are upscaled one at a time (outside of the timed block) to keep memory use modest"""
+    packets = []
+    elapsed = 0
+    for port, frame in frames:
+        frame = upscale(frame)
+        start = perf_counter()
+        packets.append(tracker.get_points(frame, port, 0))
+        elapsed += perf_counter() - start
+    return elapsed / len(frames), packets
+
+
+def compare(reference: list, candidate: list) -> tuple[int, int, float, float]:
+    """returns count of reference corners, count of shared corners, mean and max pixel difference"""
+    reference_count = 0
+    differences = []
+    for ref, cand in zip(reference, candidate):
+        reference_count += len(ref.point_id)
+        if len(ref.point_id) == 0 or len(cand.point_id) == 0:
+            continue
+        common_ids, ref_index, cand_index = np.intersect1d(ref.point_id, cand.point_id, return_indices=True)
+        delta = ref.img_loc[ref_index] - cand.img_loc[cand_index]
+        differences.extend(np.sqrt(np.sum(delta**2, axis=1)).tolist())
+
+    differences = np.array(differences)
+    return reference_count, len(differences), float(differences.mean()), float(differences.max())
+
+
+if __name__ == "__main__":
+    session_path = Path(__root__, "tests", "sessions", SESSION)
+    charuco = Configurator(session_path).get_charuco()
+
+    frames = load_frames(session_path)
+    width = upscale(frames[0][1]).shape[1]
+    logger.info(f"Loaded {len(frames)} frames; benchmarking at a frame width of {width}")
+
+    full_res_time, full_res_packets = run_tracker(CharucoTracker(charuco), frames)
+    logger.info(f"full resolution: {full_res_time*1000:.1f} ms per frame")
+
+    for levels in PYRAMID_LEVELS:
+        pyramid_time, pyramid_packets = run_tracker(CharucoTracker(charuco, pyramid_levels=levels), frames)
+        reference_count, shared_count, mean_diff, max_diff = compare(full_res_packets, pyramid_packets)
+        logger.info(
+            f"pyramid levels {levels}: {pyramid_time*1000:.1f} ms per frame "
+            f"({full_res_time/pyramid_time:.1f}x faster) | "
+            f"{shared_count}/{reference_count} corners recovered | "
+            f"corner difference mean {mean_diff:.4f} px, max {max_diff:.4f} px"
+        )
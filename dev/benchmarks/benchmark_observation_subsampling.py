@@ -0,0 +1,215 @@
+"""
+Compare bundle adjustment on all board observations with bundle adjustment on a subsample of them.
+
+A board of corners moves smoothly through a ring of cameras, so consecutive frames are nearly identical.
+The capture volume is optimized from perturbed starting estimates using every board view, using the views
+chosen by `subsample_point_estimates`, and using evenly spaced frames with the same observation budget.
+
+For each, the report lists the optimization time, the RMSE of the observations that were fit, the RMSE
+of all observations when they are triangulated with the optimized cameras, and the error of the optimized
+camera positions relative to the truth (after removing the unobservable similarity transform).
+
+Usage: python benchmark_observation_subsampling.py [frame count]
+"""
+
+import copy
+import sys
+from time import perf_counter
+
+import cv2
+import numpy as np
+import pandas as pd
+
+import caliscope.logger
+from caliscope.calibration.capture_volume.capture_volume import CaptureVolume
+from caliscope.calibration.capture_volume.helper_functions.subsample_point_estimates import (
+    subsample_point_estimates,
+)
+from caliscope.calibration.capture_volume.point_estimates import PointEstimates
+from caliscope.cameras.camera_array import CameraArray, CameraData
+from caliscope.triangulate.triangulation import triangulate_xy
+
+logger = caliscope.logger.get(__name__)
+
+CAMERA_COUNT = 4
+FRAME_COUNT = 3000
+BOARD_SHAPE = (7, 5)
+SQUARE_SIZE = 0.05
+BUDGET_FRACTIONS = [0.25, 0.1, 0.04]
+
+
+def synthetic_cameras() -> CameraArray:
+    matrix = np.array([[1000.0, 0, 640], [0, 1000.0, 360], [0, 0, 1]])
+    distortions = np.array([-0.1, 0.05, 0.001, -0.001, 0.0])
+
+    cameras = {}
+    for port in range(CAMERA_COUNT):
+        angle = 2 * np.pi * port / CAMERA_COUNT
+        camera_position = np.array([2.5 * np.cos(angle), 2.5 * np.sin(angle), 0.5])
+        z_axis = -camera_position / np.linalg.norm(camera_position)
+        x_axis = np.cross([0, 0, 1], z_axis)
+        x_axis /= np.linalg.norm(x_axis)
+        y_axis = np.cross(z_axis, x_axis)
+        rotation = np.vstack([x_axis, y_axis, z_axis])
+        cameras[port] = CameraData(
+            port=port,
+            size=(1280, 720),
+            matrix=matrix,
+            distortions=distortions,
+            rotation=rotation,
+            translation=-rotation @ camera_position,
+        )
+    return CameraArray(cameras)
+
+
+def smooth_walk(rng: np.random.Generator, frame_count: int, scale: np.ndarray) -> np.ndarray:
+    """a slowly varying path through [-scale, scale] built from a few random sinusoids per axis"""
+    t = np.linspace(0, 1, frame_count)[:, None]
+    frequencies = rng.uniform(0.5, 4, size=(3, len(scale)))
+    phases = rng.uniform(0, 2 * np.pi, size=(3, len(scale)))
+    path = sum(np.sin(2 * np.pi * frequencies[i] * t + phases[i]) for i in range(3)) / 3
+    return path * scale
+
+
+def synthetic_point_estimates(camera_array: CameraArray, seed: int, frame_count: int) -> PointEstimates:
+    """observations of a board moving through the capture volume, with 0.5 pixel noise"""
+    rng = np.random.default_rng(seed)
+    columns, rows = BOARD_SHAPE
+    corners = np.array([[c, r, 0] for r in range(rows) for c in range(columns)], dtype=float) * SQUARE_SIZE
+    corners -= corners.mean(axis=0)
+
+    positions = smooth_walk(rng, frame_count, np.array([0.7, 0.7, 0.4]))
+    rotation_vectors = smooth_walk(rng, frame_count, np.array([1.2, 1.2, np.pi]))
+
+    sync_indices, camera_indices, point_ids, img, obj_indices, obj = [], [], [], [], [], []
+    for sync_index in range(frame_count):
+        rotation = cv2.Rodrigues(rotation_vectors[sync_index])[0]
+        board_xyz = corners @ rotation.T + positions[sync_index]
+        normal = rotation[:, 2]
+
+        views = {}
+        for port, camera in camera_array.cameras.items():
+            camera_center = -camera.rotation.T @ camera.translation
+            to_camera = camera_center - positions[sync_index]
+            # the board is only detected when it faces the camera
+            if abs(normal @ to_camera) < 0.3 * np.linalg.norm(to_camera):
+                continue
+            rvec = cv2.Rodrigues(camera.rotation)[0]
+            projected, _ = cv2.projectPoints(board_xyz, rvec, camera.translation, camera.matrix, camera.distortions)
+            projected = projected[:, 0, :] + rng.normal(scale=0.5, size=(len(board_xyz), 2))
+            visible = (projected >= 0).all(axis=1) & (projected < camera.size).all(axis=1)
+            views[port] = (projected, visible)
+
+        seen_by = sum(visible.astype(int) for _, visible in views.values())
+        for corner in np.flatnonzero(seen_by >= 2):
+            obj_indices_start = len(obj)
+            obj.append(board_xyz[corner])
+            for port, (projected, visible) in views.items():
+                if visible[corner]:
+                    sync_indices.append(sync_index)
+                    camera_indices.append(port)
+                    point_ids.append(corner)
+                    img.append(projected[corner])
+                    obj_indices.append(obj_indices_start)
+
+    obj = np.array(obj)
+    return PointEstimates(
+        sync_indices=np.array(sync_indices),
+        camera_indices=np.array(camera_indices),
+        point_id=np.array(point_ids),
+        img=np.array(img),
+        obj_indices=np.array(obj_indices),
+        obj=obj + rng.normal(scale=0.01, size=obj.shape),
+    )
+
+
+def perturbed_cameras(camera_array: CameraArray, seed: int) -> CameraArray:
+    rng = np.random.default_rng(seed)
+    camera_array = copy.deepcopy(camera_array)
+    params = camera_array.get_extrinsic_params()
+    params[1:] += rng.normal(scale=0.01, size=params[1:].shape)
+    camera_array.update_extrinsic_params(params.ravel())
+    return camera_array
+
+
+def evenly_spaced_frames(point_estimates: PointEstimates, max_observations: int) -> PointEstimates:
+    point_estimates = copy.deepcopy(point_estimates)
+    sync_indices = np.unique(point_estimates.sync_indices)
+    stride = int(np.ceil(point_estimates.n_img_points / max_observations))
+    point_estimates.filter_observations(np.isin(point_estimates.sync_indices, sync_indices[::stride]))
+    return point_estimates
+
+
+def camera_position_error(camera_array: CameraArray, true_camera_array: CameraArray) -> float:
+    """mean distance (mm) between the camera centers after the best fitting similarity transform"""
+
+    def centers(camera_array):
+        return np.array([-cam.rotation.T @ cam.translation for cam in camera_array.cameras.values()])
+
+    estimated, truth = centers(camera_array), centers(true_camera_array)
+    estimated_centered, truth_centered = estimated - estimated.mean(axis=0), truth - truth.mean(axis=0)
+    u, s, vt = np.linalg.svd(truth_centered.T @ estimated_centered)
+    reflection = np.diag([1, 1, np.sign(np.linalg.det(u @ vt))])
+    rotation = u @ reflection @ vt
+    scale = np.trace(np.diag(s) @ reflection) / np.sum(estimated_centered**2)
+    aligned = scale * estimated_centered @ rotation.T + truth.mean(axis=0)
+    return 1000 * np.mean(np.linalg.norm(aligned - truth, axis=1))
+
+
+def triangulated_rmse(camera_array: CameraArray, point_estimates: PointEstimates) -> float:
+    """RMSE of all observations when each point is triangulated with the given cameras"""
+    xy = pd.DataFrame(
+        {
+            "sync_index": point_estimates.sync_indices,
+            "port": point_estimates.camera_indices,
+            "point_id": point_estimates.point_id,
+            "img_loc_x": point_estimates.img[:, 0],
+            "img_loc_y": point_estimates.img[:, 1],
+        }
+    )
+    xyz = triangulate_xy(xy, camera_array)
+    xy = xy.merge(xyz, on=["sync_index", "point_id"])
+
+    squared_errors = []
+    for port, cam in camera_array.cameras.items():
+        port_xy = xy[xy["port"] == port]
+        rvec = cv2.Rodrigues(cam.rotation)[0]
+        object_points = port_xy[["x_coord", "y_coord", "z_coord"]].to_numpy()
+        projected, _ = cv2.projectPoints(object_points, rvec, cam.translation, cam.matrix, cam.distortions)
+        error = projected[:, 0, :] - port_xy[["img_loc_x", "img_loc_y"]].to_numpy()
+        squared_errors.append(np.sum(error**2, axis=1))
+    return np.sqrt(np.mean(np.concatenate(squared_errors)))
+
+
+if __name__ == "__main__":
+    frame_count = int(sys.argv[1]) if len(sys.argv) > 1 else FRAME_COUNT
+    true_camera_array = synthetic_cameras()
+    all_point_estimates = synthetic_point_estimates(true_camera_array, seed=0, frame_count=frame_count)
+    initial_camera_array = perturbed_cameras(true_camera_array, seed=1)
+    n_observations = all_point_estimates.n_img_points
+
+    subsets = {"all observations": all_point_estimates}
+    for fraction in BUDGET_FRACTIONS:
+        max_observations = int(fraction * n_observations)
+        subsampled = copy.deepcopy(all_point_estimates)
+        subsample_point_estimates(subsampled, initial_camera_array, max_observations)
+        subsets[f"coverage subsample {fraction:.0%}"] = subsampled
+        subsets[f"evenly spaced frames {fraction:.0%}"] = evenly_spaced_frames(all_point_estimates, max_observations)
+
+    results = {}
+    for name, point_estimates in subsets.items():
+        capture_volume = CaptureVolume(copy.deepcopy(initial_camera_array), copy.deepcopy(point_estimates))
+        start = perf_counter()
+        capture_volume.optimize(solver="schur")
+        elapsed = perf_counter() - start
+
+        results[name] = (
+            f"{point_estimates.n_img_points:>7} observations, {elapsed:6.2f} s, "
+            f"fit RMSE {capture_volume.rmse['overall']:.4f}, "
+            f"all observations RMSE {triangulated_rmse(capture_volume.camera_array, all_point_estimates):.4f}, "
+            f"camera position error {camera_position_error(capture_volume.camera_array, true_camera_array):.3f} mm"
+        )
+
+    logger.info(f"{frame_count} frames of a {BOARD_SHAPE} board seen by {CAMERA_COUNT} cameras")
+    for name, result in results.items():
+        logger.info(f"{name:>28}: {result}")
@@ -0,0 +1,115 @@
+"""
+Time `triangulate_segments` at each number of numba threads.
+
+A synthetic ring of 8 cameras observes a cloud of points over 100k frames. Every point is seen by
+every camera, so each (sync_index, point_id) segment holds 8 observations. Each triangulation method
+is run once to compile and then timed at each thread count from 1 up to the number of threads numba
+has available. The robust (camera consensus) mode is timed alongside the plain methods.
+
+No scaling has been recorded with this script yet: it has only been run on a single core. Speedup
+relative to 1 thread is reported only for thread counts up to the number of available cores.
+NUMBA_NUM_THREADS can be set above that (e.g. NUMBA_NUM_THREADS=4 on a single core) to check that the
+parallel kernels agree with the 1 thread result, but those timings reflect oversubscription and say
+nothing about scaling.
+"""
+
+import os
+from functools import partial
+from time import perf_counter
+
+import numba
+import numpy as np
+
+import caliscope.logger
+from caliscope.triangulate.triangulation import (
+    TRIANGULATION_METHODS,
+    get_segment_bounds,
+    triangulate_segments,
+    triangulate_segments_robust,
+)
+
+logger = caliscope.logger.get(__name__)
+
+CAMERA_COUNT = 8
+FRAME_COUNT = 100_000
+POINTS_PER_FRAME = 5
+REPEATS = 3
+INLIER_THRESHOLD = 5.0  # pixels, for the robust mode
+
+
+def synthetic_projection_matrices() -> np.ndarray:
+    """cameras evenly spaced on a 3 meter ring, all looking at the origin"""
+    K = np.array([[1000.0, 0, 640], [0, 1000.0, 360], [0, 0, 1]])
+    projection_matrices = np.zeros((CAMERA_COUNT, 3, 4))
+    for port in range(CAMERA_COUNT):
+        angle = 2 * np.pi * port / CAMERA_COUNT
+        camera_position = np.array([3 * np.cos(angle), 3 * np.sin(angle), 0])
+        z_axis = -camera_position / np.linalg.norm(camera_position)
+        x_axis = np.cross([0, 0, 1], z_axis)
+        y_axis = np.cross(z_axis, x_axis)
+        rotation = np.vstack([x_axis, y_axis, z_axis])
+        translation = -rotation @ camera_position
+        projection_matrices[port] = K @ np.hstack([rotation, translation[:, None]])
+    return projection_matrices
+
+
+def synthetic_observations(projection_matrices: np.ndarray):
+    rng = np.random.default_rng(0)
+    segment_count = FRAME_COUNT * POINTS_PER_FRAME
+    obj_xyz = rng.uniform(-0.5, 0.5, size=(segment_count, 3))
+    obj_xyzw = np.hstack([obj_xyz, np.ones((segment_count, 1))])
+
+    # observations ordered by (sync_index, point_id, port)
+    sync_indices = np.repeat(np.arange(FRAME_COUNT), POINTS_PER_FRAME * CAMERA_COUNT)
+    point_ids = np.tile(np.repeat(np.arange(POINTS_PER_FRAME), CAMERA_COUNT), FRAME_COUNT)
+    camera_indices = np.tile(np.arange(CAMERA_COUNT), segment_count)
+
+    projected = np.einsum("cij,nj->nci", projection_matrices, obj_xyzw)  # (segment, camera, 3)
+    img_xy = (projected[:, :, :2] / projected[:, :, 2:]).reshape(-1, 2)
+    img_xy += rng.normal(scale=0.5, size=img_xy.shape)
+
+    return sync_indices, point_ids, camera_indices, img_xy, obj_xyz
+
+
+if __name__ == "__main__":
+    projection_matrices = synthetic_projection_matrices()
+    sync_indices, point_ids, camera_indices, img_xy, true_xyz = synthetic_observations(projection_matrices)
+    segment_starts, segment_stops = get_segment_bounds(sync_indices, point_ids)
+    logger.info(f"{len(camera_indices)} observations across {len(segment_starts)} segments")
+
+    max_threads = numba.config.NUMBA_NUM_THREADS
+    available_cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    logger.info(f"{available_cores} cores available to up to {max_threads} numba threads")
+    runners = {method: partial(triangulate_segments, method=method) for method in TRIANGULATION_METHODS}
+    runners["robust"] = partial(triangulate_segments_robust, inlier_threshold=INLIER_THRESHOLD)
+
+    for method, triangulate in runners.items():
+        # compile
+        triangulate(projection_matrices, camera_indices, img_xy, segment_starts[:10], segment_stops[:10])
+
+        baseline = None
+        baseline_xyz = None
+        for thread_count in range(1, max_threads + 1):
+            numba.set_num_threads(thread_count)
+            elapsed = []
+            for _ in range(REPEATS):
+                start = perf_counter()
+                obj_xyz = triangulate(projection_matrices, camera_indices, img_xy, segment_starts, segment_stops)[0]
+                elapsed.append(perf_counter() - start)
+
+            best = min(elapsed)
+            baseline = best if baseline is None else baseline
+            baseline_xyz = obj_xyz if baseline_xyz is None else baseline_xyz
+            # segments are independent, so the result must not depend on how they are split across threads
+            assert np.array_equal(obj_xyz, baseline_xyz, equal_nan=True)
+
+            error = np.sqrt(np.mean(np.sum((obj_xyz - true_xyz) ** 2, axis=1)))
+            if thread_count > available_cores:
+                speedup = "oversubscribed, no speedup measured"
+            else:
+                speedup = f"{baseline/best:.2f}x vs 1 thread"
+            logger.info(
+                f"{method} | threads {thread_count}: {best:.3f} s "
+                f"({len(segment_starts)/best/1e6:.2f}M points per second, {speedup}) | "
+                f"RMSE vs ground truth {error*1000:.3f} mm"
+            )
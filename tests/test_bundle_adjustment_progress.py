@@ -0,0 +1,91 @@
+from pathlib import Path
+
+import numpy as np
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.calibration.capture_volume.capture_volume import STOPPED_STATUS, CaptureVolume
+from caliscope.configurator import Configurator
+
+logger = caliscope.logger.get(__name__)
+
+
+def get_perturbed_capture_volume(seed: int = 1) -> CaptureVolume:
+    config = Configurator(Path(__root__, "tests", "sessions", "post_optimization"))
+    camera_array = config.get_camera_array()
+    point_estimates = config.get_point_estimates()
+
+    rng = np.random.default_rng(seed)
+    params = camera_array.get_extrinsic_params()
+    params += rng.normal(scale=0.02, size=params.shape)
+    camera_array.update_extrinsic_params(params.ravel())
+    point_estimates.obj = point_estimates.obj + rng.normal(scale=0.01, size=point_estimates.obj.shape)
+
+    return CaptureVolume(camera_array, point_estimates)
+
+
+def test_progress_callback():
+    for solver in ["scipy", "schur"]:
+        capture_volume = get_perturbed_capture_volume()
+        initial_rmse = capture_volume.rmse
+        history = []
+        capture_volume.optimize(solver=solver, callback=history.append)
+
+        logger.info(f"{solver}: {[round(progress.rmse['overall'], 4) for progress in history]}")
+        assert [progress.iteration for progress in history] == list(range(len(history)))
+        assert history[0].rmse == initial_rmse
+        assert history[-1].rmse["overall"] == capture_volume.rmse["overall"]
+        assert set(history[-1].rmse.keys()) == set(initial_rmse.keys())
+        assert all(later.cost < earlier.cost for earlier, later in zip(history, history[1:]))
+        assert all(later.elapsed >= earlier.elapsed for earlier, later in zip(history, history[1:]))
+        assert capture_volume.least_sq_result.status != STOPPED_STATUS
+
+
+def test_cancel_from_callback():
+    for solver in ["scipy", "schur"]:
+        capture_volume = get_perturbed_capture_volume()
+        history = []
+
+        def cancel_after_two(progress) -> bool:
+            history.append(progress)
+            return progress.iteration == 2
+
+        capture_volume.optimize(solver=solver, callback=cancel_after_two)
+
+        # the estimate of the last reported iteration is kept
+        assert history[-1].iteration == 2
+        assert capture_volume.least_sq_result.status == STOPPED_STATUS
+        assert capture_volume.stage == 1
+        np.testing.assert_allclose(capture_volume.rmse["overall"], history[-1].rmse["overall"])
+
+
+def test_budgets_and_early_stopping():
+    capture_volume = get_perturbed_capture_volume()
+    initial_params = capture_volume.get_vectorized_params()
+    capture_volume.optimize(solver="schur", max_time=0)
+    assert capture_volume.least_sq_result.status == STOPPED_STATUS
+    np.testing.assert_allclose(capture_volume.get_vectorized_params(), initial_params, rtol=0, atol=1e-12)
+
+    capture_volume = get_perturbed_capture_volume()
+    history = []
+    capture_volume.optimize(solver="scipy", callback=history.append, max_iterations=1)
+    assert [progress.iteration for progress in history] == [0, 1]
+
+    converged_volume = get_perturbed_capture_volume()
+    converged_volume.optimize(solver="schur")
+    early_volume = get_perturbed_capture_volume()
+    early_volume.optimize(solver="schur", rmse_tolerance=1e-2)
+
+    logger.info(
+        f"Stopped early after {early_volume.least_sq_result.njev} rather than "
+        f"{converged_volume.least_sq_result.njev} iterations"
+    )
+    assert early_volume.least_sq_result.status == STOPPED_STATUS
+    assert early_volume.least_sq_result.njev < converged_volume.least_sq_result.njev
+    np.testing.assert_allclose(early_volume.rmse["overall"], converged_volume.rmse["overall"], rtol=0.02)
+
+
+if __name__ == "__main__":
+    test_progress_callback()
+    test_cancel_from_callback()
+    test_budgets_and_early_stopping()
@@ -10,13 +10,14 @@ from caliscope.calibration.capture_volume.capture_volume import CaptureVolume
 from caliscope.calibration.capture_volume.helper_functions.get_point_estimates import (
     get_point_estimates,
 )
+from caliscope.calibration.capture_volume.initial_calibration import calibrate_capture_volume
 from caliscope.calibration.capture_volume.point_estimates import PointEstimates
 from caliscope.calibration.capture_volume.quality_controller import QualityController
 from caliscope.calibration.stereocalibrator import StereoCalibrator
 from caliscope.cameras.camera_array import CameraArray
 from caliscope.cameras.camera_array_initializer import CameraArrayInitializer
 from caliscope.configurator import Configurator
-from caliscope.controller import FILTERED_FRACTION
+from caliscope.controller import FILTERED_FRACTION, ROBUST_LOSS
 from caliscope.helper import copy_contents
 from caliscope.synchronized_stream_manager import SynchronizedStreamManager
 from caliscope.trackers.charuco_tracker import CharucoTracker
@@ -122,6 +123,40 @@ def test_post_monocalibration(session_path):
         assert initial_rmse[key] > optimized_rmse
 
 
+def test_robust_calibration(session_path):
+    # the calibration performed by the Controller: one robust bundle adjustment, then filtering of the outliers
+    config = Configurator(session_path)
+    charuco_tracker = CharucoTracker(config.get_charuco())
+
+    recording_path = Path(session_path, "calibration", "extrinsic")
+    point_data_path = Path(recording_path, "CHARUCO", "xy_CHARUCO.csv")
+
+    camera_array = config.get_camera_array()
+    sync_stream_manager = SynchronizedStreamManager(
+        recording_dir=recording_path, all_camera_data=camera_array.cameras, tracker=charuco_tracker
+    )
+    sync_stream_manager.process_streams(fps_target=100)
+
+    while not point_data_path.exists():
+        logger.info("Waiting for point_data.csv to populate...")
+        sleep(1)
+
+    stereocalibrator = StereoCalibrator(config.config_toml_path, point_data_path)
+    stereocalibrator.stereo_calibrate_all(boards_sampled=10)
+
+    camera_array: CameraArray = CameraArrayInitializer(config.config_toml_path).get_best_camera_array()
+    initial_rmse = CaptureVolume(camera_array, get_point_estimates(camera_array, point_data_path)).rmse
+
+    capture_volume = calibrate_capture_volume(camera_array, point_data_path, FILTERED_FRACTION, loss=ROBUST_LOSS)
+    logger.info(f"RMSE reduced from {initial_rmse['overall']} to {capture_volume.rmse['overall']}")
+
+    # a single bundle adjustment was needed
+    assert capture_volume.stage == 1
+    for key, optimized_rmse in capture_volume.rmse.items():
+        logger.info(f"Asserting that RMSE decreased with optimization at {key}...")
+        assert initial_rmse[key] > optimized_rmse
+
+
 if __name__ == "__main__":
     original_session_path = Path(__root__, "tests", "sessions", "mediapipe_calibration")
     session_path = Path(
@@ -137,3 +172,7 @@ if __name__ == "__main__":
     copy_contents(original_session_path, session_path)
 
     test_post_monocalibration(session_path)
+
+    shutil.rmtree(session_path)
+    copy_contents(original_session_path, session_path)
+    test_robust_calibration(session_path)
@@ -0,0 +1,138 @@
+import pickle
+from pathlib import Path
+
+import numpy as np
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.calibration.capture_volume.capture_volume import CaptureVolume
+from caliscope.cameras.camera_array import CameraArray, CameraData
+from caliscope.configurator import Configurator
+from caliscope.triangulate.triangulation import get_dense_projection_matrices, get_undistortion_map
+
+logger = caliscope.logger.get(__name__)
+
+
+def get_camera_array():
+    session_path = Path(__root__, "tests", "sessions", "4_cam_recording")
+    return Configurator(session_path).get_camera_array()
+
+
+def test_derived_quantities_are_cached():
+    camera_array = get_camera_array()
+
+    assert camera_array.projection_matrices is camera_array.projection_matrices
+    assert camera_array.fundamental_matrices is camera_array.fundamental_matrices
+    assert camera_array.port_index is camera_array.port_index
+    assert camera_array.index_port is camera_array.index_port
+    assert get_dense_projection_matrices(camera_array) is get_dense_projection_matrices(camera_array)
+
+
+def test_extrinsic_updates_invalidate_cache():
+    camera_array = get_camera_array()
+    projection_matrices = camera_array.projection_matrices
+    fundamental_matrices = camera_array.fundamental_matrices
+    dense_projection_matrices = get_dense_projection_matrices(camera_array)
+
+    # shift every camera slightly through the least squares update path
+    params = camera_array.get_extrinsic_params()
+    params[:, 3:] += 0.01
+    camera_array.update_extrinsic_params(params.ravel())
+
+    assert camera_array.projection_matrices is not projection_matrices
+    assert camera_array.fundamental_matrices is not fundamental_matrices
+    updated_dense = get_dense_projection_matrices(camera_array)
+    assert updated_dense is not dense_projection_matrices
+    for port, camera in camera_array.cameras.items():
+        np.testing.assert_allclose(updated_dense[port], camera.projection_matrix)
+
+    # the transformation setter is used when the origin is changed
+    dense_projection_matrices = updated_dense
+    camera = camera_array.cameras[0]
+    camera.transformation = camera.transformation @ np.diag([1.0, -1.0, -1.0, 1.0])
+    np.testing.assert_allclose(get_dense_projection_matrices(camera_array)[0], camera.projection_matrix)
+    assert get_dense_projection_matrices(camera_array) is not dense_projection_matrices
+
+
+def test_intrinsic_updates_invalidate_cache():
+    camera_array = get_camera_array()
+    camera = camera_array.cameras[0]
+    undistortion_map = get_undistortion_map(camera)
+    projection_matrices = camera_array.projection_matrices
+
+    camera.matrix = camera.matrix * 1.01
+
+    assert get_undistortion_map(camera) is not undistortion_map
+    assert camera_array.projection_matrices is not projection_matrices
+    # other cameras keep their tables
+    other_camera = camera_array.cameras[1]
+    assert get_undistortion_map(other_camera) is get_undistortion_map(other_camera)
+
+
+def test_ignoring_camera_updates_port_index():
+    camera_array = get_camera_array()
+    assert list(camera_array.port_index.keys()) == sorted(camera_array.cameras.keys())
+
+    camera_array.cameras[1].ignore = True
+    assert 1 not in camera_array.port_index
+    assert list(camera_array.index_port.keys()) == list(range(len(camera_array.cameras) - 1))
+
+
+def test_pickle_round_trip():
+    camera_array = get_camera_array()
+    projection_matrices = camera_array.projection_matrices
+    undistortion_map = get_undistortion_map(camera_array.cameras[0])
+
+    # cached values (a numba typed dict and a full frame lookup table here) are left out of the pickle
+    pickled = pickle.dumps(camera_array)
+    assert len(pickled) < undistortion_map.nbytes
+    loaded = pickle.loads(pickled)
+
+    for port, camera in loaded.cameras.items():
+        np.testing.assert_array_equal(loaded.projection_matrices[port], projection_matrices[port])
+    np.testing.assert_array_equal(get_undistortion_map(loaded.cameras[0]), undistortion_map)
+
+    # recalibrating a loaded camera still invalidates what was rebuilt from the cache
+    loaded_projection_matrices = loaded.projection_matrices
+    loaded.cameras[0].matrix = loaded.cameras[0].matrix * 1.01
+    assert loaded.projection_matrices is not loaded_projection_matrices
+
+
+def test_unpickle_from_before_caching():
+    # pickles made before derived quantities were cached hold no cache or calibration version
+    camera_array = get_camera_array()
+    legacy_cameras = {}
+    for port, camera in camera_array.cameras.items():
+        state = {key: value for key, value in camera.__dict__.items() if key not in ["_cache", "calibration_version"]}
+        legacy_camera = CameraData.__new__(CameraData)
+        legacy_camera.__setstate__(state)
+        legacy_cameras[port] = legacy_camera
+
+    legacy_array = CameraArray.__new__(CameraArray)
+    legacy_array.__setstate__({"cameras": legacy_cameras})
+
+    for port, camera in camera_array.cameras.items():
+        np.testing.assert_array_equal(legacy_array.projection_matrices[port], camera.projection_matrix)
+    np.testing.assert_array_equal(
+        get_undistortion_map(legacy_array.cameras[0]), get_undistortion_map(camera_array.cameras[0])
+    )
+
+
+def test_pickle_capture_volume():
+    config = Configurator(Path(__root__, "tests", "sessions", "post_optimization"))
+    capture_volume = CaptureVolume(config.get_camera_array(), config.get_point_estimates())
+    rmse = capture_volume.rmse["overall"]
+    capture_volume.camera_array.projection_matrices
+
+    loaded = pickle.loads(pickle.dumps(capture_volume))
+    np.testing.assert_allclose(loaded.rmse["overall"], rmse)
+
+
+if __name__ == "__main__":
+    test_derived_quantities_are_cached()
+    test_extrinsic_updates_invalidate_cache()
+    test_intrinsic_updates_invalidate_cache()
+    test_ignoring_camera_updates_port_index()
+    test_pickle_round_trip()
+    test_unpickle_from_before_caching()
+    test_pickle_capture_volume()
@@ -0,0 +1,95 @@
+from pathlib import Path
+
+import numpy as np
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.calibration.capture_volume.capture_volume import (
+    CaptureVolume,
+    xy_reprojection_error,
+    xy_reprojection_jacobian,
+)
+from caliscope.calibration.capture_volume.point_estimates import CAMERA_PARAM_COUNT
+from caliscope.configurator import Configurator
+
+logger = caliscope.logger.get(__name__)
+
+
+def test_analytic_jacobian_matches_finite_differences():
+    config = Configurator(Path(__root__, "tests", "sessions", "post_optimization"))
+    capture_volume = CaptureVolume(config.get_camera_array(), config.get_point_estimates())
+    params = capture_volume.get_vectorized_params()
+
+    jacobian = xy_reprojection_jacobian(params, capture_volume)
+    assert jacobian.shape == (capture_volume.point_estimates.n_img_points * 2, len(params))
+    # every residual depends on exactly 6 camera parameters and 3 point coordinates
+    assert jacobian.nnz == jacobian.shape[0] * 9
+
+    # central differences on all camera parameters and a sample of point coordinates
+    n_camera_params = capture_volume.point_estimates.n_cameras * 6
+    rng = np.random.default_rng(0)
+    columns = np.concatenate([np.arange(n_camera_params), rng.choice(np.arange(n_camera_params, len(params)), 30)])
+
+    step = 1e-6
+    for column in columns:
+        shift = np.zeros_like(params)
+        shift[column] = step
+        finite_difference = (
+            xy_reprojection_error(params + shift, capture_volume)
+            - xy_reprojection_error(params - shift, capture_volume)
+        ) / (2 * step)
+        analytic = jacobian[:, column].toarray().ravel()
+        np.testing.assert_allclose(analytic, finite_difference, rtol=1e-4, atol=1e-3)
+
+
+def test_optimize_with_analytic_jacobian():
+    config = Configurator(Path(__root__, "tests", "sessions", "post_optimization"))
+    camera_array = config.get_camera_array()
+    point_estimates = config.get_point_estimates()
+
+    rng = np.random.default_rng(1)
+    params = camera_array.get_extrinsic_params()
+    params += rng.normal(scale=0.02, size=params.shape)
+    camera_array.update_extrinsic_params(params.ravel())
+    point_estimates.obj = point_estimates.obj + rng.normal(scale=0.01, size=point_estimates.obj.shape)
+
+    capture_volume = CaptureVolume(camera_array, point_estimates)
+    initial_rmse = capture_volume.rmse["overall"]
+    capture_volume.optimize()
+    optimized_rmse = capture_volume.rmse["overall"]
+
+    logger.info(f"RMSE from {initial_rmse:.3f} to {optimized_rmse:.3f}")
+    assert optimized_rmse < 2.0 < initial_rmse
+
+
+def test_jacobian_structure_is_cached():
+    config = Configurator(Path(__root__, "tests", "sessions", "post_optimization"))
+    point_estimates = config.get_point_estimates()
+
+    # dense reference built element by element
+    n_observations = point_estimates.n_img_points
+    expected = np.zeros(
+        (n_observations * 2, point_estimates.n_cameras * CAMERA_PARAM_COUNT + point_estimates.n_obj_points * 3)
+    )
+    for observation, (camera, obj) in enumerate(zip(point_estimates.camera_indices, point_estimates.obj_indices)):
+        camera_block = slice(camera * CAMERA_PARAM_COUNT, (camera + 1) * CAMERA_PARAM_COUNT)
+        point_start = point_estimates.n_cameras * CAMERA_PARAM_COUNT + obj * 3
+        expected[2 * observation : 2 * observation + 2, camera_block] = 1
+        expected[2 * observation : 2 * observation + 2, point_start : point_start + 3] = 1
+
+    np.testing.assert_array_equal(point_estimates.get_sparsity_pattern().toarray(), expected)
+
+    indices, indptr = point_estimates.get_jacobian_structure()
+    assert point_estimates.get_jacobian_structure()[0] is indices
+
+    # updating object point positions keeps the structure, new observations rebuild it
+    point_estimates.obj = point_estimates.obj + 0.01
+    assert point_estimates.get_jacobian_structure()[0] is indices
+    point_estimates.obj_indices = point_estimates.obj_indices[::-1].copy()
+    assert point_estimates.get_jacobian_structure()[0] is not indices
+
+
+if __name__ == "__main__":
+    test_analytic_jacobian_matches_finite_differences()
+    test_jacobian_structure_is_cached()
+    test_optimize_with_analytic_jacobian()
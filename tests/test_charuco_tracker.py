@@ -0,0 +1,120 @@
+import threading
+from pathlib import Path
+from queue import Queue
+
+import cv2
+import numpy as np
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.calibration.charuco import Charuco
+from caliscope.recording.recorded_stream import RecordedStream
+from caliscope.trackers.charuco_tracker import CharucoTracker
+
+logger = caliscope.logger.get(__name__)
+
+
+def test_pyramid_detection_matches_full_resolution():
+    """
+    Markers found on a downsampled level of the image pyramid should lead to the same
+    subpixel corner locations as the standard full resolution detection
+    """
+    recording_directory = Path(__root__, "tests", "sessions", "post_monocal", "calibration", "extrinsic")
+    charuco = Charuco(4, 5, 11, 8.5, aruco_scale=0.75, square_size_overide_cm=5.25, inverted=True)
+
+    capture = cv2.VideoCapture(str(Path(recording_directory, "port_1.mp4")))
+    full_res_tracker = CharucoTracker(charuco)
+    pyramid_tracker = CharucoTracker(charuco, pyramid_levels=1)
+
+    frames_compared = 0
+    for _ in range(20):
+        success, frame = capture.read()
+        if not success:
+            break
+        # emulate a higher resolution capture where the coarse search pays off
+        frame = cv2.resize(frame, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
+
+        full_res_points = full_res_tracker.get_points(frame, 1, 0)
+        pyramid_points = pyramid_tracker.get_points(frame, 1, 0)
+
+        if len(full_res_points.point_id) == 0 or len(pyramid_points.point_id) == 0:
+            continue
+
+        common_ids, full_index, pyramid_index = np.intersect1d(
+            full_res_points.point_id, pyramid_points.point_id, return_indices=True
+        )
+        delta = full_res_points.img_loc[full_index] - pyramid_points.img_loc[pyramid_index]
+        distance = np.sqrt(np.sum(delta**2, axis=1))
+
+        logger.info(f"Median corner difference of {np.median(distance)} pixels across {len(common_ids)} corners")
+        assert len(common_ids) >= 0.9 * len(full_res_points.point_id)
+        assert np.median(distance) < 0.1
+        frames_compared += 1
+
+    capture.release()
+    assert frames_compared > 0
+
+
+def get_stream_points(recording_directory: Path, tracker: CharucoTracker) -> dict:
+    stream = RecordedStream(recording_directory, port=1, rotation_count=0, fps_target=500, tracker=tracker)
+    frame_q = Queue()
+    stream.subscribe(frame_q)
+    stream.play_video()
+
+    point_packets = {}
+    while True:
+        frame_packet = frame_q.get()
+        if frame_packet.frame is None:
+            break
+        point_packets[frame_packet.frame_index] = frame_packet.points
+
+    stream.thread.join()
+    return point_packets
+
+
+def test_batched_tracking_matches_sequential():
+    """
+    A tracker with a worker pool is fed batches of frames read ahead by the RecordedStream.
+    Output should be identical and in the same order as one-frame-at-a-time tracking
+    """
+    recording_directory = Path(__root__, "tests", "sessions", "post_monocal", "calibration", "extrinsic")
+    charuco = Charuco(4, 5, 11, 8.5, aruco_scale=0.75, square_size_overide_cm=5.25, inverted=True)
+
+    sequential_points = get_stream_points(recording_directory, CharucoTracker(charuco))
+    batched_tracker = CharucoTracker(charuco, workers=4)
+    assert batched_tracker.batch_size == 4
+    batched_points = get_stream_points(recording_directory, batched_tracker)
+
+    assert list(sequential_points.keys()) == list(batched_points.keys())
+    for frame_index, sequential in sequential_points.items():
+        batched = batched_points[frame_index]
+        np.testing.assert_array_equal(sequential.point_id, batched.point_id)
+        np.testing.assert_array_equal(sequential.img_loc, batched.img_loc)
+
+
+def test_close_shuts_down_worker_pool():
+    recording_directory = Path(__root__, "tests", "sessions", "post_monocal", "calibration", "extrinsic")
+    charuco = Charuco(4, 5, 11, 8.5, aruco_scale=0.75, square_size_overide_cm=5.25, inverted=True)
+    tracker = CharucoTracker(charuco, workers=2)
+
+    def pool_threads() -> list:
+        return [thread for thread in threading.enumerate() if thread.name.startswith("charuco_tracker")]
+
+    first_pass = get_stream_points(recording_directory, tracker)
+    assert len(pool_threads()) > 0
+    tracker.close()
+    assert tracker.executor is None
+    assert len(pool_threads()) == 0
+
+    # the pool is started again if the tracker is reused
+    second_pass = get_stream_points(recording_directory, tracker)
+    tracker.close()
+    assert len(pool_threads()) == 0
+    for frame_index, points in first_pass.items():
+        np.testing.assert_array_equal(points.img_loc, second_pass[frame_index].img_loc)
+
+
+if __name__ == "__main__":
+    test_pyramid_detection_matches_full_resolution()
+    test_batched_tracking_matches_sequential()
+    test_close_shuts_down_worker_pool()
@@ -11,6 +11,7 @@ from caliscope.calibration.capture_volume.point_estimates import PointEstimates
 from caliscope.calibration.charuco import Charuco
 from caliscope.cameras.camera_array import CameraArray, CameraData
 from caliscope.configurator import Configurator
+from caliscope.controller import Controller
 from caliscope.helper import copy_contents
 
 logger = caliscope.logger.get(__name__)
@@ -69,13 +70,15 @@ def test_configurator():
     # delete point estimates data
     config.point_estimates_toml_path.unlink()
     assert not config.point_estimates_toml_path.exists()
+    assert not config.point_estimates_saved()
 
     # save point estimates stored in memory
     config.save_point_estimates(point_estimates)
 
     # confirm it exists
-    assert config.point_estimates_toml_path.exists()
-    config.refresh_point_estimates_from_toml()
+    assert config.point_estimates_npz_path.exists()
+    assert config.point_estimates_saved()
+    config.refresh_point_estimates_from_npz()
 
     # create new point estimates with newly saved data
     point_estimates_reloaded = config.get_point_estimates()
@@ -84,6 +87,29 @@ def test_configurator():
     assert point_estimates_are_equal(point_estimates, point_estimates_reloaded)
 
 
+def test_point_estimates_migrate_from_toml():
+    original_session = Path(__root__, "tests", "sessions", "post_optimization")
+    test_session = Path(__root__, "tests", "sessions_copy_delete", "post_optimization")
+    copy_contents(original_session, test_session)
+
+    # older workspaces only hold point_estimates.toml
+    config = Configurator(test_session)
+    assert not config.point_estimates_npz_path.exists()
+    point_estimates = config.get_point_estimates()
+
+    config.save_point_estimates(point_estimates)
+    assert config.point_estimates_npz_path.exists()
+
+    # once saved, a fresh configurator reads the binary file
+    config = Configurator(test_session)
+    config.point_estimates_toml_path.unlink()
+    point_estimates_reloaded = config.get_point_estimates()
+
+    assert point_estimates_are_equal(point_estimates, point_estimates_reloaded)
+    for field in ["sync_indices", "camera_indices", "point_id", "img", "obj_indices", "obj"]:
+        assert getattr(point_estimates, field).dtype == getattr(point_estimates_reloaded, field).dtype
+
+
 def remove_all_files_and_folders(directory_path):
     for item in directory_path.iterdir():
         if item.is_dir():
@@ -129,6 +155,26 @@ def test_new_cameras():
     assert camera_array.cameras[2] == camera_array_copy.cameras[2]
 
 
+def test_charuco_pyramid_levels(tmp_path):
+    session_path = Path(tmp_path, "post_optimization")
+    copy_contents(Path(__root__, "tests", "sessions", "post_optimization"), session_path)
+
+    config = Configurator(session_path)
+    assert config.get_charuco_pyramid_levels() == 0
+
+    config.dict["charuco"]["pyramid_levels"] = 1
+    config.update_config_toml()
+
+    # the setting is read back from config.toml and is not lost when the board itself is saved
+    config = Configurator(session_path)
+    assert config.get_charuco_pyramid_levels() == 1
+    config.save_charuco(config.get_charuco())
+    assert Configurator(session_path).get_charuco_pyramid_levels() == 1
+
+    controller = Controller(session_path)
+    assert controller.charuco_tracker.pyramid_levels == 1
+
+
 if __name__ == "__main__":
     # test_configurator()
     test_new_cameras()
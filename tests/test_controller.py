@@ -4,6 +4,7 @@ from time import sleep
 
 import caliscope.logger
 from caliscope import __root__
+from caliscope.configurator import Configurator
 from caliscope.controller import Controller, read_video_properties
 from caliscope.helper import copy_contents
 
@@ -40,6 +41,28 @@ def test_extrinsic_calibration():
     assert controller.camera_array.all_extrinsics_calibrated()
 
 
+def test_extend_capture_volume(tmp_path):
+    workspace = Path(tmp_path, "post_optimization")
+    copy_contents(Path(__root__, "tests", "sessions", "post_optimization"), workspace)
+    controller = Controller(workspace_dir=workspace)
+    controller.load_camera_array()
+    saved_point_count = controller.config.get_point_estimates().n_img_points
+
+    # camera 3 is new to the rig, and a second recording of the board is added alongside it
+    controller.camera_array.cameras[3].rotation = None
+    controller.camera_array.cameras[3].translation = None
+    controller.extend_capture_volume(Path(workspace, "calibration", "extrinsic", "xy.csv"))
+    while not controller.calibrate_capture_volume_thread.isFinished():
+        sleep(0.5)
+
+    assert controller.camera_array.all_extrinsics_calibrated()
+    assert controller.point_estimates.n_img_points > saved_point_count
+
+    # the extended calibration is what gets loaded with the workspace
+    saved_point_estimates = Configurator(workspace).get_point_estimates()
+    assert saved_point_estimates.n_img_points == controller.point_estimates.n_img_points
+
+
 def test_video_property_reader():
     test_source = Path(
         __root__, "tests", "sessions", "prerecorded_calibration", "calibration", "intrinsic", "port_1.mp4"
@@ -53,5 +76,9 @@ def test_video_property_reader():
 
 
 if __name__ == "__main__":
+    import tempfile
+
     test_extrinsic_calibration()
+    with tempfile.TemporaryDirectory() as tmp_path:
+        test_extend_capture_volume(Path(tmp_path))
     test_video_property_reader()
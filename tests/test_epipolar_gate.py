@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import numpy as np
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.configurator import Configurator
+from caliscope.triangulate.triangulation import epipolar_gate, triangulate_sync_index
+
+logger = caliscope.logger.get(__name__)
+
+
+def project(point_xyz: np.ndarray, projection_matrix: np.ndarray) -> np.ndarray:
+    point_xyzw = np.append(point_xyz, 1)
+    x, y, w = projection_matrix @ point_xyzw
+    return np.array([x / w, y / w])
+
+
+def test_epipolar_gate_drops_swapped_observation():
+    session_path = Path(__root__, "tests", "sessions", "post_optimization")
+    camera_array = Configurator(session_path).get_camera_array()
+    fundamental_matrices = camera_array.fundamental_matrices
+    projection_matrices = camera_array.projection_matrices
+
+    # two points in front of the cameras, observed by all of them (already undistorted)
+    point_0 = np.array([0.0, 0.0, 0.5])
+    point_1 = np.array([0.2, 0.1, 0.6])
+
+    ports = []
+    point_ids = []
+    img_xy = []
+    for port, camera in camera_array.cameras.items():
+        for point_id, point in enumerate([point_0, point_1]):
+            ports.append(port)
+            point_ids.append(point_id)
+            img_xy.append(project(point, camera.projection_matrix))
+
+    ports = np.array(ports, dtype=np.int64)
+    point_ids = np.array(point_ids, dtype=np.int64)
+    img_xy = np.array(img_xy)
+
+    # consistent observations all pass
+    keep = epipolar_gate(fundamental_matrices, ports, point_ids, img_xy, 2.0)
+    assert keep.all()
+
+    # swap the two points in a single view, as a mislabeled left/right hand would
+    swapped_port = ports[0]
+    swapped = ports == swapped_port
+    swapped_xy = img_xy.copy()
+    swapped_xy[swapped] = img_xy[swapped][::-1]
+
+    keep = epipolar_gate(fundamental_matrices, ports, point_ids, swapped_xy, 2.0)
+    assert not keep[swapped].any()
+    assert keep[~swapped].all()
+
+    # with the bad view removed, triangulation recovers the true point
+    point_id_xyz, points_xyz = triangulate_sync_index(
+        projection_matrices, ports[keep], point_ids[keep], swapped_xy[keep]
+    )
+    points_xyz = np.array(points_xyz)
+    assert np.allclose(points_xyz[list(point_id_xyz).index(0)], point_0, atol=1e-6)
+    assert np.allclose(points_xyz[list(point_id_xyz).index(1)], point_1, atol=1e-6)
+
+
+if __name__ == "__main__":
+    test_epipolar_gate_drops_swapped_observation()
@@ -0,0 +1,137 @@
+from pathlib import Path
+
+import numpy as np
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.calibration.capture_volume.capture_volume import CaptureVolume
+from caliscope.calibration.capture_volume.incremental_calibration import (
+    calibrate_incrementally,
+    get_uncalibrated_ports,
+    merge_point_estimates,
+)
+from caliscope.configurator import Configurator
+from caliscope.helper import copy_contents
+
+logger = caliscope.logger.get(__name__)
+
+
+def get_session(tmp_path: Path) -> Path:
+    session_path = Path(tmp_path, "post_optimization")
+    copy_contents(Path(__root__, "tests", "sessions", "post_optimization"), session_path)
+    return session_path
+
+
+def camera_position(camera) -> np.ndarray:
+    return -camera.rotation.T @ camera.translation
+
+
+def test_fixed_ports_are_not_adjusted():
+    config = Configurator(Path(__root__, "tests", "sessions", "post_optimization"))
+
+    for solver in ["scipy", "schur"]:
+        camera_array = config.get_camera_array()
+        point_estimates = config.get_point_estimates()
+        rng = np.random.default_rng(0)
+        params = camera_array.get_extrinsic_params()
+        params += rng.normal(scale=0.02, size=params.shape)
+        camera_array.update_extrinsic_params(params.ravel())
+
+        capture_volume = CaptureVolume(camera_array, point_estimates)
+        initial_rmse = capture_volume.rmse["overall"]
+        capture_volume.optimize(solver=solver, fixed_ports=[0, 1])
+
+        optimized_params = camera_array.get_extrinsic_params()
+        np.testing.assert_allclose(optimized_params[:2], params[:2], rtol=0, atol=1e-12)
+        assert not np.allclose(optimized_params[2:], params[2:])
+        assert capture_volume.rmse["overall"] < initial_rmse
+
+
+def test_add_camera(tmp_path):
+    session_path = get_session(tmp_path)
+    config = Configurator(session_path)
+    camera_array = config.get_camera_array()
+    calibrated_position = camera_position(camera_array.cameras[3])
+    calibrated_rmse = CaptureVolume(config.get_camera_array(), config.get_point_estimates()).rmse["overall"]
+
+    # camera 3 is new to the rig
+    camera_array.cameras[3].rotation = None
+    camera_array.cameras[3].translation = None
+    assert get_uncalibrated_ports(camera_array) == [3]
+
+    xy_path = Path(session_path, "calibration", "extrinsic", "xy.csv")
+    capture_volume = calibrate_incrementally(camera_array, xy_path)
+
+    position_error = np.linalg.norm(camera_position(camera_array.cameras[3]) - calibrated_position)
+    rmse = capture_volume.rmse["overall"]
+    logger.info(
+        f"Camera 3 placed within {position_error*1000:.1f} mm; RMSE {rmse:.3f} (calibrated {calibrated_rmse:.3f})"
+    )
+
+    assert get_uncalibrated_ports(camera_array) == []
+    assert capture_volume.stage == 2
+    assert position_error < 0.02
+    assert rmse < 1.5 * calibrated_rmse
+
+
+def test_add_recording(tmp_path):
+    session_path = get_session(tmp_path)
+    config = Configurator(session_path)
+    camera_array = config.get_camera_array()
+    point_estimates = config.get_point_estimates()
+    calibrated_rmse = CaptureVolume(config.get_camera_array(), config.get_point_estimates()).rmse["overall"]
+
+    xy_path = Path(session_path, "calibration", "extrinsic", "xy.csv")
+    capture_volume = calibrate_incrementally(camera_array, xy_path, point_estimates=point_estimates)
+    merged = capture_volume.point_estimates
+
+    # both recordings are kept and their board views remain distinct
+    assert merged.n_img_points > point_estimates.n_img_points
+    old = merged.sync_indices[: point_estimates.n_img_points]
+    new = merged.sync_indices[point_estimates.n_img_points :]
+    assert old.max() < new.min()
+    np.testing.assert_array_equal(merged.img[: point_estimates.n_img_points], point_estimates.img)
+    assert capture_volume.rmse["overall"] < 1.5 * calibrated_rmse
+
+
+def test_merge_same_recording():
+    config = Configurator(Path(__root__, "tests", "sessions", "post_optimization"))
+    point_estimates = config.get_point_estimates()
+
+    # the recording before camera 3 was added to the calibration
+    without_camera = config.get_point_estimates()
+    without_camera.filter_observations(without_camera.camera_indices != 3)
+
+    merged = merge_point_estimates(without_camera, point_estimates, sync_offset=0)
+
+    # only the observations of the added camera are new, and they are attached to the existing object points
+    assert merged.n_img_points == point_estimates.n_img_points
+    observations = set(zip(merged.sync_indices, merged.camera_indices, merged.point_id))
+    assert len(observations) == merged.n_img_points
+    assert observations == set(
+        zip(point_estimates.sync_indices, point_estimates.camera_indices, point_estimates.point_id)
+    )
+    added_objects = merged.n_obj_points - without_camera.n_obj_points
+    logger.info(f"{added_objects} object points are observed only with camera 3")
+    assert merged.n_obj_points == point_estimates.n_obj_points
+
+    # each observation refers to the object point of its own sync index and point id
+    obj_key = {}
+    for sync_index, point_id, obj_index in zip(merged.sync_indices, merged.point_id, merged.obj_indices):
+        assert obj_key.setdefault(obj_index, (sync_index, point_id)) == (sync_index, point_id)
+
+    # merging a recording with itself adds nothing
+    repeated = merge_point_estimates(point_estimates, point_estimates, sync_offset=0)
+    assert repeated.n_img_points == point_estimates.n_img_points
+    assert repeated.n_obj_points == point_estimates.n_obj_points
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    test_fixed_ports_are_not_adjusted()
+    test_merge_same_recording()
+    with tempfile.TemporaryDirectory() as tmp_path:
+        test_add_camera(Path(tmp_path))
+    with tempfile.TemporaryDirectory() as tmp_path:
+        test_add_recording(Path(tmp_path))
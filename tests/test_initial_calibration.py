@@ -0,0 +1,69 @@
+from copy import deepcopy
+from pathlib import Path
+
+import numpy as np
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.calibration.capture_volume.capture_volume import CaptureVolume
+from caliscope.calibration.capture_volume.helper_functions.get_point_estimates import get_point_estimates
+from caliscope.calibration.capture_volume.helper_functions.subsample_point_estimates import (
+    subsample_point_estimates,
+)
+from caliscope.calibration.capture_volume.initial_calibration import calibrate_capture_volume
+from caliscope.configurator import Configurator
+from caliscope.controller import FILTERED_FRACTION
+from caliscope.helper import copy_contents
+
+logger = caliscope.logger.get(__name__)
+
+
+def get_session(tmp_path: Path) -> Path:
+    session_path = Path(tmp_path, "post_optimization")
+    copy_contents(Path(__root__, "tests", "sessions", "post_optimization"), session_path)
+    return session_path
+
+
+def test_set_origin_after_subsampled_calibration(tmp_path):
+    session_path = get_session(tmp_path)
+    config = Configurator(session_path)
+    camera_array = config.get_camera_array()
+    calibrated_rmse = CaptureVolume(config.get_camera_array(), config.get_point_estimates()).rmse["overall"]
+    xy_path = Path(session_path, "calibration", "extrinsic", "xy.csv")
+
+    all_point_estimates = get_point_estimates(camera_array, xy_path)
+    max_observations = all_point_estimates.n_img_points // 4
+    subsampled = deepcopy(all_point_estimates)
+    subsample_point_estimates(subsampled, camera_array, max_observations)
+    left_out = np.setdiff1d(all_point_estimates.sync_indices, subsampled.sync_indices)
+    assert len(left_out) > 0
+
+    capture_volume = calibrate_capture_volume(
+        camera_array, xy_path, FILTERED_FRACTION, max_observations=max_observations
+    )
+
+    # every board view is kept for selection of the origin, not only those used in bundle adjustment
+    point_estimates = capture_volume.point_estimates
+    assert point_estimates.n_img_points > max_observations
+    np.testing.assert_array_equal(np.unique(point_estimates.sync_indices), np.unique(all_point_estimates.sync_indices))
+    assert capture_volume.rmse["overall"] < 1.5 * calibrated_rmse
+
+    origin_sync_index = int(left_out[len(left_out) // 2])
+    capture_volume.set_origin_to_board(origin_sync_index, config.get_charuco())
+
+    # the board now lies in the plane z = 0 with its first corner near the origin
+    board_obj = point_estimates.obj[
+        np.unique(point_estimates.obj_indices[point_estimates.sync_indices == origin_sync_index])
+    ]
+    logger.info(
+        f"Board corners at sync index {origin_sync_index} lie within {np.abs(board_obj[:, 2]).max():.4f} of z=0"
+    )
+    assert capture_volume.origin_sync_index == origin_sync_index
+    assert np.abs(board_obj[:, 2]).max() < 0.01
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp_path:
+        test_set_origin_after_subsampled_calibration(Path(tmp_path))
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pytest
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.configurator import Configurator
+from caliscope.helper import copy_contents
+from caliscope.trackers.face_tracker import FaceTracker
+from caliscope.trackers.hand_tracker import HandTracker
+from caliscope.trackers.holistic.holistic_tracker import FACE_OFFSET, LEFT_HAND_OFFSET, HolisticTracker
+from caliscope.trackers.pose_tracker import PoseTracker
+from caliscope.trackers.simple_holistic_tracker import SimpleHolisticTracker
+
+logger = caliscope.logger.get(__name__)
+
+
+def test_landmark_whitelist_in_config():
+    origin_data = Path(__root__, "tests", "sessions", "post_optimization")
+    working_data = Path(__root__, "tests", "sessions_copy_delete", "landmark_whitelist")
+    copy_contents(origin_data, working_data)
+
+    config = Configurator(working_data)
+    assert config.get_landmark_whitelist("HOLISTIC") is None
+
+    whitelist = ["left_wrist", "right_wrist", "nose", "face_1"]
+    config.save_landmark_whitelist("HOLISTIC", whitelist)
+
+    # persisted to the toml and only applied to the named tracker
+    reloaded_config = Configurator(working_data)
+    assert reloaded_config.get_landmark_whitelist("HOLISTIC") == whitelist
+    assert reloaded_config.get_landmark_whitelist("POSE") is None
+
+    reloaded_config.save_landmark_whitelist("HOLISTIC", None)
+    assert Configurator(working_data).get_landmark_whitelist("HOLISTIC") is None
+
+
+def test_tracker_whitelist_filtering():
+    unfiltered_tracker = HolisticTracker()
+    assert unfiltered_tracker.include_landmark(FACE_OFFSET + 10)
+    assert unfiltered_tracker.cache_parameters == {}
+
+    tracker = HolisticTracker(landmark_whitelist=["left_wrist", "nose", "face_1"])
+    assert tracker.include_landmark(LEFT_HAND_OFFSET)  # left_wrist
+    assert tracker.include_landmark(0)  # nose
+    assert tracker.include_landmark(FACE_OFFSET + 1)
+    assert not tracker.include_landmark(LEFT_HAND_OFFSET + 1)
+    assert not tracker.include_landmark(FACE_OFFSET + 10)
+
+    # cached points must not be reused once the whitelist changes
+    assert tracker.cache_parameters != unfiltered_tracker.cache_parameters
+    assert tracker.cache_parameters == HolisticTracker(["face_1", "nose", "left_wrist"]).cache_parameters
+
+
+def test_unknown_landmarks_are_rejected():
+    # a misspelled landmark would otherwise filter out every point
+    with pytest.raises(ValueError, match="left_wirst"):
+        HolisticTracker(landmark_whitelist=["left_wirst", "nose"])
+
+    # every name the tracker reports is accepted
+    for tracker_class in [HolisticTracker, SimpleHolisticTracker, PoseTracker, HandTracker, FaceTracker]:
+        landmark_names = tracker_class().landmark_names
+        tracker = tracker_class(landmark_whitelist=sorted(landmark_names))
+        assert tracker.landmark_whitelist == landmark_names
+        with pytest.raises(ValueError):
+            tracker_class(landmark_whitelist=["not_a_landmark"])
+
+
+if __name__ == "__main__":
+    test_landmark_whitelist_in_config()
+    test_tracker_whitelist_filtering()
+    test_unknown_landmarks_are_rejected()
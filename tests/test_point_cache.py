@@ -0,0 +1,116 @@
+import shutil
+from pathlib import Path
+from queue import Queue
+
+import numpy as np
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.calibration.charuco import Charuco
+from caliscope.recording.point_cache import CACHE_SUBFOLDER, PointCache
+from caliscope.recording.recorded_stream import RecordedStream
+from caliscope.trackers.charuco_tracker import CharucoTracker
+
+logger = caliscope.logger.get(__name__)
+
+
+class CountingCharucoTracker(CharucoTracker):
+    """tallies the frames that actually get run through charuco detection"""
+
+    def __init__(self, charuco):
+        super().__init__(charuco)
+        self.frames_tracked = 0
+
+    def get_points(self, frame, port, rotation_count):
+        self.frames_tracked += 1
+        return super().get_points(frame, port, rotation_count)
+
+
+def play_through(recording_directory: Path, tracker: CharucoTracker) -> dict:
+    stream = RecordedStream(
+        recording_directory, port=1, rotation_count=0, fps_target=500, tracker=tracker, cache_points=True
+    )
+    frame_q = Queue()
+    stream.subscribe(frame_q)
+    stream.play_video()
+
+    point_packets = {}
+    while True:
+        frame_packet = frame_q.get()
+        if frame_packet.frame is None:
+            break
+        point_packets[frame_packet.frame_index] = frame_packet.points
+
+    stream.thread.join()
+    return point_packets
+
+
+def test_point_cache(tmp_path):
+    original_directory = Path(__root__, "tests", "sessions", "post_monocal", "calibration", "extrinsic")
+    recording_directory = Path(tmp_path, "extrinsic")
+    recording_directory.mkdir()
+    shutil.copy2(Path(original_directory, "port_1.mp4"), Path(recording_directory, "port_1.mp4"))
+
+    charuco = Charuco(4, 5, 11, 8.5, aruco_scale=0.75, square_size_overide_cm=5.25, inverted=True)
+
+    first_tracker = CountingCharucoTracker(charuco)
+    first_pass = play_through(recording_directory, first_tracker)
+    assert first_tracker.frames_tracked == len(first_pass)
+    assert len(list(Path(recording_directory, CACHE_SUBFOLDER).glob("*.npz"))) == 1
+
+    # second pass through the same video should be served entirely from the cache
+    second_tracker = CountingCharucoTracker(charuco)
+    second_pass = play_through(recording_directory, second_tracker)
+    assert second_tracker.frames_tracked == 0
+
+    assert first_pass.keys() == second_pass.keys()
+    for frame_index, original in first_pass.items():
+        cached = second_pass[frame_index]
+        np.testing.assert_array_equal(original.point_id, cached.point_id)
+        np.testing.assert_array_equal(original.img_loc, cached.img_loc)
+        np.testing.assert_array_equal(original.obj_loc, cached.obj_loc)
+
+    # changing the board definition invalidates the cache
+    altered_charuco = Charuco(4, 5, 11, 8.5, aruco_scale=0.75, square_size_overide_cm=5.0, inverted=True)
+    third_tracker = CountingCharucoTracker(altered_charuco)
+    play_through(recording_directory, third_tracker)
+    assert third_tracker.frames_tracked == len(first_pass)
+
+
+def test_point_cache_saved_when_stopped(tmp_path):
+    original_directory = Path(__root__, "tests", "sessions", "post_monocal", "calibration", "extrinsic")
+    recording_directory = Path(tmp_path, "extrinsic")
+    recording_directory.mkdir()
+    shutil.copy2(Path(original_directory, "port_1.mp4"), Path(recording_directory, "port_1.mp4"))
+
+    charuco = Charuco(4, 5, 11, 8.5, aruco_scale=0.75, square_size_overide_cm=5.25, inverted=True)
+    tracker = CountingCharucoTracker(charuco)
+    stream = RecordedStream(
+        recording_directory, port=1, rotation_count=0, fps_target=10, tracker=tracker, cache_points=True
+    )
+    frame_q = Queue()
+    stream.subscribe(frame_q)
+    stream.play_video()
+
+    # stop partway through the video
+    for _ in range(5):
+        frame_q.get()
+    stream.stop_event.set()
+    stream.thread.join()
+    assert stream.frame_index <= stream.last_frame_index
+
+    cache = PointCache(recording_directory, 1, CountingCharucoTracker(charuco), 0)
+    logger.info(f"{len(cache.packets)} of {tracker.frames_tracked} tracked frames cached after stopping")
+    assert len(cache.packets) >= 5
+    assert len(cache.packets) == tracker.frames_tracked
+
+
+if __name__ == "__main__":
+    test_path = Path(__root__, "tests", "sessions_copy_delete", "point_cache")
+    shutil.rmtree(test_path, ignore_errors=True)
+    test_path.mkdir(parents=True)
+    test_point_cache(test_path)
+
+    shutil.rmtree(test_path)
+    test_path.mkdir(parents=True)
+    test_point_cache_saved_when_stopped(test_path)
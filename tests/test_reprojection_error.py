@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.calibration.capture_volume.capture_volume import (
+    CaptureVolume,
+    rms_reproj_error,
+    xy_reprojection_error,
+)
+from caliscope.configurator import Configurator
+
+logger = caliscope.logger.get(__name__)
+
+
+def opencv_xy_reprojection_error(capture_volume: CaptureVolume) -> np.ndarray:
+    """reference implementation projecting each camera's observations with cv2.projectPoints"""
+    point_estimates = capture_volume.point_estimates
+    projected = np.empty_like(point_estimates.img)
+    for port, cam in capture_volume.camera_array.cameras.items():
+        cam_points = point_estimates.camera_indices == port
+        object_points = point_estimates.obj[point_estimates.obj_indices[cam_points]]
+        rvec = cv2.Rodrigues(cam.rotation)[0]
+        cam_projected, _jac = cv2.projectPoints(object_points, rvec, cam.translation, cam.matrix, cam.distortions)
+        projected[cam_points] = cam_projected[:, 0, :]
+
+    return (projected - point_estimates.img).ravel()
+
+
+def test_reprojection_error_matches_opencv():
+    config = Configurator(Path(__root__, "tests", "sessions", "post_optimization"))
+    capture_volume = CaptureVolume(config.get_camera_array(), config.get_point_estimates())
+
+    # exaggerate the lens distortion so that every term of the model contributes
+    rng = np.random.default_rng(0)
+    for cam in capture_volume.camera_array.cameras.values():
+        cam.distortions = rng.normal(scale=[0.2, 0.1, 0.01, 0.01, 0.05])
+
+    xy_error = xy_reprojection_error(capture_volume.get_vectorized_params(), capture_volume)
+    expected = opencv_xy_reprojection_error(capture_volume)
+
+    assert xy_error.shape == expected.shape
+    np.testing.assert_allclose(xy_error, expected, rtol=1e-9, atol=1e-8)
+
+
+def test_rmse_by_camera():
+    config = Configurator(Path(__root__, "tests", "sessions", "post_optimization"))
+    capture_volume = CaptureVolume(config.get_camera_array(), config.get_point_estimates())
+    camera_indices = capture_volume.point_estimates.camera_indices
+
+    xy_error = capture_volume.get_xy_reprojection_error()
+    rmse = rms_reproj_error(xy_error, camera_indices)
+
+    distance = np.linalg.norm(xy_error.reshape(-1, 2), axis=1)
+    assert rmse["overall"] == np.sqrt(np.mean(distance**2))
+    for port in np.unique(camera_indices):
+        np.testing.assert_allclose(rmse[str(port)], np.sqrt(np.mean(distance[camera_indices == port] ** 2)))
+
+
+if __name__ == "__main__":
+    test_reprojection_error_matches_opencv()
+    test_rmse_by_camera()
@@ -0,0 +1,99 @@
+from pathlib import Path
+
+import numpy as np
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.calibration.capture_volume.capture_volume import CaptureVolume
+from caliscope.calibration.capture_volume.quality_controller import QualityController
+from caliscope.configurator import Configurator
+
+logger = caliscope.logger.get(__name__)
+
+OUTLIER_FRACTION = 0.03
+
+
+def get_capture_volume_with_outliers(seed: int = 0) -> tuple[CaptureVolume, np.ndarray]:
+    """
+    Returns an optimized capture volume in which a fraction of the image observations have been displaced
+    far from where they belong, along with a mask of the observations that were left alone.
+    """
+    config = Configurator(Path(__root__, "tests", "sessions", "post_optimization"))
+    point_estimates = config.get_point_estimates()
+
+    rng = np.random.default_rng(seed)
+    outliers = rng.random(point_estimates.n_img_points) < OUTLIER_FRACTION
+    displacement = rng.choice([-1, 1], size=(outliers.sum(), 2)) * rng.uniform(20, 60, size=(outliers.sum(), 2))
+    point_estimates.img[outliers] += displacement
+
+    return CaptureVolume(config.get_camera_array(), point_estimates), ~outliers
+
+
+def test_robust_loss_resists_outliers():
+    inlier_rmse = {}
+    for solver, loss in [("scipy", "linear"), ("schur", "linear"), ("schur", "huber"), ("schur", "cauchy")]:
+        capture_volume, inliers = get_capture_volume_with_outliers()
+        capture_volume.optimize(solver=solver, loss=loss)
+        xy_error = capture_volume.get_xy_reprojection_error().reshape(-1, 2)[inliers]
+        inlier_rmse[(solver, loss)] = np.sqrt(np.mean(np.sum(xy_error**2, axis=1)))
+
+    for key, rmse in inlier_rmse.items():
+        logger.info(f"{key}: RMSE of the undisturbed observations {rmse:.4f}")
+
+    # outliers drag the least squares solution away from the undisturbed observations
+    np.testing.assert_allclose(inlier_rmse[("schur", "linear")], inlier_rmse[("scipy", "linear")], rtol=1e-3)
+    for key in [("schur", "huber"), ("schur", "cauchy")]:
+        assert inlier_rmse[key] < inlier_rmse[("scipy", "linear")] / 2
+
+
+def test_robust_pass_isolates_outliers_for_filtering():
+    remaining_outliers = {}
+    for loss in ["linear", "cauchy"]:
+        capture_volume, inliers = get_capture_volume_with_outliers()
+        point_estimates = capture_volume.point_estimates
+        observations = list(zip(point_estimates.sync_indices, point_estimates.camera_indices, point_estimates.point_id))
+        outliers = {observation for observation, inlier in zip(observations, inliers) if not inlier}
+
+        capture_volume.optimize(solver="schur", loss=loss)
+        QualityController(capture_volume).filter_point_estimates(0.05)
+
+        observations = zip(point_estimates.sync_indices, point_estimates.camera_indices, point_estimates.point_id)
+        remaining_outliers[loss] = sum(observation in outliers for observation in observations)
+        logger.info(f"{loss}: {remaining_outliers[loss]} of {len(outliers)} outliers remain after filtering")
+
+    assert remaining_outliers["cauchy"] < remaining_outliers["linear"]
+    assert remaining_outliers["cauchy"] <= 2
+
+
+def test_filter_point_estimates_in_place():
+    capture_volume, _ = get_capture_volume_with_outliers()
+    point_estimates = capture_volume.point_estimates
+    capture_volume.optimize(solver="schur", loss="cauchy")
+
+    def observed_obj(point_estimates) -> dict:
+        keys = zip(point_estimates.sync_indices, point_estimates.camera_indices, point_estimates.point_id)
+        return {key: tuple(xyz) for key, xyz in zip(keys, point_estimates.obj[point_estimates.obj_indices])}
+
+    original_observed_obj = observed_obj(point_estimates)
+
+    QualityController(capture_volume).filter_point_estimates(0.05)
+
+    # the same object is updated and each remaining observation keeps its object point
+    assert capture_volume.point_estimates is point_estimates
+    filtered_observed_obj = observed_obj(point_estimates)
+    assert len(filtered_observed_obj) < len(original_observed_obj)
+    for key, xyz in filtered_observed_obj.items():
+        assert original_observed_obj[key] == xyz
+
+    obj_counts = np.bincount(point_estimates.obj_indices, minlength=point_estimates.n_obj_points)
+    assert (obj_counts > 1).all()
+
+    # the polish that follows only has to fit the remaining inliers
+    capture_volume.optimize()
+    assert capture_volume.rmse["overall"] < 1.5
+
+
+if __name__ == "__main__":
+    test_robust_loss_resists_outliers()
+    test_robust_pass_isolates_outliers_for_filtering()
+    test_filter_point_estimates_in_place()
@@ -0,0 +1,94 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.configurator import Configurator
+from caliscope.triangulate.triangulation import (
+    get_segment_bounds,
+    triangulate_segments,
+    triangulate_segments_robust,
+    triangulate_xy,
+)
+
+logger = caliscope.logger.get(__name__)
+
+
+def synthetic_projection_matrices(camera_count: int) -> np.ndarray:
+    """cameras evenly spaced on a 3 meter circle, all looking at the origin"""
+    intrinsics = np.array([[800.0, 0, 640], [0, 800, 360], [0, 0, 1]])
+    projection_matrices = np.empty((camera_count, 3, 4))
+    for port, angle in enumerate(np.linspace(0, 2 * np.pi, camera_count, endpoint=False)):
+        position = np.array([3 * np.cos(angle), 3 * np.sin(angle), 0.5])
+        forward = -position / np.linalg.norm(position)
+        right = np.cross(forward, [0, 0, 1])
+        right /= np.linalg.norm(right)
+        down = np.cross(forward, right)
+        rotation = np.vstack([right, down, forward])
+        projection_matrices[port] = intrinsics @ np.column_stack([rotation, -rotation @ position])
+    return projection_matrices
+
+
+def test_robust_triangulation_rejects_bad_view():
+    camera_count = 6
+    point_count = 500
+    projection_matrices = synthetic_projection_matrices(camera_count)
+
+    rng = np.random.default_rng(0)
+    true_xyz = rng.uniform(-0.5, 0.5, size=(point_count, 3))
+
+    point_ids = np.repeat(np.arange(point_count), camera_count)
+    camera_indices = np.tile(np.arange(camera_count), point_count)
+    xyz_h = np.hstack([true_xyz[point_ids], np.ones((len(point_ids), 1))])
+    projected = np.einsum("nij,nj->ni", projection_matrices[camera_indices], xyz_h)
+    img_xy = projected[:, :2] / projected[:, 2:] + rng.normal(scale=0.5, size=(len(point_ids), 2))
+
+    # one detection per point lands well away from where it should be
+    bad_view = rng.integers(0, camera_count, point_count)
+    bad_observations = np.arange(point_count) * camera_count + bad_view
+    img_xy[bad_observations] += rng.choice([-1, 1], size=(point_count, 2)) * rng.uniform(30, 80, (point_count, 2))
+
+    segment_starts, segment_stops = get_segment_bounds(np.zeros_like(point_ids), point_ids)
+
+    plain_xyz, plain_error = triangulate_segments(
+        projection_matrices, camera_indices, img_xy, segment_starts, segment_stops
+    )
+    robust_xyz, robust_error, inliers = triangulate_segments_robust(
+        projection_matrices, camera_indices, img_xy, segment_starts, segment_stops, inlier_threshold=5.0
+    )
+
+    plain_distance = np.linalg.norm(plain_xyz - true_xyz, axis=1)
+    robust_distance = np.linalg.norm(robust_xyz - true_xyz, axis=1)
+    logger.info(f"Median error (m): plain {np.median(plain_distance):.5f}, robust {np.median(robust_distance):.5f}")
+
+    assert not inliers[bad_observations].any()
+    assert inliers.sum() == len(inliers) - point_count
+    assert robust_distance.max() < 0.005
+    assert np.median(robust_distance) < np.median(plain_distance) / 5
+    assert (robust_error[:, 1] < 5.0).all()
+
+
+def test_robust_triangulation_keeps_consistent_views():
+    """on real data with a generous threshold, the robust mode should agree with the plain solution"""
+    session_path = Path(__root__, "tests", "sessions", "4_cam_recording")
+    camera_array = Configurator(session_path).get_camera_array()
+    xy_data = pd.read_csv(Path(session_path, "recording_1", "HOLISTIC", "xy_HOLISTIC.csv"))
+
+    xyz = triangulate_xy(xy_data, camera_array, method="normal")
+    xyz_robust = triangulate_xy(xy_data, camera_array, inlier_threshold=1000.0)
+
+    assert xyz[["sync_index", "point_id", "camera_count"]].equals(
+        xyz_robust[["sync_index", "point_id", "camera_count"]]
+    )
+    np.testing.assert_allclose(
+        xyz[["x_coord", "y_coord", "z_coord"]].to_numpy(),
+        xyz_robust[["x_coord", "y_coord", "z_coord"]].to_numpy(),
+        atol=1e-9,
+    )
+
+
+if __name__ == "__main__":
+    test_robust_triangulation_rejects_bad_view()
+    test_robust_triangulation_keeps_consistent_views()
@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.calibration.capture_volume.capture_volume import (
+    CaptureVolume,
+    xy_reprojection_error,
+    xy_reprojection_jacobian,
+    xy_reprojection_jacobian_blocks,
+)
+from caliscope.calibration.capture_volume.schur_solver import MIN_DIAGONAL, SchurNormalEquations
+from caliscope.configurator import Configurator
+
+logger = caliscope.logger.get(__name__)
+
+
+def get_perturbed_capture_volume(seed: int = 1) -> CaptureVolume:
+    config = Configurator(Path(__root__, "tests", "sessions", "post_optimization"))
+    camera_array = config.get_camera_array()
+    point_estimates = config.get_point_estimates()
+
+    rng = np.random.default_rng(seed)
+    params = camera_array.get_extrinsic_params()
+    params += rng.normal(scale=0.02, size=params.shape)
+    camera_array.update_extrinsic_params(params.ravel())
+    point_estimates.obj = point_estimates.obj + rng.normal(scale=0.01, size=point_estimates.obj.shape)
+
+    return CaptureVolume(camera_array, point_estimates)
+
+
+def test_schur_step_matches_dense_solve():
+    capture_volume = get_perturbed_capture_volume()
+    point_estimates = capture_volume.point_estimates
+    params = capture_volume.get_vectorized_params()
+    damping = 1e-2
+
+    residual = xy_reprojection_error(params, capture_volume)
+    equations = SchurNormalEquations(
+        residual,
+        xy_reprojection_jacobian_blocks(params, capture_volume),
+        point_estimates.camera_param_indices.astype(np.int64),
+        point_estimates.obj_indices.astype(np.int64),
+        point_estimates.n_cameras,
+        point_estimates.n_obj_points,
+    )
+    camera_step, point_step = equations.solve(damping)
+
+    # the same damped step from the full normal equations
+    jacobian = xy_reprojection_jacobian(params, capture_volume).toarray()
+    normal_matrix = jacobian.T @ jacobian
+    normal_matrix += damping * np.diag(np.clip(np.diag(normal_matrix), MIN_DIAGONAL, None))
+    expected_step = np.linalg.solve(normal_matrix, -jacobian.T @ residual)
+
+    step = np.concatenate([camera_step.ravel(), point_step.ravel()])
+    np.testing.assert_allclose(step, expected_step, rtol=1e-6, atol=1e-9)
+
+
+def test_optimize_with_schur_solver():
+    scipy_volume = get_perturbed_capture_volume()
+    schur_volume = get_perturbed_capture_volume()
+    initial_rmse = schur_volume.rmse["overall"]
+
+    scipy_volume.optimize(solver="scipy")
+    schur_volume.optimize(solver="schur")
+
+    logger.info(
+        f"RMSE from {initial_rmse:.3f} to {schur_volume.rmse['overall']:.3f} (scipy {scipy_volume.rmse['overall']:.3f})"
+    )
+    assert schur_volume.least_sq_result.success
+    np.testing.assert_allclose(schur_volume.rmse["overall"], scipy_volume.rmse["overall"], rtol=1e-3)
+    np.testing.assert_allclose(
+        schur_volume.camera_array.get_extrinsic_params(), scipy_volume.camera_array.get_extrinsic_params(), atol=1e-4
+    )
+
+    with pytest.raises(ValueError):
+        schur_volume.optimize(solver="dogbox")
+
+
+if __name__ == "__main__":
+    test_schur_step_matches_dense_solve()
+    test_optimize_with_schur_solver()
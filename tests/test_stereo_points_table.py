@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.configurator import Configurator
+from caliscope.packets import PointPacket
+from caliscope.triangulate.array_stereo_triangulator import ArrayStereoTriangulator
+from caliscope.triangulate.stereo_points_builder import StereoPointsBuilder
+
+logger = caliscope.logger.get(__name__)
+
+
+def test_stereo_points_table_matches_per_sync_index():
+    session_path = Path(__root__, "tests", "sessions", "4_cam_recording")
+    camera_array = Configurator(session_path).get_camera_array()
+    point_data = pd.read_csv(Path(session_path, "calibration", "extrinsic", "xy.csv"))
+
+    ports = list(camera_array.port_index.keys())
+    builder = StereoPointsBuilder(ports)
+    array_triangulator = ArrayStereoTriangulator(camera_array)
+
+    stereo_points_table = builder.get_stereo_points_table(point_data)
+    stereotriangulated_table = array_triangulator.triangulate_stereo_points_table(stereo_points_table)
+    assert len(stereotriangulated_table) > 0
+
+    # rebuild the same rows one sync index and one pair at a time
+    expected = []
+    for sync_index, sync_points in point_data.groupby("sync_index"):
+        point_packets = {}
+        for port, port_points in sync_points.groupby("port"):
+            img_loc = port_points[["img_loc_x", "img_loc_y"]].to_numpy()
+            point_packets[port] = PointPacket(port_points["point_id"].to_numpy(), img_loc)
+
+        for pair in builder.pairs:
+            if pair[0] in point_packets and pair[1] in point_packets:
+                packet = builder.get_stereo_points_packet(
+                    sync_index, pair[0], point_packets[pair[0]], pair[1], point_packets[pair[1]]
+                )
+                if packet is not None:
+                    array_triangulator.triangulators[pair].add_3D_points(packet)
+                    expected.append(pd.DataFrame(packet.to_table()))
+
+    expected = pd.concat(expected).reset_index(drop=True)
+
+    assert stereotriangulated_table.columns.tolist() == expected.columns.tolist()
+    assert stereotriangulated_table["pair"].tolist() == expected["pair"].tolist()
+    for column in expected.columns.drop("pair"):
+        np.testing.assert_allclose(stereotriangulated_table[column], expected[column])
+
+
+if __name__ == "__main__":
+    test_stereo_points_table_matches_per_sync_index()
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import pandas as pd
+import rtoml
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.calibration.stereocalibrator import StereoCalibrator
+from caliscope.helper import copy_contents
+
+logger = caliscope.logger.get(__name__)
+
+
+def stereocalibrate(tmp_path: Path, workers: int) -> dict:
+    session_path = Path(tmp_path, f"4_cam_recording_{workers}")
+    copy_contents(Path(__root__, "tests", "sessions", "4_cam_recording"), session_path)
+    config_path = Path(session_path, "config.toml")
+    point_data_path = Path(session_path, "calibration", "extrinsic", "xy.csv")
+
+    stereocalibrator = StereoCalibrator(config_path, point_data_path)
+    point_data = stereocalibrator.all_point_data.copy()
+    stereocalibrator.stereo_calibrate_all(boards_sampled=10, workers=workers)
+
+    # the point data shared across the pairs is not altered by calibrating them
+    pd.testing.assert_frame_equal(stereocalibrator.all_point_data, point_data)
+
+    config = rtoml.load(config_path)
+    return {key: value for key, value in config.items() if key.startswith("stereo")}
+
+
+def test_stereocalibration_independent_of_workers(tmp_path):
+    serial = stereocalibrate(tmp_path, workers=1)
+    parallel = stereocalibrate(tmp_path, workers=2)
+
+    logger.info(f"Stereocalibrated pairs: {list(serial.keys())}")
+    assert len(serial) > 0
+    assert list(parallel.keys()) == list(serial.keys())
+    assert parallel == serial
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp_path:
+        test_stereocalibration_independent_of_workers(Path(tmp_path))
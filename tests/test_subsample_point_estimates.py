@@ -0,0 +1,70 @@
+import copy
+from pathlib import Path
+
+import numpy as np
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.calibration.capture_volume.helper_functions.subsample_point_estimates import (
+    get_board_view_features,
+    select_board_views,
+    subsample_point_estimates,
+)
+from caliscope.configurator import Configurator
+
+logger = caliscope.logger.get(__name__)
+
+
+def test_subsample_point_estimates():
+    config = Configurator(Path(__root__, "tests", "sessions", "post_optimization"))
+    camera_array = config.get_camera_array()
+    point_estimates = config.get_point_estimates()
+    original = copy.deepcopy(point_estimates)
+
+    # nothing to do within the budget
+    subsample_point_estimates(point_estimates, camera_array, point_estimates.n_img_points)
+    np.testing.assert_array_equal(point_estimates.img, original.img)
+
+    max_observations = original.n_img_points // 3
+    subsample_point_estimates(point_estimates, camera_array, max_observations)
+    assert 0 < point_estimates.n_img_points <= max_observations
+
+    # board views are kept or dropped whole
+    kept_sync_indices = np.unique(point_estimates.sync_indices)
+    np.testing.assert_array_equal(
+        np.bincount(point_estimates.sync_indices)[kept_sync_indices],
+        np.bincount(original.sync_indices)[kept_sync_indices],
+    )
+
+    # every observation keeps its image point and object point
+    def observations(point_estimates) -> dict:
+        keys = zip(point_estimates.sync_indices, point_estimates.camera_indices, point_estimates.point_id)
+        values = zip(map(tuple, point_estimates.img), map(tuple, point_estimates.obj[point_estimates.obj_indices]))
+        return dict(zip(keys, values))
+
+    original_observations = observations(original)
+    for key, value in observations(point_estimates).items():
+        assert original_observations[key] == value
+
+
+def test_subsample_covers_more_than_consecutive_views():
+    config = Configurator(Path(__root__, "tests", "sessions", "post_optimization"))
+    point_estimates = config.get_point_estimates()
+    view_sync_indices, feature_ids, feature_ptr = get_board_view_features(point_estimates, config.get_camera_array())
+    view_sizes = np.bincount(np.searchsorted(view_sync_indices, point_estimates.sync_indices))
+
+    max_observations = point_estimates.n_img_points // 4
+    selected = select_board_views(feature_ids, feature_ptr, view_sizes, max_observations)
+    consecutive = np.flatnonzero(np.cumsum(view_sizes) <= max_observations)
+    assert view_sizes[selected].sum() <= max_observations
+
+    def covered(views):
+        return len(np.unique(np.concatenate([feature_ids[feature_ptr[v] : feature_ptr[v + 1]] for v in views])))
+
+    logger.info(f"{covered(selected)} features covered by the selection and {covered(consecutive)} consecutively")
+    assert covered(selected) > covered(consecutive)
+
+
+if __name__ == "__main__":
+    test_subsample_point_estimates()
+    test_subsample_covers_more_than_consecutive_views()
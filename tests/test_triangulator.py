@@ -10,6 +10,7 @@ of the final averaged triangulated position improved from 1.5 cm to 6 mm.
 
 import shutil
 from pathlib import Path
+from queue import Queue
 from time import sleep
 
 import numpy as np
@@ -22,6 +23,7 @@ from caliscope.cameras.camera_array import CameraArray
 from caliscope.cameras.synchronizer import Synchronizer
 from caliscope.configurator import Configurator
 from caliscope.helper import copy_contents
+from caliscope.packets import FramePacket, PointPacket, SyncPacket
 from caliscope.recording.recorded_stream import RecordedStream
 from caliscope.trackers.charuco_tracker import CharucoTracker
 from caliscope.triangulate.sync_packet_triangulator import SyncPacketTriangulator
@@ -105,6 +107,128 @@ def test_triangulator():
     assert abs(config_z_mean - triangulator_z_mean) < 0.007
 
 
+class PrefilledSynchronizer:
+    """Stands in for a Synchronizer, placing sync packets on the triangulator's queue as it subscribes"""
+
+    def __init__(self, sync_packets: list):
+        self.sync_packets = sync_packets
+
+    def subscribe_to_sync_packets(self, q: Queue):
+        for sync_packet in self.sync_packets:
+            q.put(sync_packet)
+
+
+def get_sync_packets(camera_array: CameraArray, max_packets: int = 40) -> list[SyncPacket]:
+    """sync packets assembled from the tracked points of the calibration recording"""
+    xy_path = Path(__root__, "tests", "sessions", "post_optimization", "calibration", "extrinsic", "xy.csv")
+    xy = pd.read_csv(xy_path)
+    xy = xy[xy["port"].isin(camera_array.cameras.keys())]
+
+    sync_packets = []
+    for sync_index, sync_xy in xy.groupby("sync_index"):
+        if sync_xy["port"].nunique() < 2:
+            continue
+        frame_packets = {}
+        for port, port_xy in sync_xy.groupby("port"):
+            points = PointPacket(
+                point_id=port_xy["point_id"].to_numpy(),
+                img_loc=port_xy[["img_loc_x", "img_loc_y"]].to_numpy(),
+            )
+            frame_packets[port] = FramePacket(
+                port=port,
+                frame_index=port_xy["frame_index"].iloc[0],
+                frame_time=port_xy["frame_time"].iloc[0],
+                frame=None,
+                points=points,
+            )
+        sync_packets.append(SyncPacket(sync_index, frame_packets))
+        if len(sync_packets) == max_packets:
+            break
+
+    return sync_packets
+
+
+def triangulate_one_at_a_time(camera_array: CameraArray, sync_packets: list, real_time: bool):
+    """hand packets to the triangulator only after the previous one is published so that none go stale"""
+    triangulator = SyncPacketTriangulator(camera_array, PrefilledSynchronizer([]), real_time=real_time)
+    assert triangulator.latency_percentiles is None
+
+    xyz_q = Queue()
+    triangulator.subscribe(xyz_q)
+    xyz_packets = []
+    for sync_packet in sync_packets:
+        triangulator.sync_packet_in_q.put(sync_packet)
+        xyz_packets.append(xyz_q.get(timeout=10))
+
+    triangulator.sync_packet_in_q.put(None)
+    triangulator.thread.join(timeout=10)
+    return triangulator, xyz_packets
+
+
+def test_real_time_matches_default():
+    config = Configurator(Path(__root__, "tests", "sessions", "post_optimization"))
+    camera_array = config.get_camera_array()
+    sync_packets = get_sync_packets(camera_array)
+
+    default_triangulator, default_xyz = triangulate_one_at_a_time(camera_array, sync_packets, real_time=False)
+    real_time_triangulator, real_time_xyz = triangulate_one_at_a_time(camera_array, sync_packets, real_time=True)
+
+    assert real_time_triangulator.dropped_packet_count == 0
+    assert sum(len(packet.point_ids) for packet in default_xyz) > 0
+    for default_packet, real_time_packet in zip(default_xyz, real_time_xyz):
+        assert real_time_packet.sync_index == default_packet.sync_index
+        np.testing.assert_array_equal(real_time_packet.point_ids, default_packet.point_ids)
+        np.testing.assert_allclose(real_time_packet.point_xyz, default_packet.point_xyz, rtol=0, atol=1e-6)
+
+    for triangulator in [default_triangulator, real_time_triangulator]:
+        latency = triangulator.latency_percentiles
+        logger.info(f"Latency p50 {latency['p50']:.3f} ms, p99 {latency['p99']:.3f} ms")
+        assert len(triangulator.latencies) == len(sync_packets)
+        assert 0 < latency["p50"] <= latency["p99"]
+
+
+def test_real_time_drops_stale_packets(tmp_path):
+    config = Configurator(Path(__root__, "tests", "sessions", "post_optimization"))
+    camera_array = config.get_camera_array()
+    sync_packets = get_sync_packets(camera_array, max_packets=6)
+    stale_packets, fresh_packet = sync_packets[:-1], sync_packets[-1]
+
+    # the stale packets are all waiting by the time the triangulator begins
+    triangulator = SyncPacketTriangulator(
+        camera_array, PrefilledSynchronizer(stale_packets), recording_directory=tmp_path, real_time=True
+    )
+    while len(triangulator.latencies) == 0:
+        sleep(0.01)
+
+    triangulator.sync_packet_in_q.put(fresh_packet)
+    while len(triangulator.latencies) == 1:
+        sleep(0.01)
+    triangulator.sync_packet_in_q.put(None)
+    triangulator.thread.join(timeout=10)
+
+    # only the newest of the waiting packets and the packet that arrived afterward are triangulated
+    xyz = pd.read_csv(Path(tmp_path, "xyz.csv"))
+    assert triangulator.dropped_packet_count == len(stale_packets) - 1
+    assert sorted(xyz["sync_index"].unique()) == [stale_packets[-1].sync_index, fresh_packet.sync_index]
+
+
+def test_lookup_tables_built_only_in_real_time():
+    config = Configurator(Path(__root__, "tests", "sessions", "post_optimization"))
+
+    for real_time in [False, True]:
+        camera_array = config.get_camera_array()
+        triangulator = SyncPacketTriangulator(camera_array, PrefilledSynchronizer([None]), real_time=real_time)
+        triangulator.thread.join(timeout=10)
+        built = [camera.has_cached("undistortion_map") for camera in camera_array.cameras.values()]
+        assert built == [real_time] * len(camera_array.cameras)
+
+
 if __name__ == "__main__":
+    import tempfile
+
     test_triangulator()
+    test_real_time_matches_default()
+    test_lookup_tables_built_only_in_real_time()
+    with tempfile.TemporaryDirectory() as tmp_path:
+        test_real_time_drops_stale_packets(Path(tmp_path))
 # %%
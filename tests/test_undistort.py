@@ -0,0 +1,110 @@
+from copy import deepcopy
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.configurator import Configurator
+from caliscope.triangulate.triangulation import (
+    UNDISTORTION_MAP_MIN_POINTS_PER_PIXEL,
+    get_undistortion_map,
+    undistort,
+    undistort_batch,
+    undistort_lookup,
+)
+
+logger = caliscope.logger.get(__name__)
+
+
+def test_undistort_lookup_matches_iterative_model():
+    session_path = Path(__root__, "tests", "sessions", "4_cam_recording")
+    camera = Configurator(session_path).get_camera_array().cameras[0]
+    width, height = camera.size
+
+    rng = np.random.default_rng(0)
+    int_points = rng.integers(0, [width, height], size=(1000, 2))
+    float_points = rng.uniform(0, [width - 1, height - 1], size=(1000, 2))
+    # points outside of the frame and missing points fall back to the iterative model
+    float_points[:3] = [[-5.5, 10.0], [width + 2.5, 10.0], [np.nan, np.nan]]
+
+    # integer points are read directly from the table (stored as float32)
+    np.testing.assert_allclose(undistort_lookup(int_points, camera), undistort(int_points, camera), atol=1e-3)
+
+    # float points are interpolated between table entries
+    lookup = undistort_lookup(float_points, camera)
+    iterative = undistort(float_points, camera)
+    assert np.array_equal(np.isnan(lookup), np.isnan(iterative))
+    np.testing.assert_allclose(lookup[:, 3:], iterative[:, 3:], atol=1e-2)
+    np.testing.assert_allclose(lookup[:, :2], iterative[:, :2])
+
+
+def test_undistortion_map_cache():
+    session_path = Path(__root__, "tests", "sessions", "4_cam_recording")
+    camera = Configurator(session_path).get_camera_array().cameras[0]
+
+    undistortion_map = get_undistortion_map(camera)
+    assert undistortion_map.shape == (camera.size[1], camera.size[0], 2)
+    assert get_undistortion_map(camera) is undistortion_map
+
+    # a recalibrated camera gets a fresh table
+    recalibrated = deepcopy(camera)
+    recalibrated.distortions = recalibrated.distortions * 0.5
+    assert get_undistortion_map(recalibrated) is not undistortion_map
+
+
+def test_undistort_batch_drops_uncalibrated_ports():
+    session_path = Path(__root__, "tests", "sessions", "4_cam_recording")
+    camera_array = Configurator(session_path).get_camera_array()
+    xy_data = pd.read_csv(Path(session_path, "recording_1", "HOLISTIC", "xy_HOLISTIC.csv"))
+
+    uncalibrated_port = max(camera_array.cameras.keys()) + 1
+    extra_rows = xy_data.head(10).assign(port=uncalibrated_port)
+    undistorted_xy = undistort_batch(pd.concat([xy_data, extra_rows]), camera_array)
+
+    assert len(undistorted_xy) == len(xy_data)
+    assert not undistorted_xy[["img_loc_undistort_x", "img_loc_undistort_y"]].isna().any().any()
+
+
+def test_undistort_batch_builds_map_only_for_large_batches():
+    session_path = Path(__root__, "tests", "sessions", "4_cam_recording")
+    camera_array = Configurator(session_path).get_camera_array()
+    camera = camera_array.cameras[0]
+    width, height = camera.size
+
+    # a few points are undistorted directly rather than through a full frame table
+    small_xy = pd.DataFrame({"port": 0, "img_loc_x": [10.0, 640.5], "img_loc_y": [20.0, 360.25]})
+    small_undistorted = undistort_batch(small_xy, camera_array)
+    assert not camera.has_cached("undistortion_map")
+    np.testing.assert_array_equal(
+        small_undistorted[["img_loc_undistort_x", "img_loc_undistort_y"]].to_numpy(),
+        undistort(small_xy[["img_loc_x", "img_loc_y"]].to_numpy(), camera).T,
+    )
+
+    # enough points to repay building the table
+    rng = np.random.default_rng(0)
+    point_count = int(UNDISTORTION_MAP_MIN_POINTS_PER_PIXEL * width * height) + 1
+    large_points = rng.uniform(0, [width - 1, height - 1], size=(point_count, 2))
+    large_xy = pd.DataFrame({"port": 0, "img_loc_x": large_points[:, 0], "img_loc_y": large_points[:, 1]})
+    large_undistorted = undistort_batch(large_xy, camera_array)
+    assert camera.has_cached("undistortion_map")
+    np.testing.assert_allclose(
+        large_undistorted[["img_loc_undistort_x", "img_loc_undistort_y"]].to_numpy(),
+        undistort(large_points, camera).T,
+        atol=1e-2,
+    )
+
+    # once built, the table is used for batches of any size
+    small_undistorted = undistort_batch(small_xy, camera_array)
+    np.testing.assert_array_equal(
+        small_undistorted[["img_loc_undistort_x", "img_loc_undistort_y"]].to_numpy(),
+        undistort_lookup(small_xy[["img_loc_x", "img_loc_y"]].to_numpy(), camera).T,
+    )
+
+
+if __name__ == "__main__":
+    test_undistort_lookup_matches_iterative_model()
+    test_undistortion_map_cache()
+    test_undistort_batch_drops_uncalibrated_ports()
+    test_undistort_batch_builds_map_only_for_large_batches()
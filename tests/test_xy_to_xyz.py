@@ -1,6 +1,7 @@
 import time
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 import caliscope.logger
@@ -10,7 +11,7 @@ from caliscope.helper import copy_contents
 from caliscope.trackers.tracker_enum import TrackerEnum
 
 # from caliscope.post_processing.post_processor import PostProcessor
-from caliscope.triangulate.triangulation import triangulate_xy
+from caliscope.triangulate.triangulation import triangulate_sync_index, triangulate_xy, undistort_batch
 
 logger = caliscope.logger.get(__name__)
 
@@ -44,7 +45,16 @@ def test_xy_to_xyz_postprocessing():
     logger.info(f"Elapsed time is {stop-start}. Note that on first iteration, @jit functions will take longer")
 
     # Assert that the xyz_history dictionary has the expected keys
-    assert set(xyz_history.keys()) == {"sync_index", "point_id", "x_coord", "y_coord", "z_coord"}
+    assert set(xyz_history.keys()) == {
+        "sync_index",
+        "point_id",
+        "x_coord",
+        "y_coord",
+        "z_coord",
+        "camera_count",
+        "mean_reprojection_error",
+        "max_reprojection_error",
+    }
 
     # Assert that all lists in xyz_history have the same length
     assert (
@@ -69,5 +79,88 @@ def test_xy_to_xyz_postprocessing():
     xyz_history.to_csv(output_path)
 
 
+def test_triangulate_xy_matches_per_sync_index():
+    """the single pass over all sync indices should reproduce triangulation of each sync index in isolation"""
+    session_path = Path(__root__, "tests", "sessions", "4_cam_recording")
+    camera_array = Configurator(session_path).get_camera_array()
+    xy_path = Path(session_path, "recording_1", "HOLISTIC", "xy_HOLISTIC.csv")
+    xy_data = pd.read_csv(xy_path)
+    xy_data = xy_data[xy_data["sync_index"] < xy_data["sync_index"].min() + 20]
+
+    xyz = triangulate_xy(xy_data, camera_array)
+
+    undistorted_xy = undistort_batch(xy_data, camera_array)
+    projection_matrices = camera_array.projection_matrices
+    for sync_index, xyz_at_index in xyz.groupby("sync_index"):
+        current = undistorted_xy[undistorted_xy["sync_index"] == sync_index]
+        point_ids, points_xyz = triangulate_sync_index(
+            projection_matrices,
+            current["port"].to_numpy(),
+            current["point_id"].to_numpy(),
+            current[["img_loc_undistort_x", "img_loc_undistort_y"]].to_numpy(),
+        )
+
+        assert np.array_equal(xyz_at_index["point_id"].to_numpy(), np.array(point_ids))
+        np.testing.assert_allclose(xyz_at_index[["x_coord", "y_coord", "z_coord"]].to_numpy(), np.array(points_xyz))
+
+
+def test_normal_equation_matches_svd():
+    session_path = Path(__root__, "tests", "sessions", "4_cam_recording")
+    camera_array = Configurator(session_path).get_camera_array()
+    xy_path = Path(session_path, "recording_1", "HOLISTIC", "xy_HOLISTIC.csv")
+    xy_data = pd.read_csv(xy_path)
+
+    # arbitrary per observation weights such as might come from tracker confidence
+    rng = np.random.default_rng(42)
+    xy_data["confidence"] = rng.uniform(0.1, 1.0, len(xy_data))
+
+    for weight_column in [None, "confidence"]:
+        xyz_svd = triangulate_xy(xy_data, camera_array, method="svd", weight_column=weight_column)
+        xyz_normal = triangulate_xy(xy_data, camera_array, method="normal", weight_column=weight_column)
+
+        assert xyz_svd[["sync_index", "point_id"]].equals(xyz_normal[["sync_index", "point_id"]])
+        np.testing.assert_allclose(
+            xyz_svd[["x_coord", "y_coord", "z_coord"]].to_numpy(),
+            xyz_normal[["x_coord", "y_coord", "z_coord"]].to_numpy(),
+            atol=1e-9,
+        )
+
+    # weighting should actually change the solution
+    xyz_unweighted = triangulate_xy(xy_data, camera_array, method="normal")
+    assert not np.allclose(xyz_unweighted["x_coord"], xyz_normal["x_coord"])
+
+
+def test_reprojection_error_columns():
+    """quality columns from the triangulation kernel should match a separate reprojection of every point"""
+    session_path = Path(__root__, "tests", "sessions", "4_cam_recording")
+    camera_array = Configurator(session_path).get_camera_array()
+    xy_path = Path(session_path, "recording_1", "HOLISTIC", "xy_HOLISTIC.csv")
+    xy_data = pd.read_csv(xy_path)
+
+    xyz = triangulate_xy(xy_data, camera_array)
+
+    observations = undistort_batch(xy_data, camera_array).merge(xyz, on=["sync_index", "point_id"])
+    errors = []
+    for port, port_observations in observations.groupby("port"):
+        obj_xyz = port_observations[["x_coord", "y_coord", "z_coord"]].to_numpy()
+        projected = np.hstack([obj_xyz, np.ones((len(obj_xyz), 1))]) @ camera_array.cameras[port].projection_matrix.T
+        projected = projected[:, :2] / projected[:, 2:]
+        img_xy = port_observations[["img_loc_undistort_x", "img_loc_undistort_y"]].to_numpy()
+        errors.append(
+            port_observations[["sync_index", "point_id"]].assign(error=np.linalg.norm(projected - img_xy, axis=1))
+        )
+
+    expected = pd.concat(errors).groupby(["sync_index", "point_id"])["error"].agg(["size", "mean", "max"]).reset_index()
+    expected = xyz[["sync_index", "point_id"]].merge(expected, on=["sync_index", "point_id"])
+
+    assert (xyz["camera_count"] >= 2).all()
+    np.testing.assert_array_equal(xyz["camera_count"], expected["size"])
+    np.testing.assert_allclose(xyz["mean_reprojection_error"], expected["mean"], rtol=1e-6, atol=1e-9)
+    np.testing.assert_allclose(xyz["max_reprojection_error"], expected["max"], rtol=1e-6, atol=1e-9)
+
+
 if __name__ == "__main__":
     test_xy_to_xyz_postprocessing()
+    test_triangulate_xy_matches_per_sync_index()
+    test_normal_equation_matches_svd()
+    test_reprojection_error_columns()
@@ -0,0 +1,82 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import caliscope.logger
+from caliscope import __root__
+from caliscope.packets import XYZPacket
+from caliscope.triangulate.xyz_writer import XYZChunkWriter
+
+logger = caliscope.logger.get(__name__)
+
+
+def test_chunked_writer_matches_single_dataframe():
+    output_directory = Path(__root__, "tests", "sessions_copy_delete", "xyz_writer")
+    if output_directory.exists():
+        shutil.rmtree(output_directory)
+
+    rng = np.random.default_rng(0)
+    packets = []
+    for sync_index in range(200):
+        point_count = rng.integers(0, 12)
+        point_ids = rng.choice(50, size=point_count, replace=False).astype(np.int64)
+        packets.append(XYZPacket(sync_index, point_ids, rng.normal(size=(point_count, 3))))
+
+    # what the triangulator previously accumulated in lists and saved at the end of the session
+    history = {"sync_index": [], "point_id": [], "x_coord": [], "y_coord": [], "z_coord": []}
+    for packet in packets:
+        history["sync_index"].extend([packet.sync_index] * len(packet.point_ids))
+        history["point_id"].extend(packet.point_ids)
+        history["x_coord"].extend(packet.point_xyz[:, 0].tolist())
+        history["y_coord"].extend(packet.point_xyz[:, 1].tolist())
+        history["z_coord"].extend(packet.point_xyz[:, 2].tolist())
+
+    expected_path = Path(output_directory, "expected.csv")
+    output_directory.mkdir(parents=True)
+    pd.DataFrame(history).to_csv(expected_path)
+
+    # small chunks so that packets straddle block boundaries
+    streamed_path = Path(output_directory, "xyz_streamed.csv")
+    writer = XYZChunkWriter(streamed_path, chunk_size=7)
+    for packet in packets:
+        writer.add(packet)
+    writer.close()
+
+    assert streamed_path.read_text() == expected_path.read_text()
+
+
+def test_empty_session_writes_header():
+    output_path = Path(__root__, "tests", "sessions_copy_delete", "xyz_writer", "xyz_empty.csv")
+    writer = XYZChunkWriter(output_path)
+    writer.close()
+
+    assert pd.read_csv(output_path).columns.tolist()[1:] == ["sync_index", "point_id", "x_coord", "y_coord", "z_coord"]
+
+
+def test_write_failure_is_raised():
+    output_directory = Path(__root__, "tests", "sessions_copy_delete", "xyz_writer")
+    output_directory.mkdir(parents=True, exist_ok=True)
+    # a file in place of the output directory makes the writer thread fail
+    blocking_file = Path(output_directory, "not_a_directory")
+    blocking_file.write_text("")
+    output_path = Path(blocking_file, "xyz.csv")
+
+    writer = XYZChunkWriter(output_path, chunk_size=1)
+    writer.thread.join(timeout=10)
+
+    # more blocks than the queue holds would previously block forever on a dead writer
+    packet = XYZPacket(0, np.array([0]), np.zeros((1, 3)))
+    with pytest.raises(OSError):
+        for _ in range(10):
+            writer.add(packet)
+    with pytest.raises(OSError):
+        writer.close()
+
+
+if __name__ == "__main__":
+    test_chunked_writer_matches_single_dataframe()
+    test_empty_session_writes_header()
+    test_write_failure_is_raised()